@@ -0,0 +1,216 @@
+"""
+Ejecución por lotes de búsquedas, sin interacción (apta para cron).
+
+Lee un archivo de trabajos CSV o JSONL con las columnas url, name y max_results
+(mode es opcional), toma los valores por defecto de config.json y corre los
+trabajos en paralelo, cada uno con su propio navegador (headless por defecto)
+y su propia sesión. Al terminar escribe un resumen por trabajo con el
+rendimiento obtenido en session_data/batch_<id>.json.
+
+Uso:
+    python scraper_enhanced.py batch trabajos.csv --parallel 2
+"""
+
+import csv
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# Estados de un trabajo en el resumen
+JOB_OK = 'ok'
+JOB_EMPTY = 'sin_resultados'
+JOB_FAILED = 'fallido'
+
+# Códigos de salida del comando
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_FAILED = 2
+
+
+def load_jobs(path, default_max_results=10):
+    """Lee los trabajos de un archivo .csv o .jsonl"""
+    jobs = []
+    if path.lower().endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    for number, row in enumerate(rows, start=1):
+        url = (row.get('url') or '').strip()
+        if not url:
+            print(f"⚠️ Trabajo {number} sin URL, se omite")
+            continue
+        try:
+            max_results = int(row.get('max_results') or default_max_results)
+        except (TypeError, ValueError):
+            max_results = default_max_results
+        jobs.append({
+            'numero': number,
+            'url': url,
+            'name': (row.get('name') or row.get('busqueda') or f"trabajo_{number}").strip(),
+            'max_results': max_results,
+            'mode': (row.get('mode') or 'detail').strip()
+        })
+    return jobs
+
+
+def run_job(job, batch_id, options, browser_addresses=None):
+    """Corre un trabajo con su propio scraper y devuelve su resumen.
+
+    browser_addresses: navegadores de serve-browser reservados para este trabajo.
+    """
+    from scraper_enhanced import GoogleMapsScraperEnhanced
+
+    summary = {
+        'numero': job['numero'],
+        'busqueda': job['name'],
+        'url': job['url'],
+        'estado': JOB_FAILED,
+        'negocios': 0,
+        'segundos': 0.0,
+        'negocios_por_minuto': 0.0,
+        'primer_resultado_segundos': None,
+        'archivo_csv': None,
+        'error': None
+    }
+
+    scraper = None
+    start_time = time.time()
+    try:
+        scraper = GoogleMapsScraperEnhanced(
+            auto_save=True,
+            mysql_config=options.get('mysql_config'),
+            session_id=f"{batch_id}_{job['numero']}",
+            num_workers=options.get('num_workers', 1),
+            lite_mode=options.get('lite_mode', False),
+            headless=options.get('headless', True),
+            capture_network=(job['mode'] == 'network'),
+            requests_per_second=options.get('requests_per_second'),
+            adaptive_concurrency=options.get('adaptive_concurrency', False),
+            max_pages_per_driver=options.get('max_pages_per_driver', 300),
+            max_driver_rss_mb=options.get('max_driver_rss_mb', 1500),
+            browser_addresses=browser_addresses
+        )
+        businesses = scraper.search_businesses(
+            job['url'],
+            max_results=job['max_results'],
+            search_name=job['name'],
+            mode=job['mode']
+        )
+
+        summary['negocios'] = len(businesses)
+        if scraper.last_search_error:
+            # La búsqueda se cortó: lo extraído se guarda, pero el trabajo falló
+            summary['estado'] = JOB_FAILED
+            summary['error'] = scraper.last_search_error
+            print(f"❌ Trabajo {job['numero']} ({job['name']}) se cortó: {scraper.last_search_error}")
+        else:
+            summary['estado'] = JOB_OK if businesses else JOB_EMPTY
+        if scraper.search_history:
+            summary['primer_resultado_segundos'] = scraper.search_history[-1].get('primer_resultado_segundos')
+        if businesses:
+            summary['archivo_csv'] = scraper.export_session_data('csv')
+
+    except Exception as e:
+        summary['error'] = str(e)
+        print(f"❌ Trabajo {job['numero']} ({job['name']}) falló: {e}")
+    finally:
+        if scraper:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+
+    elapsed = time.time() - start_time
+    summary['segundos'] = round(elapsed, 1)
+    if elapsed > 0:
+        summary['negocios_por_minuto'] = round(summary['negocios'] / elapsed * 60, 1)
+    return summary
+
+
+def run_batch(jobs, parallel=1, options=None, batch_id=None, data_dir="session_data"):
+    """Corre todos los trabajos con hasta `parallel` navegadores a la vez.
+
+    Devuelve (resúmenes, ruta del resumen JSON).
+    """
+    options = options or {}
+    batch_id = batch_id or f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:4]}"
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+
+    summaries = []
+    summaries_lock = threading.Lock()
+    num_threads = max(1, min(parallel, len(jobs)))
+
+    # Cada hilo usa su propia parte de los navegadores de serve-browser (--attach),
+    # así dos trabajos simultáneos nunca manejan el mismo Chrome
+    addresses = list(options.get('browser_addresses') or [])
+
+    def worker(thread_index):
+        thread_addresses = addresses[thread_index::num_threads]
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            print(f"\n🚀 Trabajo {job['numero']}/{len(jobs)}: {job['name']}")
+            summary = run_job(job, batch_id, options, thread_addresses)
+            with summaries_lock:
+                summaries.append(summary)
+            print(f"🏁 Trabajo {job['numero']}: {summary['estado']} "
+                  f"({summary['negocios']} negocios en {summary['segundos']}s)")
+
+    start_time = time.time()
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start_time
+
+    summaries.sort(key=lambda item: item['numero'])
+    total_businesses = sum(item['negocios'] for item in summaries)
+    report = {
+        'batch_id': batch_id,
+        'fecha': datetime.now().isoformat(),
+        'paralelo': parallel,
+        'trabajos': len(jobs),
+        'exitosos': sum(1 for item in summaries if item['estado'] == JOB_OK),
+        'negocios': total_businesses,
+        'segundos': round(elapsed, 1),
+        'negocios_por_minuto': round(total_businesses / elapsed * 60, 1) if elapsed else 0,
+        'resultados': summaries
+    }
+
+    os.makedirs(data_dir, exist_ok=True)
+    report_path = os.path.join(data_dir, f"{batch_id}.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+    return summaries, report_path
+
+
+def print_batch_summary(summaries):
+    """Tabla de resultados por trabajo"""
+    print("\n📊 RESUMEN DEL LOTE")
+    print(f"{'#':>3}  {'Búsqueda':<28}{'Estado':<16}{'Negocios':>9}{'Segundos':>10}{'Por min':>9}")
+    for item in summaries:
+        print(f"{item['numero']:>3}  {item['busqueda'][:27]:<28}{item['estado']:<16}"
+              f"{item['negocios']:>9}{item['segundos']:>10}{item['negocios_por_minuto']:>9}")
+
+
+def batch_exit_code(summaries):
+    """0 si todos los trabajos obtuvieron negocios, 1 si alguno falló, 2 si fallaron todos"""
+    if not summaries:
+        return EXIT_FAILED
+    ok = sum(1 for item in summaries if item['estado'] == JOB_OK)
+    if ok == len(summaries):
+        return EXIT_OK
+    return EXIT_PARTIAL if ok else EXIT_FAILED
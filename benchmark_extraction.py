@@ -0,0 +1,189 @@
+"""
+Comparación de estrategias de extracción de páginas de detalle.
+
+Recolecta una vez las URLs de una búsqueda y mide la extracción de esas mismas
+URLs con: 1 pestaña (secuencial), K pestañas en un Chrome y K navegadores.
+Reporta tiempo total, negocios por minuto y memoria de los procesos de Chrome
+(requiere psutil; sin él la memoria se omite).
+
+El arranque de los navegadores se mide aparte y no entra en el tiempo de
+extracción de ninguna estrategia: los K navegadores se abren (en un DriverPool)
+antes de empezar a medir, igual que el Chrome principal de las otras dos, y el
+principal que no usan vuelve al pool para que uno de los K lo aproveche. La
+memoria se muestrea en segundo plano durante toda la extracción.
+
+Uso:
+    python benchmark_extraction.py "https://www.google.com/maps/search/..." --results 20 --k 4
+"""
+
+import argparse
+import functools
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from browser_pool import DriverPool
+from chrome_profiles import profiles_root
+from scraper_enhanced import GoogleMapsScraperEnhanced, create_chrome_driver
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class MemorySampler:
+    """Registra el pico de memoria (RSS) de los procesos hijos, es decir, Chrome"""
+
+    def __init__(self, interval=0.5):
+        self.peak_mb = 0.0
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        """Muestrea cada `interval` segundos en un hilo aparte hasta salir del bloque"""
+        def run():
+            while True:
+                self.sample()
+                if self._stop.wait(self.interval):
+                    return
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.sample()
+        return False
+
+    def sample(self):
+        if psutil is None:
+            return
+        total = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.peak_mb = max(self.peak_mb, total / (1024 * 1024))
+
+
+def collect_urls(url, max_results, headless):
+    """Abre la búsqueda una vez y devuelve las URLs de los negocios"""
+    scraper = GoogleMapsScraperEnhanced(auto_save=False, headless=headless)
+    try:
+        scraper.driver.get(url)
+        scraper._wait_for(
+            lambda d: d.execute_script("return document.readyState") == 'complete',
+            'page_load'
+        )
+        return scraper.scroll_and_load_results(max_results)
+    finally:
+        scraper.close()
+
+
+def _start_browser_pool(scraper, num_workers):
+    """Abre los navegadores de los workers antes de medir.
+
+    El principal vuelve al pool (la estrategia no lo usa) y queda como uno de
+    los num_workers que toman los workers al empezar.
+    """
+    pool = scraper.driver_pool
+    pool.release(scraper.driver)
+    scraper.driver = None
+    drivers = [pool.acquire() for _ in range(num_workers)]
+    for driver in drivers:
+        pool.release(driver)
+
+
+def run_strategy(name, urls, headless, num_workers=1, num_tabs=1):
+    """Extrae las URLs con una configuración y devuelve sus métricas"""
+    print(f"\n⏱️ Estrategia: {name}")
+    pool = None
+    if num_workers > 1:
+        # Perfiles nuevos en cada corrida: ninguna estrategia arranca con caché de otra
+        pool = DriverPool(functools.partial(create_chrome_driver, headless=headless), max_size=num_workers,
+                          profile_prefix=f"benchmark_{uuid.uuid4().hex[:6]}")
+
+    startup_start = time.time()
+    scraper = GoogleMapsScraperEnhanced(
+        auto_save=False,
+        num_workers=num_workers,
+        num_tabs=num_tabs,
+        headless=headless,
+        driver_pool=pool
+    )
+
+    try:
+        if pool:
+            _start_browser_pool(scraper, num_workers)
+        startup = time.time() - startup_start
+
+        if num_workers > 1:
+            results = scraper._extract_with_worker_pool(urls)
+        elif num_tabs > 1:
+            results = scraper._extract_with_tabs(urls)
+        else:
+            results = scraper._extract_sequentially(urls)
+
+        extracted = 0
+        with MemorySampler() as sampler:
+            start = time.time()
+            for _, _, data in results:
+                if data:
+                    extracted += 1
+            elapsed = time.time() - start
+    finally:
+        scraper.close()
+        if pool:
+            pool.close_all()
+            for slot in range(num_workers):
+                shutil.rmtree(os.path.join(profiles_root(), f"{pool.profile_prefix}_{slot}"), ignore_errors=True)
+
+    return {
+        'estrategia': name,
+        'extraidos': extracted,
+        'arranque': round(startup, 1),
+        'segundos': round(elapsed, 1),
+        'por_minuto': round(extracted / elapsed * 60, 1) if elapsed else 0,
+        'memoria_mb': round(sampler.peak_mb) if psutil else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: 1 pestaña vs K pestañas vs K navegadores")
+    parser.add_argument("url", help="URL de búsqueda de Google Maps")
+    parser.add_argument("--results", type=int, default=20, help="Negocios a extraer (20)")
+    parser.add_argument("--k", type=int, default=4, help="Pestañas / navegadores en paralelo (4)")
+    parser.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    args = parser.parse_args()
+
+    urls = collect_urls(args.url, args.results, args.headless)
+    if not urls:
+        print("❌ No se obtuvieron URLs para el benchmark")
+        return
+
+    print(f"\n📋 {len(urls)} URLs recolectadas, K = {args.k}")
+    rows = [
+        run_strategy("1 pestaña", urls, args.headless),
+        run_strategy(f"{args.k} pestañas", urls, args.headless, num_tabs=args.k),
+        run_strategy(f"{args.k} navegadores", urls, args.headless, num_workers=args.k)
+    ]
+
+    print("\n📊 RESULTADOS")
+    print(f"{'Estrategia':<16}{'Extraídos':>10}{'Arranque':>10}{'Segundos':>10}{'Por min':>10}{'Memoria MB':>12}")
+    for row in rows:
+        memory = row['memoria_mb'] if row['memoria_mb'] is not None else 'n/d'
+        print(f"{row['estrategia']:<16}{row['extraidos']:>10}{row['arranque']:>10}{row['segundos']:>10}"
+              f"{row['por_minuto']:>10}{memory:>12}")
+    if psutil is None:
+        print("💡 Instala psutil para medir la memoria de Chrome")
+
+
+if __name__ == "__main__":
+    main()
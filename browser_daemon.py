@@ -0,0 +1,270 @@
+"""
+Navegadores Chrome persistentes a los que el scraper se conecta por depuración remota.
+
+`python scraper_enhanced.py serve-browser` deja uno o más Chrome abiertos, cada
+uno con su puerto de depuración remota y un perfil fijo (la caché HTTP se
+conserva entre ejecuciones). Los scrapers iniciados con `--attach` se conectan
+a ellos con `options.debugger_address` en lugar de lanzar y parchear Chrome,
+por lo que arrancan en menos de un segundo.
+
+Los puertos en uso (y el PID del Chrome de cada uno, para que el watchdog mida
+su memoria) se publican en session_data/browser_daemon.json.
+
+Cada navegador lo maneja un solo scraper a la vez: attach_chrome_driver toma
+un bloqueo de archivo por dirección (session_data/browser_<host>_<puerto>.lock)
+que detach_chrome_driver suelta, y si otro proceso ya lo tiene falla con
+DaemonBrowserBusy. El sistema operativo suelta el bloqueo si el proceso muere.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import time
+import urllib.request
+from datetime import datetime
+
+from selenium import webdriver
+
+DAEMON_STATE_FILE = os.path.join("session_data", "browser_daemon.json")
+DAEMON_PROFILE_PREFIX = "temp_chrome_profile_daemon"
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class DaemonBrowserBusy(RuntimeError):
+    """El navegador persistente ya lo está usando otro scraper"""
+
+# Mismas banderas estables que usa create_chrome_driver en scraper_enhanced
+DAEMON_CHROME_ARGUMENTS = [
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-extensions",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-default-apps",
+    "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+]
+
+
+def find_chrome_executable():
+    """Ubica el ejecutable de Chrome (el mismo que usaría undetected_chromedriver)"""
+    try:
+        import undetected_chromedriver as uc
+        path = uc.find_chrome_executable()
+        if path:
+            return path
+    except Exception:
+        pass
+
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def is_debugger_alive(address, timeout=1.0):
+    """Verifica que haya un Chrome escuchando en host:puerto"""
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def read_daemon_addresses(state_file=DAEMON_STATE_FILE):
+    """Direcciones host:puerto de los navegadores del daemon que siguen vivos"""
+    if not os.path.exists(state_file):
+        return []
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except Exception:
+        return []
+    return [address for address in state.get('addresses', []) if is_debugger_alive(address)]
+
+
+def write_daemon_state(browsers, lite_mode=False, state_file=DAEMON_STATE_FILE):
+    """Publica las direcciones de los navegadores del daemon ({dirección: PID de Chrome})"""
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    state = {
+        'pid': os.getpid(),
+        'started_at': datetime.now().isoformat(),
+        'lite_mode': lite_mode,
+        'addresses': list(browsers),
+        'browser_pids': browsers
+    }
+    with open(state_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def daemon_browser_pid(address, state_file=DAEMON_STATE_FILE):
+    """PID del Chrome del daemon en esa dirección (None si no se publicó)"""
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('browser_pids', {}).get(address)
+    except Exception:
+        return None
+
+
+def _lock_path(address, state_file=DAEMON_STATE_FILE):
+    return os.path.join(os.path.dirname(state_file), f"browser_{address.replace(':', '_')}.lock")
+
+
+def _try_lock(path):
+    """Bloqueo exclusivo sin espera sobre path; devuelve el archivo abierto o None si está tomado"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    lock_file = open(path, 'a+b')
+    try:
+        if os.name == 'nt':
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _unlock(lock_file):
+    try:
+        if os.name == 'nt':
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+    lock_file.close()
+
+
+def attach_chrome_driver(address, capture_network=False, state_file=DAEMON_STATE_FILE):
+    """Conecta Selenium a un Chrome ya abierto en host:puerto.
+
+    Reserva el navegador para este scraper hasta detach_chrome_driver; lanza
+    DaemonBrowserBusy si otro scraper (de este u otro proceso) ya lo tiene.
+    El driver queda con daemon_address y browser_pid (el Chrome del daemon, no
+    el chromedriver local) para el control de memoria del watchdog.
+    """
+    lock_file = _try_lock(_lock_path(address, state_file))
+    if lock_file is None:
+        raise DaemonBrowserBusy(f"El navegador persistente {address} está en uso por otro scraper")
+
+    try:
+        options = webdriver.ChromeOptions()
+        options.debugger_address = address
+        if capture_network:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        driver = webdriver.Chrome(options=options)
+    except Exception:
+        _unlock(lock_file)
+        raise
+    driver._daemon_lock = lock_file
+    driver.daemon_address = address
+    driver.browser_pid = daemon_browser_pid(address, state_file)
+    print(f"🔌 Conectado al navegador persistente en {address}")
+    if driver.browser_pid is None:
+        print("   ⚠️ El daemon no publicó el PID de este Chrome: no se controlará su memoria")
+    return driver
+
+
+def detach_chrome_driver(driver):
+    """Suelta un navegador persistente sin cerrarlo.
+
+    driver.quit() cerraría las ventanas del Chrome del daemon; basta con dejar
+    una página vacía y detener el chromedriver local.
+    """
+    try:
+        driver.get("about:blank")
+    except Exception:
+        pass
+    try:
+        driver.service.stop()
+    except Exception:
+        pass
+    lock_file = getattr(driver, '_daemon_lock', None)
+    if lock_file is not None:
+        driver._daemon_lock = None
+        _unlock(lock_file)
+
+
+def serve_browsers(count=1, base_port=9222, headless=False, lite_mode=False, state_file=DAEMON_STATE_FILE):
+    """Inicia count navegadores con depuración remota y los mantiene vivos hasta Ctrl+C"""
+    chrome_path = find_chrome_executable()
+    if not chrome_path:
+        print("❌ No se encontró el ejecutable de Chrome")
+        return 1
+
+    # Importación diferida: scraper_enhanced importa este módulo
+    from scraper_enhanced import LITE_CHROME_ARGUMENTS
+
+    processes = {}
+
+    def launch(index):
+        port = base_port + index
+        profile_dir = os.path.join(os.getcwd(), f"{DAEMON_PROFILE_PREFIX}_{index}")
+        arguments = [chrome_path, f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}"]
+        arguments += DAEMON_CHROME_ARGUMENTS
+        if lite_mode:
+            arguments += LITE_CHROME_ARGUMENTS
+        if headless:
+            arguments.append("--headless=new")
+        arguments.append("about:blank")
+
+        process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        processes[index] = (process, f"127.0.0.1:{port}")
+        return processes[index][1]
+
+    def write_state():
+        browsers = {address: process.pid for process, address in processes.values()}
+        write_daemon_state(browsers, lite_mode, state_file)
+
+    print(f"🚀 Iniciando {count} navegadores persistentes...")
+    for index in range(count):
+        launch(index)
+
+    for index, (process, address) in processes.items():
+        deadline = time.time() + 20
+        while time.time() < deadline and not is_debugger_alive(address):
+            time.sleep(0.2)
+        if is_debugger_alive(address):
+            print(f"   ✅ Navegador {index} escuchando en {address}")
+        else:
+            print(f"   ⚠️ Navegador {index} no respondió en {address}")
+
+    write_state()
+    print(f"💾 Direcciones publicadas en {state_file}")
+    print("💡 Conecta el scraper con: python scraper_enhanced.py --attach")
+    print("⏹️ Ctrl+C para detener")
+
+    try:
+        while True:
+            time.sleep(5)
+            # Relanzar los navegadores que se hayan cerrado
+            for index, (process, address) in list(processes.items()):
+                if process.poll() is not None:
+                    print(f"🔄 Navegador {index} terminó, relanzando en {address}...")
+                    launch(index)
+                    write_state()
+    except KeyboardInterrupt:
+        print("\n⚠️ Deteniendo navegadores persistentes...")
+    finally:
+        for process, _ in processes.values():
+            try:
+                process.terminate()
+                process.wait(timeout=10)
+            except Exception:
+                process.kill()
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        print("🔒 Navegadores cerrados")
+
+    return 0
@@ -0,0 +1,205 @@
+"""
+Pool de navegadores de larga vida compartido entre búsquedas.
+
+Arrancar Chrome (y parchear undetected-chromedriver) cuesta varios segundos y
+empieza siempre con la caché fría. El pool mantiene navegadores abiertos que
+las búsquedas toman prestados y devuelven: se verifica que sigan respondiendo
+antes de prestarlos y se reciclan después de cierto número de páginas.
+"""
+
+import atexit
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from chrome_profiles import profiles_root, POOL_PROFILE_PREFIX, DISCARDED_PROFILE_MARKER
+
+
+class _PooledDriver:
+    """Navegador del pool con su contador de páginas"""
+
+    def __init__(self, driver, slot):
+        self.driver = driver
+        self.slot = slot
+        self.pages = 0
+        self.created_at = time.time()
+
+
+class DriverPool:
+    """Pool de navegadores reutilizables con health-check y reciclaje"""
+
+    def __init__(self, factory, max_size=2, max_pages=200, profile_prefix=POOL_PROFILE_PREFIX):
+        """
+        factory: función que recibe un directorio de perfil y devuelve un driver.
+        max_size: máximo de navegadores abiertos a la vez.
+        max_pages: páginas servidas tras las cuales un navegador se recicla.
+        profile_prefix: nombre de los perfiles del pool dentro de temp_chrome_profiles/.
+            Los que empiezan con "pool_" sobreviven a la limpieza de huérfanos.
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.profile_prefix = profile_prefix
+
+        self._condition = threading.Condition()
+        self._entries = {}
+        self._idle = []
+        self._pending_slots = set()
+        self._recycled = 0
+
+        # Los navegadores no deben quedar huérfanos al terminar el proceso
+        atexit.register(self.close_all)
+
+    def _profile_dir(self, slot):
+        """Perfil de un lugar del pool; se reutiliza al reciclar para conservar la caché.
+
+        Vive junto a los demás perfiles, así se clona de la plantilla. La
+        limpieza de huérfanos no lo borra (prefijo pool_): el pool lo vuelve a
+        usar, con su caché, después de reiniciar el proceso.
+        """
+        return os.path.join(profiles_root(), f"{self.profile_prefix}_{slot}")
+
+    def _set_aside_profile(self, slot):
+        """Aparta el perfil de un lugar (renombrándolo) para que el próximo
+        navegador de ese lugar arranque desde la plantilla; devuelve la ruta
+        apartada a borrar, o None"""
+        profile_dir = self._profile_dir(slot)
+        if not os.path.exists(profile_dir):
+            return None
+        discarded = f"{profile_dir}{DISCARDED_PROFILE_MARKER}{uuid.uuid4().hex[:8]}"
+        try:
+            os.replace(profile_dir, discarded)
+        except OSError as e:
+            print(f"⚠️ No se pudo descartar el perfil {profile_dir}: {e}")
+            return None
+        return discarded
+
+    def _free_slot(self):
+        """Primer número de lugar que no está ocupado ni reservado"""
+        used = {entry.slot for entry in self._entries.values()} | self._pending_slots
+        slot = 0
+        while slot in used:
+            slot += 1
+        return slot
+
+    def _is_healthy(self, driver):
+        """Verifica que el navegador siga respondiendo"""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        """Cierra un navegador y lo saca del pool"""
+        self._entries.pop(id(entry.driver), None)
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """Presta un navegador sano, creando uno nuevo si hay lugar.
+
+        Si todos están ocupados espera hasta timeout segundos (None = sin límite)
+        y lanza TimeoutError si no se liberó ninguno.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+
+        with self._condition:
+            while True:
+                while self._idle:
+                    entry = self._idle.pop()
+                    if self._is_healthy(entry.driver):
+                        return entry.driver
+                    print(f"🩺 Navegador {entry.slot} del pool no responde, se reemplaza")
+                    self._discard(entry)
+
+                if len(self._entries) + len(self._pending_slots) < self.max_size:
+                    slot = self._free_slot()
+                    self._pending_slots.add(slot)
+                    break
+
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No hay navegadores libres en el pool")
+                self._condition.wait(remaining)
+
+        try:
+            print(f"🌐 Iniciando navegador {slot} del pool...")
+            driver = self.factory(self._profile_dir(slot))
+        except Exception:
+            with self._condition:
+                self._pending_slots.discard(slot)
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._pending_slots.discard(slot)
+            self._entries[id(driver)] = _PooledDriver(driver, slot)
+        return driver
+
+    def release(self, driver, recycle=False, fresh_profile=False):
+        """Devuelve un navegador al pool, reciclándolo si ya sirvió max_pages páginas.
+
+        Con recycle=True se cierra de inmediato (por ejemplo, si se colgó). Con
+        fresh_profile=True además se descarta su perfil, así el siguiente
+        navegador de ese lugar no hereda cookies ni almacenamiento (tras un
+        bloqueo de Maps).
+        """
+        discarded = None
+        with self._condition:
+            entry = self._entries.get(id(driver))
+            if entry is None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                return
+
+            if recycle or fresh_profile or entry.pages >= self.max_pages:
+                print(f"♻️ Reciclando navegador {entry.slot} del pool tras {entry.pages} páginas")
+                self._discard(entry)
+                self._recycled += 1
+                if fresh_profile:
+                    discarded = self._set_aside_profile(entry.slot)
+            else:
+                # Dejar una página vacía para que Maps no siga consumiendo CPU
+                try:
+                    driver.get("about:blank")
+                    self._idle.append(entry)
+                except Exception:
+                    self._discard(entry)
+
+            self._condition.notify()
+
+        if discarded:
+            shutil.rmtree(discarded, ignore_errors=True)
+
+    def record_page(self, driver):
+        """Cuenta una página servida por un navegador del pool"""
+        with self._condition:
+            entry = self._entries.get(id(driver))
+            if entry:
+                entry.pages += 1
+
+    def get_stats(self):
+        """Estado actual del pool"""
+        with self._condition:
+            return {
+                'open': len(self._entries),
+                'idle': len(self._idle),
+                'in_use': len(self._entries) - len(self._idle),
+                'recycled': self._recycled,
+                'max_size': self.max_size,
+                'max_pages': self.max_pages
+            }
+
+    def close_all(self):
+        """Cierra todos los navegadores del pool"""
+        with self._condition:
+            for entry in list(self._entries.values()):
+                self._discard(entry)
+            self._idle = []
+            self._condition.notify_all()
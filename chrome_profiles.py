@@ -0,0 +1,175 @@
+"""
+Perfiles de Chrome: plantilla precalentada y limpieza de perfiles huérfanos.
+
+Cada scraper usa un perfil propio en temp_chrome_profiles/<sesión>[_wN]. En
+lugar de arrancar con un perfil vacío (caché de disco, DNS y consentimiento de
+cookies en frío), el perfil nuevo se clona de temp_chrome_profiles/_template,
+que se prepara una vez con `python scraper_enhanced.py warm-profile`. En Linux
+la copia usa `cp --reflink=auto`, que en sistemas de archivos con copy-on-write
+(btrfs, xfs) es casi instantánea.
+
+Los perfiles que quedan de procesos que murieron sin cerrar Chrome se borran
+al iniciar: se consideran huérfanos si ningún Chrome vivo tiene su bloqueo y
+no se modificaron en los últimos minutos. Los perfiles de un DriverPool
+(pool_*) se conservan a propósito para reutilizar su caché tras un reinicio;
+solo se limpian los que el pool apartó al descartarlos.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from typing import List
+
+PROFILES_DIR = "temp_chrome_profiles"
+TEMPLATE_NAME = "_template"
+
+# Perfiles sueltos en el directorio de trabajo de versiones anteriores
+LEGACY_PROFILE_PREFIX = "temp_chrome_profile_"
+
+# Perfiles persistentes a propósito (serve-browser)
+PERSISTENT_PROFILE_PREFIXES = ("temp_chrome_profile_daemon",)
+
+# Perfiles de los lugares de un DriverPool (pool_<n>, pool_<config>_<n>) y
+# sufijo con el que el pool aparta los que descarta
+POOL_PROFILE_PREFIX = "pool"
+DISCARDED_PROFILE_MARKER = ".descartado_"
+
+# Archivos de bloqueo de Chrome que no deben copiarse de la plantilla
+LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+
+# Antigüedad mínima de un perfil sin bloqueo para considerarlo huérfano
+ORPHAN_MIN_AGE_SECONDS = 10 * 60
+
+_collected = False
+
+
+def profiles_root() -> str:
+    return os.path.join(os.getcwd(), PROFILES_DIR)
+
+
+def template_profile_dir() -> str:
+    return os.path.join(profiles_root(), TEMPLATE_NAME)
+
+
+def _remove_lock_files(profile_dir: str):
+    for name in LOCK_FILES:
+        path = os.path.join(profile_dir, name)
+        try:
+            if os.path.lexists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def clone_template_profile(profile_dir: str) -> bool:
+    """Crea profile_dir como copia de la plantilla, si hay plantilla y el perfil no existe"""
+    template = template_profile_dir()
+    if os.path.exists(profile_dir) or not os.path.isdir(template):
+        return False
+
+    start = time.time()
+    os.makedirs(os.path.dirname(profile_dir), exist_ok=True)
+    try:
+        if sys.platform.startswith('linux') and shutil.which('cp'):
+            subprocess.run(['cp', '-a', '--reflink=auto', template, profile_dir],
+                           check=True, capture_output=True)
+        else:
+            shutil.copytree(template, profile_dir, symlinks=True)
+    except Exception as e:
+        print(f"⚠️ No se pudo clonar el perfil plantilla, se usa uno vacío: {e}")
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        return False
+
+    _remove_lock_files(profile_dir)
+    print(f"🧬 Perfil clonado de la plantilla en {time.time() - start:.1f}s")
+    return True
+
+
+def publish_template_profile(built_dir: str):
+    """Reemplaza la plantilla por un perfil recién preparado (sin sus bloqueos)"""
+    _remove_lock_files(built_dir)
+    template = template_profile_dir()
+    old_template = f"{template}.old"
+    shutil.rmtree(old_template, ignore_errors=True)
+    if os.path.exists(template):
+        os.replace(template, old_template)
+    os.replace(built_dir, template)
+    shutil.rmtree(old_template, ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+
+
+def profile_in_use(profile_dir: str) -> bool:
+    """Hay un Chrome vivo usando el perfil (según sus archivos de bloqueo)"""
+    # Linux/macOS: SingletonLock es un enlace simbólico a "<host>-<pid>"
+    lock = os.path.join(profile_dir, "SingletonLock")
+    if os.path.islink(lock):
+        try:
+            host, _, pid = os.readlink(lock).rpartition('-')
+            if host != socket.gethostname():
+                return True
+            return _pid_alive(int(pid))
+        except (OSError, ValueError):
+            return True
+
+    # Windows: Chrome mantiene abierto "lockfile" y no se puede borrar
+    lockfile = os.path.join(profile_dir, "lockfile")
+    if os.path.exists(lockfile):
+        try:
+            os.remove(lockfile)
+        except OSError:
+            return True
+    return False
+
+
+def _candidate_profiles() -> List[str]:
+    """Perfiles temporales que podrían haber quedado huérfanos"""
+    candidates = []
+    root = profiles_root()
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            if name == TEMPLATE_NAME or name.startswith(f"{TEMPLATE_NAME}."):
+                continue
+            if name.startswith(f"{POOL_PROFILE_PREFIX}_") and DISCARDED_PROFILE_MARKER not in name:
+                continue
+            candidates.append(os.path.join(root, name))
+
+    for name in os.listdir(os.getcwd()):
+        if name.startswith(LEGACY_PROFILE_PREFIX) and not name.startswith(PERSISTENT_PROFILE_PREFIXES):
+            candidates.append(os.path.join(os.getcwd(), name))
+    return [path for path in candidates if os.path.isdir(path)]
+
+
+def collect_orphan_profiles(min_age_seconds: float = ORPHAN_MIN_AGE_SECONDS) -> int:
+    """Borra los perfiles temporales sin Chrome vivo; se ejecuta una vez por proceso"""
+    global _collected
+    if _collected:
+        return 0
+    _collected = True
+
+    removed = 0
+    now = time.time()
+    for path in _candidate_profiles():
+        try:
+            if now - os.path.getmtime(path) < min_age_seconds or profile_in_use(path):
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            removed += 1
+
+    if removed:
+        print(f"🧹 {removed} perfiles de Chrome huérfanos eliminados")
+    return removed
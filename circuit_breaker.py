@@ -0,0 +1,78 @@
+"""
+Detección de páginas de bloqueo y cortacircuitos por navegador.
+
+Cuando Maps responde con el muro de consentimiento, la página de "tráfico
+inusual" o un CAPTCHA, seguir navegando con el mismo navegador solo empeora
+el bloqueo. Cada navegador lleva su CircuitBreaker: tras `threshold` páginas
+bloqueadas seguidas se abre, el navegador se pausa (con espera creciente si
+vuelve a pasar) y se recicla, y la URL se devuelve a la cola para otro intento.
+"""
+
+import threading
+
+# Clasificación de una página recién navegada (CLASSIFY_PAGE_JS)
+PAGE_OK = 'ok'
+PAGE_CONSENT = 'consent'
+PAGE_BLOCKED = 'blocked'
+PAGE_NOT_FOUND = 'not_found'
+PAGE_TIMEOUT = 'timeout'
+
+# Veces que una URL bloqueada vuelve a la cola antes de darla por perdida
+MAX_BLOCK_RETRIES = 2
+
+# Espera (segundos) antes de reintentar una URL bloqueada con el mismo
+# navegador si el circuito no se abrió; se duplica en cada intento
+BLOCK_RETRY_DELAY = 5
+
+
+def block_retry_delay(attempt: int) -> float:
+    """Espera antes del reintento número attempt + 1 de una URL bloqueada"""
+    return BLOCK_RETRY_DELAY * 2 ** attempt
+
+
+class BlockedPageError(Exception):
+    """La página de un negocio quedó detrás de un consentimiento o un bloqueo"""
+
+    def __init__(self, state: str, url: str = None):
+        super().__init__(f"Página {state}: {url}")
+        self.state = state
+        self.url = url
+
+
+class CircuitBreaker:
+    """Cortacircuitos de un navegador: se abre tras varios bloqueos seguidos"""
+
+    def __init__(self, threshold: int = 2, cooldown: float = 30, max_cooldown: float = 300):
+        """
+        threshold: bloqueos seguidos que abren el circuito.
+        cooldown: pausa de la primera apertura; se duplica en cada apertura
+        consecutiva hasta max_cooldown.
+        """
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0
+        self.consecutive_trips = 0
+        self.trips = 0
+        # Tras una pausa el circuito queda "medio abierto": un solo bloqueo lo reabre
+        self.half_open = False
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.consecutive_trips = 0
+            self.half_open = False
+
+    def record_failure(self) -> float:
+        """Registra un bloqueo; devuelve los segundos de pausa si el circuito se abrió (0 si no)"""
+        with self._lock:
+            self.failures += 1
+            if self.failures < self.threshold and not self.half_open:
+                return 0
+            self.failures = 0
+            self.trips += 1
+            self.consecutive_trips += 1
+            self.half_open = True
+            return min(self.max_cooldown, self.cooldown * 2 ** (self.consecutive_trips - 1))
+
@@ -4,6 +4,7 @@ import json
 import pandas as pd
 from datetime import datetime
 import os
+import re
 from typing import List, Dict, Any, Optional
 
 class DatabaseManager:
@@ -338,6 +339,85 @@ class DatabaseManager:
             if 'cursor' in locals():
                 cursor.close()
     
+    def get_stale_businesses(self, max_age_days: float, search_name: Optional[str] = None,
+                             urls: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Recupera los negocios cuya fecha_extraccion supera la antigüedad indicada"""
+        if not self.connection or not self.connection.is_connected():
+            return []
+            
+        try:
+            cursor = self.connection.cursor(dictionary=True)
+            
+            query = "SELECT * FROM negocios WHERE fecha_extraccion < DATE_SUB(NOW(), INTERVAL %s SECOND)"
+            params = [int(max_age_days * 86400)]
+            
+            if search_name:
+                query += " AND busqueda = %s"
+                params.append(search_name)
+            
+            if urls:
+                query += " AND url_google_maps IN (" + ", ".join(["%s"] * len(urls)) + ")"
+                params.extend(urls)
+            
+            query += " ORDER BY fecha_extraccion ASC"
+            
+            cursor.execute(query, tuple(params))
+            return cursor.fetchall()
+            
+        except Error as e:
+            print(f"❌ Error obteniendo negocios desactualizados: {e}")
+            return []
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+    
+    def update_business(self, business_id: int, business_data: Dict[str, Any]) -> bool:
+        """Actualiza en su lugar los datos de un negocio existente"""
+        if not self.connection or not self.connection.is_connected():
+            return False
+            
+        try:
+            cursor = self.connection.cursor()
+            
+            # Convertir calificación a decimal si es posible
+            calificacion = None
+            try:
+                if business_data.get('calificacion') != 'No disponible':
+                    calificacion = float(business_data.get('calificacion', 0))
+            except (ValueError, TypeError):
+                calificacion = None
+            
+            update_query = """
+            UPDATE negocios
+            SET nombre = %s, calificacion = %s, num_reviews = %s, tipo = %s, direccion = %s,
+                telefono = %s, website = %s, email = %s, fecha_extraccion = %s
+            WHERE id = %s
+            """
+            
+            values = (
+                business_data.get('nombre', 'No disponible'),
+                calificacion,
+                business_data.get('num_reviews', 'No disponible'),
+                business_data.get('tipo', 'No disponible'),
+                business_data.get('direccion', 'No disponible'),
+                business_data.get('telefono', 'No disponible'),
+                business_data.get('website', 'No disponible'),
+                business_data.get('email', 'No disponible'),
+                business_data.get('fecha_extraccion', datetime.now()),
+                business_id
+            )
+            
+            cursor.execute(update_query, values)
+            self.connection.commit()
+            return cursor.rowcount > 0
+            
+        except Error as e:
+            print(f"❌ Error actualizando negocio: {e}")
+            return False
+        finally:
+            if 'cursor' in locals():
+                cursor.close()
+    
     def get_latest_session_backup(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Recupera el último respaldo de sesión"""
         if not self.connection or not self.connection.is_connected():
@@ -510,17 +590,53 @@ class LocalPersistence:
             print(f"❌ Error guardando sesión local: {e}")
             return None
     
+    def snapshot_path(self, session_id: str = "default") -> str:
+        """Archivo de la instantánea compactada de una sesión"""
+        return os.path.join(self.data_dir, f"session_{session_id}_snapshot.json")
+    
+    def _session_files(self, session_id: str) -> List[str]:
+        """Instantánea y respaldos con fecha de una sesión (no los de otras con el mismo prefijo)"""
+        pattern = re.compile(rf"^session_{re.escape(session_id)}_(snapshot|\d{{8}}_\d{{6}})\.json$")
+        return [f for f in os.listdir(self.data_dir) if pattern.match(f)]
+    
+    def has_session(self, session_id: str = "default") -> bool:
+        """Hay algún archivo guardado de la sesión"""
+        return bool(self._session_files(session_id))
+    
+    def save_snapshot(self, session_data: Dict[str, Any], session_id: str = "default") -> Optional[str]:
+        """Guarda la instantánea compactada de una sesión (un solo archivo, reemplazo atómico)"""
+        filename = self.snapshot_path(session_id)
+        temp_path = f"{filename}.tmp"
+        
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(session_data, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, filename)
+            
+            print(f"💾 Sesión compactada localmente: {filename}")
+            return filename
+            
+        except Exception as e:
+            print(f"❌ Error guardando instantánea de la sesión: {e}")
+            return None
+    
     def load_latest_session(self, session_id: str = "default") -> Optional[Dict[str, Any]]:
-        """Carga la sesión más reciente"""
+        """Carga la instantánea de la sesión, o su respaldo con fecha más reciente.
+        
+        No incluye los eventos del diario escritos después de la instantánea:
+        para eso se usa session_journal.restore_session.
+        """
         try:
-            pattern = f"session_{session_id}_*.json"
-            files = [f for f in os.listdir(self.data_dir) if f.startswith(f"session_{session_id}_")]
+            files = self._session_files(session_id)
             
             if not files:
                 return None
             
-            latest_file = max(files, key=lambda x: os.path.getctime(os.path.join(self.data_dir, x)))
-            filepath = os.path.join(self.data_dir, latest_file)
+            filepath = self.snapshot_path(session_id)
+            if not os.path.exists(filepath):
+                # Sesiones anteriores al diario: un JSON con fecha por guardado
+                latest_file = max(files, key=lambda x: os.path.getctime(os.path.join(self.data_dir, x)))
+                filepath = os.path.join(self.data_dir, latest_file)
             
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
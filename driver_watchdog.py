@@ -0,0 +1,180 @@
+"""
+Vigilancia de la salud de los navegadores en corridas largas.
+
+Con las horas un Chrome acumula memoria y sus cargas se vuelven más lentas, y
+de vez en cuando driver.get se queda colgado. El DriverWatchdog lleva por
+navegador las páginas servidas, la latencia de carga reciente y, cada tantas
+páginas, la memoria (RSS) del proceso del navegador y sus hijos. check()
+indica cuándo conviene reiniciarlo: tras N páginas, por memoria, por latencia
+sostenida muy por encima de la inicial o porque una carga superó el tope duro.
+
+La memoria se lee con psutil si está instalado y si no desde /proc (Linux).
+En un navegador del daemon (--attach) se mide el Chrome que publicó
+serve-browser; si no se conoce su PID, la memoria no se controla (el
+chromedriver local no es el proceso del navegador).
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Cargas con las que se fija la latencia de referencia de un navegador
+BASELINE_PAGES = 10
+
+
+def _browser_pid(driver) -> Optional[int]:
+    """PID del proceso de Chrome (undetected_chromedriver o daemon) o, si no, de chromedriver"""
+    pid = getattr(driver, 'browser_pid', None)
+    if pid or getattr(driver, 'daemon_address', None):
+        return pid
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return getattr(process, 'pid', None)
+
+
+def _proc_tree_rss_bytes(root_pid: int) -> int:
+    """RSS de un proceso y todos sus descendientes leyendo /proc"""
+    children = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(name))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def browser_rss_mb(driver) -> Optional[float]:
+    """Memoria residente del navegador y sus procesos hijos, en MB (None si no se puede medir)"""
+    pid = _browser_pid(driver)
+    if not pid:
+        return None
+
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    if os.path.isdir('/proc'):
+        total = _proc_tree_rss_bytes(pid)
+        return total / (1024 * 1024) if total else None
+    return None
+
+
+class DriverWatchdog:
+    """Decide cuándo reiniciar un navegador según páginas, memoria y latencia"""
+
+    def __init__(self, max_pages: int = 300, max_rss_mb: float = 1500, latency_factor: float = 2.5,
+                 page_load_timeout: float = 45, rss_every: int = 10):
+        """
+        max_pages: páginas servidas tras las que se reinicia (0 = sin límite).
+        max_rss_mb: memoria del navegador a partir de la que se reinicia (0 = sin límite).
+        latency_factor: se reinicia si la latencia reciente supera este múltiplo
+        de la latencia de sus primeras páginas.
+        page_load_timeout: tope duro de driver.get, en segundos.
+        rss_every: cada cuántas páginas se mide la memoria.
+        """
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.page_load_timeout = page_load_timeout
+        self.rss_every = max(1, rss_every)
+        self.peak_rss_mb = 0.0
+        self._drivers: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, driver) -> Dict[str, Any]:
+        return self._drivers.setdefault(id(driver), {
+            'pages': 0,
+            'baseline': [],
+            'recent': deque(maxlen=BASELINE_PAGES),
+            'hung': False,
+            'rss_checked_at': 0
+        })
+
+    def record_page(self, driver, seconds: float):
+        """Registra una página servida por el navegador y su tiempo de carga"""
+        with self._lock:
+            entry = self._entry(driver)
+            entry['pages'] += 1
+            if len(entry['baseline']) < BASELINE_PAGES:
+                entry['baseline'].append(seconds)
+            entry['recent'].append(seconds)
+
+    def mark_hung(self, driver):
+        """Una carga superó el tope duro: el navegador debe reiniciarse"""
+        with self._lock:
+            self._entry(driver)['hung'] = True
+
+    def is_hung(self, driver) -> bool:
+        with self._lock:
+            entry = self._drivers.get(id(driver))
+            return bool(entry and entry['hung'])
+
+    def check(self, driver) -> Optional[str]:
+        """Motivo para reiniciar el navegador, o None si está sano"""
+        with self._lock:
+            entry = self._drivers.get(id(driver))
+            if not entry:
+                return None
+            if entry['hung']:
+                return "carga colgada"
+            if self.max_pages and entry['pages'] >= self.max_pages:
+                return f"{entry['pages']} páginas servidas"
+
+            baseline = entry['baseline']
+            recent = entry['recent']
+            if len(baseline) == BASELINE_PAGES and entry['pages'] >= 2 * BASELINE_PAGES:
+                base = sum(baseline) / len(baseline)
+                current = sum(recent) / len(recent)
+                if base > 0 and current > self.latency_factor * base:
+                    return f"latencia {current:.1f}s (al inicio {base:.1f}s)"
+
+            measure_rss = self.max_rss_mb and entry['pages'] - entry['rss_checked_at'] >= self.rss_every
+            if measure_rss:
+                entry['rss_checked_at'] = entry['pages']
+
+        if measure_rss:
+            rss = browser_rss_mb(driver)
+            if rss:
+                with self._lock:
+                    self.peak_rss_mb = max(self.peak_rss_mb, rss)
+                if rss > self.max_rss_mb:
+                    return f"memoria {rss:.0f} MB"
+        return None
+
+    def forget(self, driver):
+        """Olvida un navegador cerrado"""
+        with self._lock:
+            self._drivers.pop(id(driver), None)
@@ -0,0 +1,177 @@
+"""
+Checkpoint de la frontera de URLs de cada búsqueda en curso.
+
+Mientras una búsqueda corre se guarda en session_data/frontier_<sesión>.json la
+lista de URLs descubiertas y el estado de cada una (pending/done/failed). Si el
+proceso muere, al repetir la búsqueda en la misma sesión se continúa desde ahí:
+sin volver a hacer scroll si la lista ya estaba completa y sin visitar de nuevo
+los negocios terminados.
+
+El checkpoint se escribe al descubrir URLs y con cada guardado de la sesión.
+Al reanudar, el scraper da por terminadas solo las URLs que tienen registro en
+la sesión cargada, así nunca se pierde un negocio cuyo registro no llegó al
+disco aunque el checkpoint lo marque como "done". Las URLs se comparan por
+clave de lugar: al repetir el scroll, el href de un mismo negocio puede traer
+otros parámetros de seguimiento o de posición del mapa.
+
+Una búsqueda cuya página no se pudo abrir queda en el checkpoint con el motivo
+y la cuenta de intentos; al llegar a MAX_OPEN_ATTEMPTS se descarta, así una
+búsqueda muerta no se reabre en cada reanudación.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from place_index import place_key
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+# Aperturas fallidas de la página de búsqueda antes de descartarla del checkpoint
+MAX_OPEN_ATTEMPTS = 3
+
+
+def frontier_key(url: str, search_name: str) -> str:
+    """Identificador de una búsqueda dentro del checkpoint"""
+    return f"{search_name}|{url}"
+
+
+def _same_place(url: str) -> str:
+    return place_key(url) or url
+
+
+class SearchFrontier:
+    """Frontera persistente de URLs por búsqueda, con su estado"""
+
+    def __init__(self, session_id: str, data_dir: str = "session_data"):
+        self.path = os.path.join(data_dir, f"frontier_{session_id}.json")
+        self.searches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Carga el checkpoint de la sesión si existe"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.searches = json.load(f)
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el checkpoint {self.path}: {e}")
+            self.searches = {}
+
+    def save(self):
+        """Escribe el checkpoint (reemplazo atómico); lo borra si no quedan búsquedas"""
+        with self._lock:
+            snapshot = json.dumps(self.searches, ensure_ascii=False)
+            empty = not self.searches
+
+        try:
+            if empty:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"❌ Error guardando el checkpoint de búsqueda: {e}")
+
+    def start(self, url: str, search_name: str, mode: str, max_results: int) -> Tuple[str, bool]:
+        """Registra una búsqueda o retoma la que quedó sin terminar.
+
+        Devuelve la clave de la búsqueda y si se está reanudando.
+        """
+        key = frontier_key(url, search_name)
+        with self._lock:
+            if key in self.searches:
+                return key, True
+            self.searches[key] = {
+                'url': url,
+                'busqueda': search_name,
+                'mode': mode,
+                'max_results': max_results,
+                'scroll_complete': False,
+                'started_at': datetime.now().isoformat(),
+                'urls': {},
+                'order': []
+            }
+        self.save()
+        return key, False
+
+    def add_urls(self, key: str, urls: List[str]):
+        """Agrega como pendientes las URLs de negocios nuevos y guarda el checkpoint"""
+        with self._lock:
+            entry = self.searches.get(key)
+            if entry is None:
+                return
+            known = {_same_place(url) for url in entry['urls']}
+            for url in urls:
+                place = _same_place(url)
+                if place not in known:
+                    known.add(place)
+                    entry['urls'][url] = PENDING
+                    entry['order'].append(url)
+        self.save()
+
+    def set_scroll_complete(self, key: str):
+        """Marca que la lista de resultados ya se recorrió completa"""
+        with self._lock:
+            entry = self.searches.get(key)
+            if entry is None:
+                return
+            entry['scroll_complete'] = True
+        self.save()
+
+    def mark(self, key: str, url: str, status: str):
+        """Cambia el estado del negocio de una URL (se persiste en el próximo save)"""
+        with self._lock:
+            entry = self.searches.get(key)
+            if entry is None:
+                return
+            if url not in entry['urls']:
+                place = _same_place(url)
+                url = next((known for known in entry['urls'] if _same_place(known) == place), url)
+            entry['urls'][url] = status
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.searches.get(key)
+
+    def record_open_failure(self, key: str, reason: str) -> Tuple[int, bool]:
+        """Anota que la página de la búsqueda no se pudo abrir.
+
+        Devuelve los intentos fallidos acumulados y si la búsqueda se descartó
+        del checkpoint por llegar a MAX_OPEN_ATTEMPTS.
+        """
+        with self._lock:
+            entry = self.searches.get(key)
+            if entry is None:
+                return 0, True
+            entry['open_failures'] = entry.get('open_failures', 0) + 1
+            entry['error'] = reason
+            attempts = entry['open_failures']
+            gave_up = attempts >= MAX_OPEN_ATTEMPTS
+            if gave_up:
+                self.searches.pop(key)
+        self.save()
+        return attempts, gave_up
+
+    def finish(self, key: str):
+        """Quita una búsqueda terminada del checkpoint"""
+        with self._lock:
+            self.searches.pop(key, None)
+        self.save()
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Búsquedas que quedaron a medias, con sus parámetros"""
+        with self._lock:
+            return [dict(entry) for entry in self.searches.values()]
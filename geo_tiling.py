@@ -0,0 +1,226 @@
+"""
+Búsqueda por mosaicos geográficos para superar el tope de resultados de Maps.
+
+Una URL de búsqueda deja de entregar resultados cerca de los 120 negocios. Para
+cubrir una ciudad completa se divide el área (bounding box) en mosaicos, cada
+uno con su propia URL `/maps/search/<término>/@lat,lng,zoomz`. Los mosaicos se
+recorren en paralelo con varios navegadores; los que llegan al tope se vuelven
+a dividir en cuatro. Los negocios se combinan por clave de lugar y se extraen
+una sola vez bajo un mismo nombre de búsqueda.
+"""
+
+import math
+import queue
+import threading
+import time
+from urllib.parse import quote_plus
+
+from place_index import place_key
+
+# Resultados de un mosaico a partir de los cuales se asume que hay más
+# negocios que los que Maps muestra y conviene subdividirlo
+DEFAULT_SPLIT_THRESHOLD = 100
+
+# Tope aproximado de la lista de resultados de Maps
+MAPS_FEED_CAP = 120
+
+# Ancho aproximado en píxeles de la zona visible del mapa
+VIEWPORT_PIXELS = 1000
+
+
+class BoundingBox:
+    """Rectángulo geográfico (sur, oeste, norte, este) en grados"""
+
+    def __init__(self, south, west, north, east):
+        if south >= north or west >= east:
+            raise ValueError("Bounding box inválido: se espera sur < norte y oeste < este")
+        self.south = south
+        self.west = west
+        self.north = north
+        self.east = east
+
+    @classmethod
+    def parse(cls, text):
+        """Lee "sur,oeste,norte,este" (por ejemplo "19.35,-99.20,19.45,-99.10")"""
+        parts = [float(part) for part in text.split(',')]
+        if len(parts) != 4:
+            raise ValueError("El bounding box debe tener 4 valores: sur,oeste,norte,este")
+        return cls(*parts)
+
+    @property
+    def center(self):
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    def split(self, rows=2, cols=2):
+        """Divide el rectángulo en rows x cols mosaicos"""
+        lat_step = (self.north - self.south) / rows
+        lng_step = (self.east - self.west) / cols
+        return [
+            BoundingBox(
+                self.south + row * lat_step,
+                self.west + col * lng_step,
+                self.south + (row + 1) * lat_step,
+                self.west + (col + 1) * lng_step
+            )
+            for row in range(rows)
+            for col in range(cols)
+        ]
+
+    def zoom(self):
+        """Zoom de Maps con el que el mosaico ocupa aproximadamente la vista"""
+        lat, _ = self.center
+        lng_span = self.east - self.west
+        # A igual zoom, un grado de latitud ocupa más pantalla lejos del ecuador
+        lat_span = (self.north - self.south) / max(math.cos(math.radians(lat)), 0.01)
+        span = max(lng_span, lat_span)
+        zoom = math.log2(360 * VIEWPORT_PIXELS / (256 * span))
+        return max(3, min(21, int(zoom)))
+
+    def __repr__(self):
+        return f"BoundingBox({self.south:.5f}, {self.west:.5f}, {self.north:.5f}, {self.east:.5f})"
+
+
+def tile_url(term, bbox):
+    """URL de búsqueda de Maps centrada en el mosaico"""
+    lat, lng = bbox.center
+    return f"https://www.google.com/maps/search/{quote_plus(term)}/@{lat:.6f},{lng:.6f},{bbox.zoom()}z"
+
+
+class TiledSearch:
+    """Recorre los mosaicos de un área y combina sus negocios por clave de lugar"""
+
+    def __init__(self, term, bbox, grid=2, split_threshold=DEFAULT_SPLIT_THRESHOLD, max_depth=3,
+                 num_browsers=2, mode="detail", scraper_options=None):
+        """
+        term: término de búsqueda ("restaurantes").
+        bbox: BoundingBox del área a cubrir.
+        grid: el área inicial se divide en grid x grid mosaicos.
+        split_threshold: resultados a partir de los que un mosaico se subdivide.
+        max_depth: niveles máximos de subdivisión.
+        num_browsers: navegadores que recorren mosaicos en paralelo.
+        mode: "detail" visita cada negocio; "list" usa las tarjetas de cada mosaico.
+        scraper_options: argumentos extra para los scrapers de descubrimiento.
+        """
+        self.term = term
+        self.bbox = bbox
+        self.grid = grid
+        self.split_threshold = split_threshold
+        self.max_depth = max_depth
+        self.num_browsers = max(1, num_browsers)
+        self.mode = mode
+        self.scraper_options = scraper_options or {}
+
+        self.places = {}
+        self.cards_by_url = {}
+        self.tile_stats = []
+        self._lock = threading.Lock()
+
+    def _merge(self, bbox, depth, urls, cards_by_url):
+        """Agrega los negocios de un mosaico, deduplicando por clave de lugar"""
+        new_places = 0
+        with self._lock:
+            for url in urls:
+                key = place_key(url) or url
+                if key in self.places:
+                    continue
+                self.places[key] = url
+                new_places += 1
+                if url in cards_by_url:
+                    self.cards_by_url[url] = cards_by_url[url]
+            self.tile_stats.append({
+                'bbox': repr(bbox),
+                'nivel': depth,
+                'resultados': len(urls),
+                'nuevos': new_places
+            })
+        return new_places
+
+    def _discovery_worker(self, worker_id, tile_queue):
+        """Hilo de descubrimiento: abre su navegador y hace scroll en cada mosaico"""
+        # Importación diferida: scraper_enhanced expone el subcomando que usa este módulo
+        from scraper_enhanced import GoogleMapsScraperEnhanced
+
+        try:
+            scraper = GoogleMapsScraperEnhanced(auto_save=False, **self.scraper_options)
+        except Exception as e:
+            print(f"❌ Navegador de mosaicos {worker_id} no pudo iniciar: {e}")
+            return
+
+        while True:
+            task = tile_queue.get()
+            if task is None:
+                tile_queue.task_done()
+                break
+
+            bbox, depth = task
+            try:
+                url = tile_url(self.term, bbox)
+                print(f"\n🧩 [Navegador {worker_id}] Mosaico nivel {depth}: {url}")
+                # Un mosaico sin resultados (zona vacía) no es un error
+                urls, cards_by_url = scraper.discover_urls(url, MAPS_FEED_CAP, read_cards=(self.mode == 'list'))
+                urls = urls or []
+
+                new_places = self._merge(bbox, depth, urls, cards_by_url)
+                print(f"   🧩 {len(urls)} resultados, {new_places} nuevos")
+
+                # El mosaico llegó al tope: dividirlo para ver los negocios ocultos
+                if len(urls) >= self.split_threshold and depth < self.max_depth:
+                    print(f"   ✂️ Subdividiendo mosaico ({len(urls)} resultados)")
+                    for child in bbox.split():
+                        tile_queue.put((child, depth + 1))
+            except Exception as e:
+                print(f"   ⚠️ [Navegador {worker_id}] Error en mosaico: {e}")
+            finally:
+                tile_queue.task_done()
+
+        scraper.close()
+
+    def discover(self):
+        """Recorre todos los mosaicos (con subdivisión adaptativa) y devuelve las URLs únicas"""
+        tile_queue = queue.Queue()
+        for bbox in self.bbox.split(self.grid, self.grid):
+            tile_queue.put((bbox, 0))
+
+        print(f"🗺️ Buscando '{self.term}' en {self.grid * self.grid} mosaicos con {self.num_browsers} navegadores...")
+        workers = []
+        for worker_id in range(1, self.num_browsers + 1):
+            worker = threading.Thread(
+                target=self._discovery_worker,
+                args=(worker_id, tile_queue),
+                daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+
+        # Esperar también a los mosaicos agregados al subdividir (mientras quede
+        # algún navegador vivo para procesarlos)
+        while tile_queue.unfinished_tasks and any(worker.is_alive() for worker in workers):
+            time.sleep(0.5)
+        if tile_queue.unfinished_tasks:
+            print(f"⚠️ {tile_queue.unfinished_tasks} mosaicos sin procesar: ningún navegador disponible")
+        for _ in workers:
+            tile_queue.put(None)
+        for worker in workers:
+            worker.join(timeout=30)
+
+        print(f"🏁 {len(self.tile_stats)} mosaicos recorridos, {len(self.places)} negocios únicos")
+        return list(self.places.values())
+
+    def run(self, scraper, search_name):
+        """Descubre los negocios del área y los extrae con el scraper principal.
+
+        Todos los negocios quedan registrados bajo search_name en la sesión
+        del scraper. Devuelve la lista de registros extraídos.
+        """
+        urls = self.discover()
+        if not urls:
+            print("❌ No se encontraron negocios en el área")
+            return []
+
+        return list(scraper.iter_place_urls(
+            urls,
+            search_name=search_name,
+            mode=self.mode,
+            cards_by_url=self.cards_by_url if self.mode == 'list' else None,
+            source_url=tile_url(self.term, self.bbox)
+        ))
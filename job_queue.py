@@ -0,0 +1,528 @@
+"""
+Cola de trabajos y de URLs con préstamos (leases) para repartir una campaña
+entre varias máquinas.
+
+Las tablas viven en la misma base MySQL del scraper (o en un archivo SQLite
+como respaldo, útil para probar con varios procesos en una sola máquina):
+
+- cola_trabajos: una fila por búsqueda de la campaña (URL, nombre, max_results).
+- cola_urls: las URLs de negocios descubiertas, únicas por campaña y clave de
+  lugar, así dos máquinas con búsquedas que se solapan no duplican negocios.
+
+Cada proceso toma filas con lease_*(), que las marca como prestadas a su
+worker_id con un vencimiento; mientras trabaja renueva el préstamo con
+heartbeat_*() y al terminar llama complete_*(). Si un proceso muere, su
+préstamo vence y otra máquina vuelve a tomar la fila (hasta max_attempts).
+
+Los vencimientos se calculan con la hora de la base de datos, no con la de
+cada máquina: un reloj local adelantado no puede robar un préstamo vigente ni
+uno atrasado mantener vivo el de un proceso muerto.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from place_index import place_key
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+DEFAULT_SQLITE_PATH = os.path.join("session_data", "job_queue.db")
+
+MYSQL_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS cola_trabajos (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        campana VARCHAR(100) NOT NULL,
+        url TEXT NOT NULL,
+        url_hash CHAR(40) NOT NULL,
+        busqueda VARCHAR(255) NOT NULL,
+        max_results INT NOT NULL DEFAULT 10,
+        modo VARCHAR(20) NOT NULL DEFAULT 'detail',
+        estado VARCHAR(20) NOT NULL DEFAULT 'pending',
+        worker_id VARCHAR(100) DEFAULT NULL,
+        lease_token VARCHAR(40) DEFAULT NULL,
+        lease_expira DOUBLE DEFAULT NULL,
+        intentos INT NOT NULL DEFAULT 0,
+        urls_descubiertas INT DEFAULT NULL,
+        error TEXT DEFAULT NULL,
+        creado DOUBLE NOT NULL,
+        actualizado DOUBLE NOT NULL,
+        UNIQUE KEY uq_trabajo (campana, busqueda, url_hash),
+        INDEX idx_estado (estado, lease_expira),
+        INDEX idx_lease_token (lease_token)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cola_urls (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        campana VARCHAR(100) NOT NULL,
+        trabajo_id INT NOT NULL,
+        busqueda VARCHAR(255) NOT NULL,
+        url TEXT NOT NULL,
+        place_key VARCHAR(255) NOT NULL,
+        estado VARCHAR(20) NOT NULL DEFAULT 'pending',
+        worker_id VARCHAR(100) DEFAULT NULL,
+        lease_token VARCHAR(40) DEFAULT NULL,
+        lease_expira DOUBLE DEFAULT NULL,
+        intentos INT NOT NULL DEFAULT 0,
+        error TEXT DEFAULT NULL,
+        creado DOUBLE NOT NULL,
+        actualizado DOUBLE NOT NULL,
+        UNIQUE KEY uq_lugar (campana, place_key),
+        INDEX idx_trabajo (trabajo_id),
+        INDEX idx_estado (estado, lease_expira),
+        INDEX idx_lease_token (lease_token)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """
+]
+
+SQLITE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS cola_trabajos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        campana TEXT NOT NULL,
+        url TEXT NOT NULL,
+        url_hash TEXT NOT NULL,
+        busqueda TEXT NOT NULL,
+        max_results INTEGER NOT NULL DEFAULT 10,
+        modo TEXT NOT NULL DEFAULT 'detail',
+        estado TEXT NOT NULL DEFAULT 'pending',
+        worker_id TEXT,
+        lease_token TEXT,
+        lease_expira REAL,
+        intentos INTEGER NOT NULL DEFAULT 0,
+        urls_descubiertas INTEGER,
+        error TEXT,
+        creado REAL NOT NULL,
+        actualizado REAL NOT NULL,
+        UNIQUE (campana, busqueda, url_hash)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_trabajos_estado ON cola_trabajos (estado, lease_expira)",
+    "CREATE INDEX IF NOT EXISTS idx_trabajos_token ON cola_trabajos (lease_token)",
+    """
+    CREATE TABLE IF NOT EXISTS cola_urls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        campana TEXT NOT NULL,
+        trabajo_id INTEGER NOT NULL,
+        busqueda TEXT NOT NULL,
+        url TEXT NOT NULL,
+        place_key TEXT NOT NULL,
+        estado TEXT NOT NULL DEFAULT 'pending',
+        worker_id TEXT,
+        lease_token TEXT,
+        lease_expira REAL,
+        intentos INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        creado REAL NOT NULL,
+        actualizado REAL NOT NULL,
+        UNIQUE (campana, place_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_urls_trabajo ON cola_urls (trabajo_id)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_estado ON cola_urls (estado, lease_expira)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_token ON cola_urls (lease_token)"
+]
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class JobQueue:
+    """Cola de trabajos y URLs con préstamos que vencen, sobre MySQL o SQLite"""
+
+    def __init__(self, mysql_config: Optional[Dict[str, Any]] = None, sqlite_path: str = DEFAULT_SQLITE_PATH,
+                 lease_seconds: int = 300, max_attempts: int = 3):
+        """
+        mysql_config: mismos parámetros que DatabaseManager; si falla se usa SQLite.
+        sqlite_path: archivo SQLite de respaldo (compartible entre procesos locales).
+        lease_seconds: duración de un préstamo sin heartbeat.
+        max_attempts: préstamos máximos de una fila antes de darla por fallida.
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.connection = None
+        self.backend = None
+        self._lock = threading.Lock()
+
+        if mysql_config:
+            try:
+                import mysql.connector
+                self.connection = mysql.connector.connect(**mysql_config, charset='utf8mb4',
+                                                          collation='utf8mb4_unicode_ci', autocommit=False)
+                self.backend = 'mysql'
+                print("✅ Cola de trabajos en MySQL")
+            except Exception as e:
+                print(f"⚠️ MySQL no disponible para la cola ({e}), usando SQLite")
+
+        if self.connection is None:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # isolation_level=None: las transacciones se abren a mano con BEGIN IMMEDIATE
+            self.connection = sqlite3.connect(sqlite_path, timeout=30, isolation_level=None,
+                                              check_same_thread=False)
+            self.connection.row_factory = sqlite3.Row
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.backend = 'sqlite'
+            print(f"✅ Cola de trabajos en SQLite: {sqlite_path}")
+
+        self.create_tables()
+
+    # --- SQL por motor ---------------------------------------------------
+
+    def _sql(self, query: str) -> str:
+        """Adapta los marcadores %s al motor en uso"""
+        return query if self.backend == 'mysql' else query.replace('%s', '?')
+
+    def _now_sql(self) -> str:
+        """Expresión SQL con la hora actual de la base, en segundos Unix con fracción"""
+        if self.backend == 'mysql':
+            return "UNIX_TIMESTAMP(NOW(6))"
+        return "((julianday('now') - 2440587.5) * 86400.0)"
+
+    def _cursor(self):
+        if self.backend == 'mysql':
+            return self.connection.cursor(dictionary=True)
+        return self.connection.cursor()
+
+    def _begin(self, cursor):
+        """Abre una transacción que bloquea la escritura hasta el commit"""
+        if self.backend == 'mysql':
+            self.connection.start_transaction()
+        else:
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def _commit(self, cursor):
+        if self.backend == 'mysql':
+            self.connection.commit()
+        else:
+            cursor.execute("COMMIT")
+
+    def _rollback(self, cursor):
+        try:
+            if self.backend == 'mysql':
+                self.connection.rollback()
+            else:
+                cursor.execute("ROLLBACK")
+        except Exception:
+            pass
+
+    def _execute(self, query: str, params=(), fetch: bool = False):
+        """Ejecuta una sentencia en su propia transacción"""
+        with self._lock:
+            cursor = self._cursor()
+            try:
+                self._begin(cursor)
+                cursor.execute(self._sql(query), params)
+                rows = [dict(row) for row in cursor.fetchall()] if fetch else cursor.rowcount
+                self._commit(cursor)
+                return rows
+            except Exception:
+                self._rollback(cursor)
+                raise
+            finally:
+                cursor.close()
+
+    def create_tables(self):
+        """Crea las tablas de la cola si no existen"""
+        with self._lock:
+            cursor = self.connection.cursor()
+            try:
+                for statement in (MYSQL_TABLES if self.backend == 'mysql' else SQLITE_TABLES):
+                    cursor.execute(statement)
+                if self.backend == 'mysql':
+                    self.connection.commit()
+            finally:
+                cursor.close()
+
+    # --- Préstamos genéricos ---------------------------------------------
+
+    def _lease(self, table: str, worker_id: str, limit: int, campaign: Optional[str]) -> List[Dict[str, Any]]:
+        """Presta atómicamente hasta `limit` filas pendientes o con préstamo vencido"""
+        now = self._now_sql()
+        token = uuid.uuid4().hex
+        campaign_filter = " AND campana = %s" if campaign else ""
+        campaign_params = (campaign,) if campaign else ()
+
+        claimable = (f"(estado = '{PENDING}' OR (estado = '{LEASED}' AND lease_expira < {now})) "
+                     f"AND intentos < %s{campaign_filter}")
+        claim_params = (self.max_attempts,) + campaign_params
+        assignment = (f"estado = %s, worker_id = %s, lease_token = %s, lease_expira = {now} + %s, "
+                      f"intentos = intentos + 1, actualizado = {now}")
+        assignment_params = (LEASED, worker_id, token, self.lease_seconds)
+
+        with self._lock:
+            cursor = self._cursor()
+            try:
+                self._begin(cursor)
+
+                # Filas cuyo préstamo venció sin intentos restantes: fallidas
+                cursor.execute(self._sql(
+                    f"UPDATE {table} SET estado = %s, error = %s, actualizado = {now} "
+                    f"WHERE estado = %s AND lease_expira < {now} AND intentos >= %s{campaign_filter}"
+                ), (FAILED, 'Préstamo vencido sin intentos restantes', LEASED, self.max_attempts)
+                    + campaign_params)
+
+                if self.backend == 'mysql':
+                    cursor.execute(
+                        f"UPDATE {table} SET {assignment} WHERE {claimable} ORDER BY id LIMIT %s",
+                        assignment_params + claim_params + (limit,)
+                    )
+                else:
+                    cursor.execute(self._sql(
+                        f"UPDATE {table} SET {assignment} WHERE id IN "
+                        f"(SELECT id FROM {table} WHERE {claimable} ORDER BY id LIMIT %s)"
+                    ), assignment_params + claim_params + (limit,))
+
+                cursor.execute(self._sql(f"SELECT * FROM {table} WHERE lease_token = %s ORDER BY id"), (token,))
+                rows = [dict(row) for row in cursor.fetchall()]
+                self._commit(cursor)
+                return rows
+            except Exception:
+                self._rollback(cursor)
+                raise
+            finally:
+                cursor.close()
+
+    def _heartbeat(self, table: str, ids: List[int], worker_id: str) -> int:
+        """Extiende el préstamo de filas que siguen a nombre de worker_id"""
+        if not ids:
+            return 0
+        placeholders = ", ".join(["%s"] * len(ids))
+        now = self._now_sql()
+        return self._execute(
+            f"UPDATE {table} SET lease_expira = {now} + %s, actualizado = {now} "
+            f"WHERE id IN ({placeholders}) AND worker_id = %s AND estado = %s",
+            (self.lease_seconds,) + tuple(ids) + (worker_id, LEASED)
+        )
+
+    def _complete(self, table: str, row_id: int, worker_id: str, error: Optional[str],
+                  extra_columns: str = "", extra_params=()) -> bool:
+        """Cierra una fila prestada; si falló vuelve a pendiente mientras queden intentos"""
+        now = self._now_sql()
+        if error is None:
+            status_sql = "%s"
+            status_params = (DONE,)
+        else:
+            status_sql = "CASE WHEN intentos >= %s THEN %s ELSE %s END"
+            status_params = (self.max_attempts, FAILED, PENDING)
+        updated = self._execute(
+            f"UPDATE {table} SET estado = {status_sql}, error = %s, lease_token = NULL, "
+            f"lease_expira = NULL, actualizado = {now}{extra_columns} "
+            f"WHERE id = %s AND worker_id = %s AND estado = %s",
+            status_params + (error,) + tuple(extra_params) + (row_id, worker_id, LEASED)
+        )
+        if not updated:
+            print(f"⚠️ La fila {row_id} de {table} ya no estaba prestada a {worker_id}")
+        return bool(updated)
+
+    # --- Trabajos ----------------------------------------------------------
+
+    def add_job(self, campaign: str, url: str, search_name: str, max_results: int = 10,
+                mode: str = 'detail') -> bool:
+        """Agrega una búsqueda a la campaña (se ignora si ya existe)"""
+        now = self._now_sql()
+        insert = "INSERT IGNORE" if self.backend == 'mysql' else "INSERT OR IGNORE"
+        return bool(self._execute(
+            f"{insert} INTO cola_trabajos (campana, url, url_hash, busqueda, max_results, modo, estado, "
+            f"creado, actualizado) VALUES (%s, %s, %s, %s, %s, %s, %s, {now}, {now})",
+            (campaign, url, _url_hash(url), search_name, max_results, mode, PENDING)
+        ))
+
+    def lease_job(self, worker_id: str, campaign: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Presta la siguiente búsqueda disponible"""
+        rows = self._lease('cola_trabajos', worker_id, 1, campaign)
+        return rows[0] if rows else None
+
+    def heartbeat_job(self, job_id: int, worker_id: str) -> bool:
+        return bool(self._heartbeat('cola_trabajos', [job_id], worker_id))
+
+    def complete_job(self, job_id: int, worker_id: str, discovered_urls: Optional[int] = None,
+                     error: Optional[str] = None) -> bool:
+        return self._complete('cola_trabajos', job_id, worker_id, error,
+                              ", urls_descubiertas = %s", (discovered_urls,))
+
+    # --- URLs -------------------------------------------------------------
+
+    def add_urls(self, job: Dict[str, Any], urls: List[str],
+                 worker_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Agrega las URLs descubiertas por un trabajo y devuelve las filas nuevas.
+
+        Una URL cuya clave de lugar ya está en la campaña (descubierta por otra
+        búsqueda u otra máquina) se ignora. Con worker_id las filas nuevas
+        quedan prestadas a ese worker (modo lista: las extrae él mismo y las
+        cierra con complete_url); si muere antes, su préstamo vence como el
+        de cualquier otra URL.
+        """
+        now = self._now_sql()
+        leased = worker_id is not None
+        token = uuid.uuid4().hex if leased else None
+        insert = "INSERT IGNORE" if self.backend == 'mysql' else "INSERT OR IGNORE"
+        query = self._sql(
+            f"{insert} INTO cola_urls (campana, trabajo_id, busqueda, url, place_key, estado, worker_id, "
+            f"lease_token, lease_expira, intentos, creado, actualizado) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, {now} + %s, %s, {now}, {now})"
+        )
+        lease_params = ((LEASED, worker_id, token, self.lease_seconds, 1) if leased
+                        else (PENDING, None, None, None, 0))
+        added = []
+        with self._lock:
+            cursor = self._cursor()
+            try:
+                self._begin(cursor)
+                for url in urls:
+                    key = place_key(url) or url
+                    cursor.execute(query, (job['campana'], job['id'], job['busqueda'], url, key) + lease_params)
+                    if cursor.rowcount:
+                        added.append({'id': cursor.lastrowid, 'url': url, 'place_key': key,
+                                      'busqueda': job['busqueda']})
+                self._commit(cursor)
+            except Exception:
+                self._rollback(cursor)
+                raise
+            finally:
+                cursor.close()
+        return added
+
+    def lease_urls(self, worker_id: str, limit: int = 5, campaign: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Presta hasta `limit` URLs de negocios para extraer"""
+        return self._lease('cola_urls', worker_id, limit, campaign)
+
+    def heartbeat_urls(self, url_ids: List[int], worker_id: str) -> int:
+        return self._heartbeat('cola_urls', url_ids, worker_id)
+
+    def complete_url(self, url_id: int, worker_id: str, error: Optional[str] = None) -> bool:
+        return self._complete('cola_urls', url_id, worker_id, error)
+
+    # --- Progreso ---------------------------------------------------------
+
+    def progress(self, campaign: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Estado de cada búsqueda con el conteo de sus URLs por estado"""
+        campaign_filter = "WHERE t.campana = %s" if campaign else ""
+        params = (campaign,) if campaign else ()
+        return self._execute(
+            f"SELECT t.id, t.campana, t.busqueda, t.estado, t.worker_id, t.intentos, t.urls_descubiertas, "
+            f"SUM(CASE WHEN u.estado = 'pending' THEN 1 ELSE 0 END) AS urls_pendientes, "
+            f"SUM(CASE WHEN u.estado = 'leased' THEN 1 ELSE 0 END) AS urls_prestadas, "
+            f"SUM(CASE WHEN u.estado = 'done' THEN 1 ELSE 0 END) AS urls_terminadas, "
+            f"SUM(CASE WHEN u.estado = 'failed' THEN 1 ELSE 0 END) AS urls_fallidas "
+            f"FROM cola_trabajos t LEFT JOIN cola_urls u ON u.trabajo_id = t.id "
+            f"{campaign_filter} GROUP BY t.id, t.campana, t.busqueda, t.estado, t.worker_id, "
+            f"t.intentos, t.urls_descubiertas ORDER BY t.id",
+            params, fetch=True
+        )
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class LeaseKeeper:
+    """Renueva en segundo plano el préstamo de filas mientras se trabajan"""
+
+    def __init__(self, renew, interval: float):
+        """renew: función sin argumentos que extiende el préstamo"""
+        self.renew = renew
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.renew()
+            except Exception as e:
+                print(f"⚠️ No se pudo renovar el préstamo: {e}")
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        return False
+
+
+def run_queue_worker(job_queue: JobQueue, scraper, worker_id: str, campaign: Optional[str] = None,
+                     url_batch: int = 5, wait_when_idle: bool = False, idle_seconds: float = 10):
+    """Toma trabajo de la cola hasta que no quede nada (o indefinidamente con wait_when_idle).
+
+    Primero atiende búsquedas: abre la lista, hace scroll y publica las URLs
+    nuevas en la cola de URLs. En modo lista arma los registros ahí mismo
+    desde las tarjetas y cierra cada URL al registrar su negocio; las que no
+    se pudieron armar (o quedaron abiertas si la búsqueda se cortó) vuelven a
+    la cola y se extraen después desde su página de detalle. Devuelve cuántos
+    negocios extrajo este proceso.
+    """
+    heartbeat_interval = max(5, job_queue.lease_seconds / 3)
+    extracted = 0
+
+    while True:
+        job = job_queue.lease_job(worker_id, campaign)
+        if job:
+            print(f"\n🔍 [{worker_id}] Búsqueda '{job['busqueda']}' (intento {job['intentos']})")
+            open_rows = {}
+            try:
+                with LeaseKeeper(lambda: job_queue.heartbeat_job(job['id'], worker_id), heartbeat_interval):
+                    urls, cards_by_url = scraper.discover_urls(job['url'], job['max_results'],
+                                                               read_cards=(job['modo'] == 'list'))
+                    if urls is None:
+                        raise RuntimeError("No se encontraron resultados iniciales")
+
+                    if job['modo'] == 'list':
+                        new_rows = job_queue.add_urls(job, urls, worker_id)
+                        open_rows = {row['url']: row for row in new_rows}
+                        ids = [row['id'] for row in new_rows]
+                        with LeaseKeeper(lambda: job_queue.heartbeat_urls(ids, worker_id), heartbeat_interval):
+                            for business_url, data, reason in scraper.extract_urls(
+                                    list(open_rows), job['busqueda'], mode='list',
+                                    cards_by_url=cards_by_url, source_url=job['url']):
+                                row = open_rows.pop(business_url)
+                                if data:
+                                    extracted += 1
+                                job_queue.complete_url(row['id'], worker_id, error=reason)
+                    else:
+                        new_rows = job_queue.add_urls(job, urls)
+
+                print(f"   📥 {len(urls)} URLs descubiertas, {len(new_rows)} nuevas en la campaña")
+                job_queue.complete_job(job['id'], worker_id, discovered_urls=len(urls))
+            except Exception as e:
+                print(f"   ❌ [{worker_id}] Búsqueda fallida: {e}")
+                for row in open_rows.values():
+                    job_queue.complete_url(row['id'], worker_id, error=f"Búsqueda interrumpida: {e}")
+                job_queue.complete_job(job['id'], worker_id, error=str(e))
+            continue
+
+        leased = job_queue.lease_urls(worker_id, url_batch, campaign)
+        if leased:
+            # Un lote puede mezclar URLs de varias búsquedas: se registran con la suya
+            rows_by_search = {}
+            for row in leased:
+                rows_by_search.setdefault(row['busqueda'], {})[row['url']] = row
+            ids = [row['id'] for row in leased]
+            with LeaseKeeper(lambda: job_queue.heartbeat_urls(ids, worker_id), heartbeat_interval):
+                for search_name, rows_by_url in rows_by_search.items():
+                    for business_url, data, reason in scraper.extract_urls(list(rows_by_url), search_name):
+                        if data:
+                            extracted += 1
+                        job_queue.complete_url(rows_by_url[business_url]['id'], worker_id, error=reason)
+            continue
+
+        if not wait_when_idle:
+            print(f"🏁 [{worker_id}] No queda trabajo en la cola")
+            return extracted
+        time.sleep(idle_seconds)
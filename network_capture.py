@@ -0,0 +1,247 @@
+"""
+Captura de las respuestas de red de Google Maps (búsqueda y lugar).
+
+Google Maps envía a la página los datos de cada negocio como JSON anidado en
+arreglos. En lugar de leerlos del DOM ya renderizado, este módulo los toma del
+log de rendimiento de Chrome (eventos de DevTools) y los decodifica.
+
+Las funciones de parseo son puras (reciben el texto de la respuesta), así que
+se pueden probar sin navegador. Los índices dentro de los arreglos
+corresponden a los payloads observados de Maps y pueden cambiar si Google
+modifica el formato.
+
+Las respuestas de tests/fixtures/network son sintéticas: se armaron a mano con
+la forma de esos payloads (marcadores XSSI, envoltura {"d": ...} y los mismos
+índices que lee parse_place_info), no son capturas reales recortadas. Prueban
+la decodificación y el recorrido de los arreglos, pero no detectan un cambio
+de formato de Google; para eso hay que reemplazarlas por capturas reales.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Marcadores anti-XSSI que Maps antepone (o agrega al final) al JSON
+XSSI_PREFIXES = (")]}'", '/*""*/')
+
+# Fragmentos de URL que identifican cada tipo de respuesta
+SEARCH_URL_MARKERS = ('/search?tbm=map', '/maps/search?', '&tbm=map')
+PLACE_URL_MARKERS = ('/maps/preview/place',)
+
+# Identificador del lugar ("0x...:0x...") dentro de las URLs /maps/place/
+FEATURE_ID_PATTERN = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)', re.IGNORECASE)
+
+
+def feature_id_from_url(url: str) -> Optional[str]:
+    """Extrae el identificador de lugar (!1s0x...:0x...) de una URL de Maps"""
+    match = FEATURE_ID_PATTERN.search(url or '')
+    return match.group(1).lower() if match else None
+
+
+def decode_maps_payload(body: str) -> Any:
+    """Decodifica una respuesta de Maps quitando los marcadores anti-XSSI.
+
+    Algunas respuestas vienen envueltas como {"c": ..., "d": ")]}'..."}/*""*/;
+    en ese caso se decodifica también el contenido de "d".
+    """
+    text = (body or '').strip()
+    for marker in XSSI_PREFIXES:
+        if text.startswith(marker):
+            text = text[len(marker):].strip()
+        if text.endswith(marker):
+            text = text[:-len(marker)].strip()
+
+    data = json.loads(text)
+    if isinstance(data, dict) and isinstance(data.get('d'), str):
+        return decode_maps_payload(data['d'])
+    return data
+
+
+def _dig(data: Any, *path: int) -> Any:
+    """Recorre índices anidados devolviendo None si alguno no existe"""
+    for index in path:
+        if not isinstance(data, list) or index >= len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def parse_place_info(info: List[Any]) -> Optional[Dict[str, Any]]:
+    """Convierte el arreglo de información de un lugar en campos crudos.
+
+    Devuelve las mismas claves que EXTRACT_DETAIL_FIELDS_JS (más feature_id),
+    listas para _apply_detail_fields del scraper.
+    """
+    if not isinstance(info, list):
+        return None
+
+    nombre = _dig(info, 11)
+    if not isinstance(nombre, str) or not nombre:
+        return None
+
+    fields = {
+        'nombre': nombre,
+        'feature_id': (_dig(info, 10) or '').lower() or None
+    }
+
+    rating = _dig(info, 4, 7)
+    reviews = _dig(info, 4, 8)
+    if rating is not None:
+        fields['calificacion'] = f"{rating} ({reviews})" if reviews is not None else str(rating)
+
+    categories = _dig(info, 13)
+    if isinstance(categories, list) and categories:
+        fields['tipo'] = categories[0]
+
+    address = _dig(info, 18)
+    if isinstance(address, str) and address:
+        if address.startswith(nombre + ','):
+            address = address[len(nombre) + 1:]
+        fields['direccion'] = address.strip()
+    else:
+        lines = _dig(info, 2)
+        if isinstance(lines, list) and lines:
+            fields['direccion'] = ', '.join(str(line) for line in lines)
+
+    phone = _dig(info, 178, 0, 0)
+    if isinstance(phone, str) and phone:
+        fields['telefono'] = phone
+
+    website = _dig(info, 7, 0)
+    if isinstance(website, str) and website:
+        fields['website'] = website
+
+    return fields
+
+
+def parse_search_response(body: str) -> List[Dict[str, Any]]:
+    """Extrae los negocios de una respuesta de búsqueda (tbm=map)"""
+    try:
+        data = decode_maps_payload(body)
+    except (ValueError, TypeError):
+        return []
+
+    entries = _dig(data, 0, 1)
+    if not isinstance(entries, list):
+        return []
+
+    records = []
+    for entry in entries:
+        fields = parse_place_info(_dig(entry, 14))
+        if fields:
+            records.append(fields)
+    return records
+
+
+def parse_place_response(body: str) -> Optional[Dict[str, Any]]:
+    """Extrae el negocio de una respuesta de lugar (/maps/preview/place)"""
+    try:
+        data = decode_maps_payload(body)
+    except (ValueError, TypeError):
+        return None
+    return parse_place_info(_dig(data, 6))
+
+
+def classify_response_url(url: str) -> Optional[str]:
+    """Indica si una URL de respuesta es de búsqueda ('search'), de lugar ('place') o ninguna"""
+    if any(marker in url for marker in PLACE_URL_MARKERS):
+        return 'place'
+    if any(marker in url for marker in SEARCH_URL_MARKERS):
+        return 'search'
+    return None
+
+
+class NetworkCapture:
+    """Lee del log de rendimiento de Chrome las respuestas de Maps y las decodifica"""
+
+    # Estado inicial de la página: la primera tanda de resultados viene
+    # incrustada en el HTML en lugar de llegar por XHR
+    INITIAL_STATE_JS = """
+    try {
+        return window.APP_INITIALIZATION_STATE[3][2];
+    } catch (e) {
+        return null;
+    }
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.records = {}
+        self._pending_requests = {}
+
+    @staticmethod
+    def logging_prefs():
+        """Capacidad de Chrome necesaria para habilitar el log de rendimiento"""
+        return {'performance': 'ALL'}
+
+    def _add_records(self, records):
+        """Agrega registros nuevos indexados por feature_id"""
+        added = []
+        for record in records:
+            if not record:
+                continue
+            key = record.get('feature_id') or record['nombre']
+            if key not in self.records:
+                self.records[key] = record
+                added.append(record)
+        return added
+
+    def read_initial_state(self):
+        """Decodifica los resultados incrustados en la página actual"""
+        try:
+            body = self.driver.execute_script(self.INITIAL_STATE_JS)
+        except Exception as e:
+            print(f"   ⚠️ No se pudo leer el estado inicial de la página: {e}")
+            return []
+
+        if not body:
+            return []
+        return self._add_records(parse_search_response(body))
+
+    def poll(self):
+        """Procesa los eventos nuevos del log y devuelve los negocios nuevos"""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            print(f"   ⚠️ Log de rendimiento no disponible: {e}")
+            return []
+
+        added = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.responseReceived':
+                kind = classify_response_url(params.get('response', {}).get('url', ''))
+                if kind:
+                    self._pending_requests[params.get('requestId')] = kind
+
+            elif method == 'Network.loadingFinished':
+                kind = self._pending_requests.pop(params.get('requestId'), None)
+                if not kind:
+                    continue
+                try:
+                    body = self.driver.execute_cdp_cmd(
+                        'Network.getResponseBody', {'requestId': params['requestId']}
+                    )['body']
+                except Exception:
+                    continue
+
+                if kind == 'search':
+                    added.extend(self._add_records(parse_search_response(body)))
+                else:
+                    added.extend(self._add_records([parse_place_response(body)]))
+
+        return added
+
+    def record_for_url(self, url):
+        """Busca el registro capturado que corresponde a una URL /maps/place/"""
+        feature_id = feature_id_from_url(url)
+        if feature_id:
+            return self.records.get(feature_id)
+        return None
@@ -0,0 +1,354 @@
+"""
+Selectores y scripts JavaScript que se ejecutan dentro de las páginas de Google Maps.
+
+Los scripts reciben los selectores como argumentos de execute_script, de modo que
+la extracción en una sola llamada usa exactamente las mismas listas de respaldo
+que la extracción elemento por elemento con Selenium.
+"""
+
+# Selectores de respaldo por campo de la página de detalle (en orden de prioridad)
+DETAIL_SELECTORS = {
+    'nombre': [
+        "h1.DUwDvf",
+        "h1[data-attrid='title']",
+        ".x3AX1-LfntMc-header-title-title"
+    ],
+    'calificacion': [
+        "div.F7nice",
+        ".MW4etd",
+        ".ceNzKf"
+    ],
+    'tipo': [
+        "button.DkEaL",
+        ".YhemCb"
+    ],
+    'direccion': [
+        "button[data-item-id='address']",
+        "[data-item-id='address'] .Io6YTe",
+        ".LrzXr"
+    ],
+    'telefono': [
+        "button[data-item-id^='phone:tel:']",
+        "[data-item-id*='phone'] .Io6YTe"
+    ],
+    'website': [
+        "a[data-item-id='authority']",
+        "a[href^='http']:not([href*='google.com'])"
+    ]
+}
+
+# De dónde se lee el valor de cada campo: texto visible, aria-label (con texto
+# como respaldo) o el href del enlace
+DETAIL_FIELD_SOURCES = {
+    'nombre': 'text',
+    'calificacion': 'text',
+    'tipo': 'text',
+    'direccion': 'label',
+    'telefono': 'label',
+    'website': 'href'
+}
+
+# Extrae todos los campos crudos de la página de detalle en una sola llamada.
+# arguments[0]: DETAIL_SELECTORS, arguments[1]: DETAIL_FIELD_SOURCES
+EXTRACT_DETAIL_FIELDS_JS = """
+var selectors = arguments[0];
+var sources = arguments[1];
+var result = {};
+
+Object.keys(selectors).forEach(function (field) {
+    var list = selectors[field];
+    for (var i = 0; i < list.length; i++) {
+        var element = document.querySelector(list[i]);
+        if (!element) {
+            continue;
+        }
+        var text = (element.innerText || '').trim();
+        if (sources[field] === 'href') {
+            result[field] = element.href || element.getAttribute('href');
+        } else if (sources[field] === 'label') {
+            result[field] = element.getAttribute('aria-label') || text;
+        } else {
+            result[field] = text;
+        }
+        break;
+    }
+});
+
+return result;
+"""
+
+# Instala (una sola vez por documento) un MutationObserver que acumula en un
+# buffer del lado de la página los enlaces /maps/place/ nuevos, y devuelve
+# únicamente los enlaces acumulados desde la llamada anterior.
+HARVEST_PLACE_LINKS_JS = """
+var state = window.__placeLinkHarvester;
+
+if (!state) {
+    state = window.__placeLinkHarvester = {seen: new Set(), buffer: []};
+
+    var consider = function (anchor) {
+        var href = anchor.href;
+        if (href && href.indexOf('/maps/place/') !== -1 && !state.seen.has(href)) {
+            state.seen.add(href);
+            state.buffer.push(href);
+        }
+    };
+
+    var collect = function (root) {
+        if (root.tagName === 'A') {
+            consider(root);
+        }
+        var anchors = root.querySelectorAll("a[href*='/maps/place/']");
+        for (var i = 0; i < anchors.length; i++) {
+            consider(anchors[i]);
+        }
+    };
+
+    collect(document);
+
+    state.observer = new MutationObserver(function (mutations) {
+        mutations.forEach(function (mutation) {
+            if (mutation.type === 'attributes') {
+                if (mutation.target.tagName === 'A') {
+                    consider(mutation.target);
+                }
+                return;
+            }
+            mutation.addedNodes.forEach(function (node) {
+                if (node.nodeType === 1) {
+                    collect(node);
+                }
+            });
+        });
+    });
+    state.observer.observe(document.body, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ['href']
+    });
+}
+
+var links = state.buffer;
+state.buffer = [];
+return links;
+"""
+
+# Scroll del panel de resultados y del último resultado visible en una sola llamada
+# arguments[0]: panel de resultados
+SCROLL_RESULTS_PANEL_JS = """
+var panel = arguments[0];
+panel.scrollBy(0, 800);
+var results = panel.querySelectorAll("a[href*='/maps/place/']");
+if (results.length) {
+    results[results.length - 1].scrollIntoView(true);
+}
+"""
+
+# Hay al menos un enlace de negocio en la página
+PLACE_LINKS_PRESENT_JS = """
+return document.querySelector("a[href*='/maps/place/']") !== null;
+"""
+
+# Tras un scroll: llegaron enlaces nuevos al buffer del observador o el feed
+# muestra el aviso de fin de lista
+NEW_RESULTS_READY_JS = """
+if (document.querySelector('span.HlvSq')) {
+    return true;
+}
+var state = window.__placeLinkHarvester;
+return !!state && state.buffer.length > 0;
+"""
+
+# Devuelve el primer selector del grupo que tiene coincidencias en la página,
+# o null si ninguno coincide. arguments[0]: lista de selectores
+FIRST_MATCHING_SELECTOR_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    if (document.querySelector(selectors[i])) {
+        return selectors[i];
+    }
+}
+return null;
+"""
+
+# Lee los datos visibles en las tarjetas de la lista de resultados, con las
+# mismas claves crudas que EXTRACT_DETAIL_FIELDS_JS. La calificación se arma
+# como "4.6 (152)" para pasar por el mismo parseo que la página de detalle.
+PARSE_RESULT_CARDS_JS = """
+var cards = document.querySelectorAll(".Nv2PK, div[role='article']");
+var seen = {};
+var result = [];
+
+for (var i = 0; i < cards.length; i++) {
+    var card = cards[i];
+    var link = card.querySelector("a[href*='/maps/place/']");
+    if (!link || !link.href || seen[link.href]) {
+        continue;
+    }
+    seen[link.href] = true;
+
+    var fields = {href: link.href};
+
+    var nameElement = card.querySelector('.qBF1Pd, .fontHeadlineSmall');
+    fields.nombre = nameElement ? nameElement.innerText.trim() : (link.getAttribute('aria-label') || '').trim();
+
+    var ratingElement = card.querySelector('.MW4etd');
+    var reviewsElement = card.querySelector('.UY7F9');
+    if (ratingElement) {
+        fields.calificacion = ratingElement.innerText.trim() + (reviewsElement ? ' ' + reviewsElement.innerText.trim() : '');
+    }
+
+    // Filas de información: "Categoría · $$ · Dirección"
+    var rows = card.querySelectorAll('.W4Efsd');
+    for (var j = 0; j < rows.length; j++) {
+        var row = rows[j];
+        if (row.querySelector('.W4Efsd') || (ratingElement && row.contains(ratingElement))) {
+            continue;
+        }
+        var parts = row.innerText.split('·').map(function (part) {
+            return part.trim();
+        }).filter(function (part) {
+            return part.length > 0;
+        });
+        if (parts.length < 2) {
+            continue;
+        }
+        fields.tipo = parts[0];
+        fields.direccion = parts[parts.length - 1];
+        break;
+    }
+
+    result.push(fields);
+}
+
+return result;
+"""
+
+# Bytes transferidos por el documento actual y sus recursos (Performance API).
+# Los recursos de otros orígenes sin Timing-Allow-Origin reportan 0, así que
+# el total es una cota inferior.
+PAGE_TRANSFER_BYTES_JS = """
+var total = 0;
+var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+for (var i = 0; i < entries.length; i++) {
+    total += entries[i].transferSize || 0;
+}
+return total;
+"""
+
+# Navegación sin bloqueo para la extracción en pestañas: marca el documento
+# actual con un token y cambia de página. El documento nuevo ya no tiene el
+# token, así se distingue de la página anterior que sigue visible mientras carga.
+# arguments[0]: token, arguments[1]: URL
+TAB_NAVIGATE_JS = """
+window.__tabNavigationToken = arguments[0];
+window.location.href = arguments[1];
+"""
+
+# Señales de las páginas que no son la ficha de un negocio: el muro de
+# consentimiento de cookies, la página de "tráfico inusual"/CAPTCHA y el aviso
+# de lugar inexistente. Los textos se buscan en minúsculas.
+PAGE_MARKERS = {
+    'consent_hosts': ['consent.google.'],
+    'consent_selectors': [
+        "form[action*='consent.google']",
+        "form[action*='/save'] button[aria-label*='Accept']",
+        "form[action*='/save'] button[aria-label*='Aceptar']"
+    ],
+    'blocked_urls': ['/sorry/', 'google.com/sorry'],
+    'blocked_selectors': [
+        "#captcha-form",
+        "form#captcha-form",
+        "iframe[src*='recaptcha']",
+        "div.g-recaptcha"
+    ],
+    'blocked_texts': [
+        'unusual traffic',
+        'tráfico inusual',
+        "not a robot",
+        'no soy un robot'
+    ],
+    'not_found_texts': [
+        "google maps can't find",
+        'google maps no puede encontrar',
+        'no se encontró el lugar'
+    ]
+}
+
+# Botones para aceptar el muro de consentimiento (en orden de prioridad)
+CONSENT_ACCEPT_SELECTORS = [
+    "form[action*='/save'] button[aria-label*='Accept all']",
+    "form[action*='/save'] button[aria-label*='Aceptar todo']",
+    "button[aria-label*='Accept all']",
+    "button[aria-label*='Aceptar todo']",
+    "form[action*='/save'] button"
+]
+
+# Clasifica la página actual: 'ok' (ficha del negocio), 'consent', 'blocked',
+# 'not_found', o null si todavía está cargando. Se define como función para
+# reutilizarla en la extracción por pestañas.
+_CLASSIFY_PAGE_FUNCTION = """
+function classifyPage(titleSelectors, markers) {
+    var href = location.href;
+    var i;
+    for (i = 0; i < markers.blocked_urls.length; i++) {
+        if (href.indexOf(markers.blocked_urls[i]) !== -1) {
+            return 'blocked';
+        }
+    }
+    for (i = 0; i < markers.consent_hosts.length; i++) {
+        if (location.hostname.indexOf(markers.consent_hosts[i]) === 0) {
+            return 'consent';
+        }
+    }
+    for (i = 0; i < titleSelectors.length; i++) {
+        if (document.querySelector(titleSelectors[i])) {
+            return 'ok';
+        }
+    }
+    for (i = 0; i < markers.consent_selectors.length; i++) {
+        if (document.querySelector(markers.consent_selectors[i])) {
+            return 'consent';
+        }
+    }
+    for (i = 0; i < markers.blocked_selectors.length; i++) {
+        if (document.querySelector(markers.blocked_selectors[i])) {
+            return 'blocked';
+        }
+    }
+    // Los textos solo se revisan con el documento completo (textContent no
+    // fuerza el cálculo del diseño como innerText)
+    if (document.readyState !== 'complete' || !document.body) {
+        return null;
+    }
+    var text = ((document.title || '') + ' ' + document.body.textContent).toLowerCase();
+    for (i = 0; i < markers.blocked_texts.length; i++) {
+        if (text.indexOf(markers.blocked_texts[i]) !== -1) {
+            return 'blocked';
+        }
+    }
+    for (i = 0; i < markers.not_found_texts.length; i++) {
+        if (text.indexOf(markers.not_found_texts[i]) !== -1) {
+            return 'not_found';
+        }
+    }
+    return null;
+}
+"""
+
+# arguments[0]: selectores del título, arguments[1]: PAGE_MARKERS
+CLASSIFY_PAGE_JS = _CLASSIFY_PAGE_FUNCTION + """
+return classifyPage(arguments[0], arguments[1]);
+"""
+
+# Estado de una pestaña: null mientras siga la página anterior o cargue la
+# nueva, y si no la clasificación de CLASSIFY_PAGE_JS.
+# arguments[0]: token de la navegación, arguments[1]: selectores del título,
+# arguments[2]: PAGE_MARKERS
+TAB_PAGE_STATE_JS = _CLASSIFY_PAGE_FUNCTION + """
+if (window.__tabNavigationToken === arguments[0] || location.href === 'about:blank') {
+    return null;
+}
+return classifyPage(arguments[1], arguments[2]);
+"""
@@ -0,0 +1,201 @@
+"""
+Clave canónica de lugar e índice persistente de negocios ya extraídos.
+
+Las URLs /maps/place/ de un mismo negocio cambian según la búsqueda (parámetros
+de seguimiento, posición del mapa, nombre codificado). La clave canónica sale
+del identificador estable que trae la URL: el CID (`?cid=` o `ludocid=`) o el
+feature id `!1s0x...:0x...`, cuya segunda mitad es el mismo CID en hexadecimal.
+
+El índice guarda por clave la fecha de la última extracción y sobrevive entre
+sesiones en session_data/place_index.json, para no volver a visitar negocios
+que ya tenemos (o hacerlo solo cuando sus datos son más viejos que un TTL).
+Varios scrapers (hilos de batch --parallel, procesos de queue work) comparten
+el archivo: cada guardado lo vuelve a leer bajo un bloqueo y combina las
+entradas, quedándose con la extracción más reciente de cada clave.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import unquote, urlparse
+
+from network_capture import feature_id_from_url
+
+PLACE_INDEX_FILE = os.path.join("session_data", "place_index.json")
+
+CID_PATTERN = re.compile(r'[?&](?:cid|ludocid)=(\d+)')
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def _locked(path: str):
+    """Bloqueo exclusivo entre procesos (e hilos) sobre <path>.lock"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", 'a+b') as lock_file:
+        if os.name == 'nt':
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def place_key(url: str) -> Optional[str]:
+    """Clave estable de un negocio a partir de cualquiera de sus URLs de Maps.
+
+    Devuelve "cid:<número>" cuando la URL trae el CID o el feature id, y si no
+    la ruta /maps/place/<nombre> sin parámetros como último recurso.
+    """
+    if not url:
+        return None
+
+    match = CID_PATTERN.search(url)
+    if match:
+        return f"cid:{int(match.group(1))}"
+
+    feature_id = feature_id_from_url(url)
+    if feature_id:
+        return f"cid:{int(feature_id.split(':')[1], 16)}"
+
+    path = urlparse(url).path
+    if '/maps/place/' in path:
+        name = path.split('/maps/place/', 1)[1].split('/', 1)[0]
+        if name:
+            return f"place:{unquote(name).replace('+', ' ').lower()}"
+    return None
+
+
+class PlaceIndex:
+    """Índice en disco de negocios extraídos con su fecha de extracción"""
+
+    def __init__(self, path: str = PLACE_INDEX_FILE, ttl_days: Optional[float] = None):
+        """
+        path: archivo JSON del índice.
+        ttl_days: antigüedad a partir de la cual un negocio conocido se vuelve a
+        extraer (None = nunca caduca).
+        """
+        self.path = path
+        self.ttl_days = ttl_days
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ No se pudo leer el índice de lugares {self.path}: {e}")
+            return {}
+
+    def load(self):
+        """Carga el índice desde disco si existe"""
+        self.entries = self._read_file()
+
+    @staticmethod
+    def _newer(entry: Dict[str, Any], other: Optional[Dict[str, Any]]) -> bool:
+        """entry tiene una extracción más reciente que other (fechas ISO comparables)"""
+        if not other:
+            return True
+        return str(entry.get('fecha_extraccion') or '') > str(other.get('fecha_extraccion') or '')
+
+    def save(self):
+        """Combina el índice con el del archivo y lo escribe si cambió.
+
+        Bajo un bloqueo de archivo se vuelve a leer lo que guardaron otros
+        scrapers, se conserva por clave la extracción más reciente y se
+        reemplaza el archivo de forma atómica. Las claves ajenas quedan
+        también en memoria.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self.entries)
+            self._dirty = False
+
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with _locked(self.path):
+                merged = self._read_file()
+                for key, entry in snapshot.items():
+                    if self._newer(entry, merged.get(key)):
+                        merged[key] = entry
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"❌ Error guardando el índice de lugares: {e}")
+            with self._lock:
+                self._dirty = True
+            return
+
+        with self._lock:
+            for key, entry in merged.items():
+                if self._newer(entry, self.entries.get(key)):
+                    self.entries[key] = entry
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Entrada del índice para una clave"""
+        if not key:
+            return None
+        with self._lock:
+            return self.entries.get(key)
+
+    def is_fresh(self, key: Optional[str]) -> bool:
+        """El negocio ya se extrajo y sus datos no superan el TTL"""
+        entry = self.get(key)
+        if not entry:
+            return False
+        if self.ttl_days is None:
+            return True
+        try:
+            extracted_at = datetime.fromisoformat(entry['fecha_extraccion'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return datetime.now() - extracted_at < timedelta(days=self.ttl_days)
+
+    def mark(self, key: Optional[str], business: Dict[str, Any]):
+        """Registra la extracción de un negocio"""
+        if not key:
+            return
+        fecha = business.get('fecha_extraccion') or datetime.now()
+        if isinstance(fecha, datetime):
+            fecha = fecha.isoformat()
+        with self._lock:
+            self.entries[key] = {
+                'fecha_extraccion': fecha,
+                'nombre': business.get('nombre'),
+                'busqueda': business.get('busqueda'),
+                'session_id': business.get('session_id'),
+                'url': business.get('url_google_maps')
+            }
+            self._dirty = True
+
+    def __len__(self):
+        return len(self.entries)
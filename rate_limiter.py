@@ -0,0 +1,154 @@
+"""
+Ritmo de navegación: límite de tasa y concurrencia adaptativa.
+
+- TokenBucket: limita las navegaciones por segundo del proceso. Una sola
+  instancia se comparte entre el navegador principal, las pestañas y los
+  workers, así el ritmo total no depende de cuántos navegadores haya.
+- AIMDController: decide cuántas páginas de detalle se cargan a la vez. Sube
+  de a uno mientras las cargas son rápidas y sin errores, y divide el límite
+  a la mitad cuando aparecen timeouts, páginas vacías o bloqueos (aumento
+  aditivo, disminución multiplicativa, como el control de congestión de TCP).
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Resultado de una carga de página, para el controlador de concurrencia
+OUTCOME_OK = 'ok'
+OUTCOME_TIMEOUT = 'timeout'
+OUTCOME_EMPTY = 'empty'
+OUTCOME_BLOCKED = 'blocked'
+OUTCOME_ERROR = 'error'
+OUTCOME_NOT_FOUND = 'not_found'
+
+FAILURE_OUTCOMES = {OUTCOME_TIMEOUT, OUTCOME_EMPTY, OUTCOME_BLOCKED, OUTCOME_ERROR}
+
+
+class TokenBucket:
+    """Cubeta de fichas: `rate` fichas por segundo con ráfagas de hasta `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("La tasa debe ser mayor que cero")
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Toma fichas esperando lo necesario; devuelve los segundos esperados"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return now - start
+                missing = (tokens - self.tokens) / self.rate
+            time.sleep(missing)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Toma fichas solo si hay disponibles, sin esperar"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+
+class AIMDController:
+    """Límite de cargas simultáneas que se ajusta según los resultados observados"""
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 4,
+                 target_latency: float = 6.0, decrease_factor: float = 0.5):
+        """
+        initial/minimum/maximum: límite de concurrencia inicial y sus cotas.
+        target_latency: segundos de carga por encima de los cuales no se sube.
+        decrease_factor: multiplicador del límite ante un fallo.
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.outcomes: Dict[str, int] = {}
+        self._since_decrease = 0
+        self._condition = threading.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def acquire(self):
+        """Espera un lugar libre bajo el límite actual"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Toma un lugar si hay uno libre, sin esperar"""
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, outcome: str, latency: Optional[float] = None):
+        """Libera el lugar y ajusta el límite según el resultado de la carga"""
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self._since_decrease += 1
+            previous = int(self.limit)
+
+            if outcome in FAILURE_OUTCOMES:
+                # Las cargas que ya estaban en curso al fallar no vuelven a
+                # recortar: una sola disminución por ventana de resultados
+                if self._since_decrease >= previous:
+                    decreased = max(self.minimum, self.limit * self.decrease_factor)
+                    if decreased < self.limit:
+                        self.decreases += 1
+                    self.limit = decreased
+                    self._since_decrease = 0
+            elif latency is None or latency <= self.target_latency:
+                # +1 por cada "ventana" completa de cargas exitosas
+                self.limit = min(self.maximum, self.limit + 1.0 / max(1, previous))
+
+            current = int(self.limit)
+            if current > previous:
+                self.increases += 1
+                print(f"📈 Concurrencia: {previous} → {current} páginas simultáneas")
+            elif current < previous:
+                print(f"📉 Concurrencia: {previous} → {current} páginas simultáneas ({outcome})")
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'limit': int(self.limit),
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'outcomes': dict(self.outcomes)
+            }
+
+
+def page_outcome(data: Optional[Dict[str, Any]]) -> str:
+    """Clasifica el resultado de extract_business_data para el controlador"""
+    if data is None:
+        return OUTCOME_TIMEOUT
+    if data.get('nombre') in (None, '', 'No disponible'):
+        return OUTCOME_EMPTY
+    return OUTCOME_OK
@@ -0,0 +1,141 @@
+"""
+Reintentos de las páginas de detalle que fallaron y archivo de fallas definitivas.
+
+- RetryQueue: cola en memoria de URLs que fallaron, cada una con su momento de
+  reintento (espera exponencial con algo de azar). Pasado el máximo de
+  intentos la URL ya no se vuelve a encolar.
+- DeadLetterFile: session_data/dead_letter.jsonl, una línea por negocio que
+  falló definitivamente con el motivo de la última falla. El subcomando
+  replay-failed vuelve a procesar solo esas URLs.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+DEAD_LETTER_FILE = os.path.join("session_data", "dead_letter.jsonl")
+
+
+class RetryQueue:
+    """Cola de reintentos con espera exponencial y tope de intentos"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 15, max_delay: float = 300):
+        """
+        max_attempts: intentos totales por URL, contando el primero.
+        base_delay: espera antes del segundo intento; se duplica en cada uno.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        self._counter = itertools.count()
+
+    def add(self, index: int, url: str, attempts: int, reason: str) -> Optional[float]:
+        """Programa el reintento de una URL que falló `attempts` veces.
+
+        Devuelve la espera en segundos, o None si ya no quedan intentos.
+        """
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        # ±20% para que los reintentos de varias URLs no caigan juntos
+        delay *= random.uniform(0.8, 1.2)
+        item = {'index': index, 'url': url, 'attempts': attempts, 'reason': reason}
+        heapq.heappush(self._heap, (time.time() + delay, next(self._counter), item))
+        return delay
+
+    def seconds_until_due(self) -> float:
+        """Segundos hasta el próximo reintento (0 si ya hay alguno vencido)"""
+        if not self._heap:
+            return 0
+        return max(0.0, self._heap[0][0] - time.time())
+
+    def pop_due(self) -> List[Dict[str, Any]]:
+        """Saca todos los reintentos cuyo momento ya llegó"""
+        now = time.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class DeadLetterFile:
+    """Archivo JSONL de negocios que fallaron todos sus intentos"""
+
+    def __init__(self, path: str = DEAD_LETTER_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def add(self, url: str, search_name: str, reason: str, attempts: int, session_id: str):
+        """Agrega una falla definitiva al final del archivo"""
+        entry = {
+            'url': url,
+            'busqueda': search_name,
+            'motivo': reason,
+            'intentos': attempts,
+            'session_id': session_id,
+            'fecha': datetime.now().isoformat()
+        }
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except Exception as e:
+                print(f"❌ Error escribiendo {self.path}: {e}")
+
+    def load(self, search_name: Optional[str] = None, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fallas registradas (la más reciente por URL), opcionalmente filtradas"""
+        if not os.path.exists(self.path):
+            return []
+        latest = {}
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    latest[entry.get('url')] = entry
+        return [
+            entry for entry in latest.values()
+            if (search_name is None or entry.get('busqueda') == search_name)
+            and (session_id is None or entry.get('session_id') == session_id)
+        ]
+
+    def remove(self, urls: Iterable[str], before: Optional[str] = None):
+        """Quita las entradas de esas URLs registradas antes de `before` (fecha ISO).
+
+        Así, al reintentar, se borran las fallas viejas pero no las que el
+        propio reintento acaba de registrar. Reemplazo atómico del archivo.
+        """
+        urls = set(urls)
+        if not urls or not os.path.exists(self.path):
+            return
+        with self._lock:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = [line for line in f if line.strip()]
+            kept = []
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                    if entry.get('url') in urls and (before is None or entry.get('fecha', '') < before):
+                        continue
+                except ValueError:
+                    pass
+                kept.append(line)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(temp_path, self.path)
@@ -10,26 +10,345 @@ from selenium.webdriver.common.action_chains import ActionChains
 import re
 import os
 import uuid
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
 from database_manager import DatabaseManager, LocalPersistence
+from network_capture import NetworkCapture
+from place_index import PlaceIndex, place_key
+from frontier import SearchFrontier, DONE, FAILED, MAX_OPEN_ATTEMPTS
+from rate_limiter import TokenBucket, AIMDController, page_outcome, OUTCOME_BLOCKED, OUTCOME_NOT_FOUND
+from retry_queue import RetryQueue, DeadLetterFile
+from session_journal import SessionJournal, restore_session, EVENT_BUSINESS, EVENT_SEARCH, EVENT_PENDING, EVENT_MYSQL
+from driver_watchdog import DriverWatchdog
+from chrome_profiles import (
+    clone_template_profile, collect_orphan_profiles, profiles_root,
+    template_profile_dir, publish_template_profile
+)
+from circuit_breaker import (
+    CircuitBreaker, BlockedPageError, MAX_BLOCK_RETRIES, block_retry_delay,
+    PAGE_OK, PAGE_CONSENT, PAGE_BLOCKED, PAGE_NOT_FOUND, PAGE_TIMEOUT
+)
+from browser_daemon import (
+    attach_chrome_driver, detach_chrome_driver, read_daemon_addresses, serve_browsers, DaemonBrowserBusy
+)
+from page_scripts import (
+    DETAIL_SELECTORS, DETAIL_FIELD_SOURCES, EXTRACT_DETAIL_FIELDS_JS,
+    HARVEST_PLACE_LINKS_JS, SCROLL_RESULTS_PANEL_JS, PLACE_LINKS_PRESENT_JS,
+    NEW_RESULTS_READY_JS, FIRST_MATCHING_SELECTOR_JS, PARSE_RESULT_CARDS_JS,
+    PAGE_TRANSFER_BYTES_JS,
+    TAB_NAVIGATE_JS,
+    TAB_PAGE_STATE_JS,
+    CLASSIFY_PAGE_JS, PAGE_MARKERS, CONSENT_ACCEPT_SELECTORS
+)
 import threading
+import queue
+import shutil
 import signal
 import sys
+import argparse
+import socket
+
+# Techo (en segundos) de cada espera por condición. Las esperas terminan en
+# cuanto la condición se cumple, el techo solo acota los casos lentos. Los
+# grupos de selectores comparten un solo presupuesto: una página donde no
+# coincide ninguno se abandona al agotar el techo del grupo.
+DEFAULT_WAIT_TIMEOUTS = {
+    'page_load': 15,   # document.readyState completo tras driver.get
+    'results': 15,     # cualquier selector de INITIAL_RESULT_SELECTORS
+    'scroll': 5,       # resultados nuevos tras cada scroll
+    'popup': 3,        # desaparición de un popup cerrado
+    'detail': 25       # cualquier selector de título en la página de detalle
+}
+
+# Recursos que el perfil "lite" bloquea vía DevTools: solo se lee texto, así
+# que imágenes, video, fuentes y mosaicos del mapa no hacen falta
+LITE_BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*googleusercontent.com*",
+    "*/maps/vt*", "*/maps/vt/*", "*/kh/v*", "*/maps/preview/photo*",
+    "*streetviewpixels*"
+]
+
+# Funciones de Chrome innecesarias para extraer datos en el perfil "lite"
+LITE_CHROME_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-notifications",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-default-browser-check"
+]
+
+# Selectores que indican que la lista de resultados ya se cargó
+INITIAL_RESULT_SELECTORS = [
+    "a[href*='/maps/place/']",
+    "div[role='article']",
+    ".Nv2PK"
+]
+
+# Campos que se comparan al refrescar un negocio para saber si cambió
+REFRESH_FIELDS = ['nombre', 'calificacion', 'num_reviews', 'tipo', 'direccion', 'telefono', 'website']
+
+
+def load_config(path="config.json"):
+    """Lee la configuración creada por setup.py (vacía si no existe)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ No se pudo leer {path}: {e}")
+        return {}
+
+
+def parse_datetime(value):
+    """Convierte fecha_extraccion (datetime o texto de un JSON de sesión) a datetime"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _normalize_field(value):
+    """Valor comparable de un campo (las calificaciones de MySQL vienen como Decimal)"""
+    if value is None:
+        return 'No disponible'
+    try:
+        return f"{float(value):.2f}"
+    except (TypeError, ValueError):
+        return str(value).strip()
+
+
+def apply_resource_blocking(driver):
+    """Bloquea vía DevTools los recursos que no aportan texto (perfil lite)"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LITE_BLOCKED_URL_PATTERNS})
+        print("🪶 Perfil ligero activo: imágenes, fuentes y mosaicos bloqueados")
+    except Exception as e:
+        print(f"⚠️ No se pudo activar el bloqueo de recursos: {e}")
+
+
+# undetected_chromedriver parchea y reescribe un único binario de chromedriver
+# compartido al iniciar cada navegador; ese paso no es seguro entre hilos
+# (arranques simultáneos fallan con "text file busy" o usan un binario a medio
+# parchear), así que los arranques del proceso se hacen de a uno
+_CHROME_START_LOCK = threading.Lock()
+
+def create_chrome_driver(profile_dir, capture_network=False, lite_mode=False, headless=False):
+    """Configura e inicia Chrome con undetected_chromedriver.
+    
+    Es independiente del scraper para que un DriverPool pueda crear
+    navegadores sin instanciar GoogleMapsScraperEnhanced.
+    """
+    # Un perfil nuevo arranca como copia de la plantilla precalentada (si existe)
+    clone_template_profile(profile_dir)
+    
+    options = uc.ChromeOptions()
+    if capture_network:
+        options.set_capability('goog:loggingPrefs', NetworkCapture.logging_prefs())
+    
+    # Configuraciones estables
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-plugins-discovery")
+    options.add_argument("--disable-web-security")
+    options.add_argument("--allow-running-insecure-content")
+    options.add_argument("--no-first-run")
+    options.add_argument("--disable-default-apps")
+    
+    # Las pestañas en segundo plano deben cargar a la misma velocidad (extracción en pestañas)
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    
+    # User-Agent más realista
+    options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    
+    if lite_mode:
+        for argument in LITE_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+    
+    try:
+        print("✅ Configurando Undetected ChromeDriver...")
+        
+        # Directorio temporal para datos del usuario
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        
+        with _CHROME_START_LOCK:
+            driver = uc.Chrome(
+                options=options,
+                version_main=None,
+                driver_executable_path=None,
+                use_subprocess=False,
+                headless=headless
+            )
+        if lite_mode:
+            apply_resource_blocking(driver)
+        
+        print("✅ Chrome iniciado correctamente")
+        return driver
+        
+    except Exception as e:
+        print(f"❌ Error configurando Undetected ChromeDriver: {e}")
+        print("\n🔄 Intentando configuración alternativa...")
+        try:
+            options = uc.ChromeOptions()
+            if capture_network:
+                options.set_capability('goog:loggingPrefs', NetworkCapture.logging_prefs())
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+            options.add_argument("--headless")
+            
+            with _CHROME_START_LOCK:
+                driver = uc.Chrome(options=options)
+            if lite_mode:
+                apply_resource_blocking(driver)
+            print("✅ Chrome iniciado en modo alternativo")
+            return driver
+            
+        except Exception as e2:
+            print(f"❌ Error en configuración alternativa: {e2}")
+            raise
+
 
 class GoogleMapsScraperEnhanced:
-    def __init__(self, auto_save=True, mysql_config=None, session_id=None):
+    def __init__(self, auto_save=True, mysql_config=None, session_id=None, num_workers=1,
+                 extraction_mode='js', wait_timeouts=None, capture_network=False,
+                 lite_mode=False, headless=False, driver_pool=None, browser_addresses=None,
+                 num_tabs=1, skip_known_places=False, place_ttl_days=None,
+                 requests_per_second=None, adaptive_concurrency=False, rate_limiter=None,
+                 extract_attempts=3, retry_delay=15,
+                 max_pages_per_driver=300, max_driver_rss_mb=1500, page_load_timeout=45):
         """Inicializa el scraper con capacidades mejoradas de persistencia"""
         self.driver = None
         self.wait = None
         self.auto_save = auto_save
         self.session_id = session_id or str(uuid.uuid4())[:8]
         
+        # Navegadores en paralelo para las páginas de detalle
+        self.num_workers = max(1, int(num_workers or 1))
+        
+        # Pestañas del navegador principal que cargan páginas de detalle a la vez
+        # (concurrencia sin el costo de memoria de otro Chrome)
+        self.num_tabs = max(1, int(num_tabs or 1))
+        
+        # 'js' extrae todos los campos con una sola llamada a execute_script,
+        # 'dom' consulta cada selector por separado con Selenium
+        self.extraction_mode = extraction_mode
+        
+        # Perfil ligero: bloquea imágenes, fuentes y mosaicos del mapa
+        self.lite_mode = lite_mode
+        self.headless = headless
+        
+        # Pool de navegadores de larga vida (opcional): si se indica, los
+        # navegadores se toman prestados y se devuelven en lugar de crearse
+        self.driver_pool = driver_pool
+        
+        # Navegadores persistentes del daemon (serve-browser): el principal usa
+        # la primera dirección y cada worker la siguiente que quede libre
+        self.browser_addresses = list(browser_addresses or [])
+        self._attached_drivers = set()
+        
+        # Índice persistente de negocios ya extraídos (por clave canónica de lugar).
+        # Con skip_known_places=True no se vuelven a visitar los que tengan datos
+        # más recientes que place_ttl_days (None = nunca caducan)
+        self.place_index = PlaceIndex(ttl_days=place_ttl_days)
+        self.skip_known_places = skip_known_places
+        
+        # Checkpoint de las URLs descubiertas y su estado, para reanudar búsquedas
+        self.frontier = SearchFrontier(self.session_id)
+        
+        # Captura de respuestas de red de Maps (necesaria para mode="network")
+        self.capture_network = capture_network
+        self.network_capture = None
+        
+        # Esperas por condición con techo configurable y tiempo acumulado
+        self.wait_timeouts = dict(DEFAULT_WAIT_TIMEOUTS)
+        if wait_timeouts:
+            self.wait_timeouts.update(wait_timeouts)
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'waits': {},
+            'pages': {'count': 0, 'load_seconds': 0.0, 'bytes': 0},
+            'page_states': {},
+            'circuit_trips': 0,
+            'retries': 0,
+            'dead_letters': 0,
+            'driver_restarts': 0
+        }
+        
+        # Vigilancia de los navegadores: tope duro de carga y reinicio tras N
+        # páginas, por memoria o por latencia creciente (corridas largas)
+        self.watchdog = DriverWatchdog(
+            max_pages=max_pages_per_driver,
+            max_rss_mb=max_driver_rss_mb,
+            page_load_timeout=page_load_timeout
+        )
+        
+        # Reintentos con espera creciente de las páginas de detalle que fallan;
+        # las que agotan extract_attempts quedan en session_data/dead_letter.jsonl
+        self.extract_attempts = max(1, int(extract_attempts or 1))
+        self.retry_delay = retry_delay
+        self.dead_letters = DeadLetterFile()
+        self._failure_reasons = {}
+        
+        # Error que cortó la última búsqueda de iter_businesses (None si terminó
+        # bien); la búsqueda entrega lo que alcanzó a extraer y no relanza
+        self.last_search_error = None
+        
+        # Cortacircuitos del navegador principal (cada worker tiene el suyo) y
+        # última clasificación de página vista por cada hilo
+        self.circuit_breaker = CircuitBreaker()
+        self._thread_state = threading.local()
+        
+        # Límite de navegaciones por segundo de todo el proceso (None = sin límite).
+        # Se puede pasar un TokenBucket ya creado para compartirlo entre scrapers
+        self.rate_limiter = rate_limiter
+        if self.rate_limiter is None and requests_per_second:
+            self.rate_limiter = TokenBucket(requests_per_second, burst=max(self.num_workers, self.num_tabs))
+        
+        # Concurrencia adaptativa de las páginas de detalle: arranca con la mitad
+        # de los navegadores/pestañas y sube o baja según las cargas observadas
+        self.concurrency = None
+        if adaptive_concurrency:
+            max_parallel = max(self.num_workers, self.num_tabs)
+            self.concurrency = AIMDController(
+                initial=max(1, max_parallel // 2),
+                maximum=max_parallel,
+                target_latency=self.wait_timeouts['detail'] / 2
+            )
+        
         # Sistema de persistencia
         self.db_manager = None
         self.local_persistence = LocalPersistence()
         self.extracted_businesses = []
         self.search_history = []
         
+        # Diario de la sesión: cada auto-guardado escribe solo lo nuevo y la
+        # sesión completa se reescribe únicamente al compactar
+        self.journal = SessionJournal(self.session_id, self.local_persistence.data_dir, enabled=self.auto_save)
+        self._session_lock = threading.RLock()
+        
+        # Si la sesión ya tiene datos guardados, la instantánea no se reescribe
+        # hasta cargarlos con load_previous_session (los nuevos van al diario)
+        self._session_loaded = not (self.journal.size() or self.local_persistence.has_session(self.session_id))
+        
+        # Páginas de detalle pendientes de una segunda pasada (modo lista)
+        self.pending_enrichment = []
+        
         # Configurar base de datos si está disponible
         if mysql_config:
             self.db_manager = DatabaseManager(**mysql_config)
@@ -40,19 +359,25 @@ class GoogleMapsScraperEnhanced:
                 print("⚠️ MySQL no disponible, usando solo persistencia local")
                 self.db_manager = None
         
+        # Perfiles de Chrome que dejaron procesos anteriores que no cerraron bien
+        collect_orphan_profiles()
+        
         # Timer para auto-guardado periódico
         self.auto_save_timer = None
         if self.auto_save:
             self._start_auto_save_timer()
         
         self.setup_driver()
+        
+        if self.capture_network:
+            self.network_capture = NetworkCapture(self.driver)
     
     def _signal_handler(self, signum, frame):
         """Maneja interrupciones del sistema para guardar datos"""
         print(f"\n🚨 Interrupción detectada (señal {signum})")
         print("💾 Guardando datos antes de cerrar...")
         
-        self._save_current_session()
+        self._save_current_session(compact=True)
         self.close()
         
         print("✅ Datos guardados. Cerrando aplicación...")
@@ -75,138 +400,478 @@ class GoogleMapsScraperEnhanced:
         self.auto_save_timer.start()
         print("⏰ Auto-guardado activado (cada 2 minutos)")
     
-    def _save_current_session(self):
-        """Guarda la sesión actual en MySQL y localmente"""
+    def _save_current_session(self, compact=False):
+        """Guarda lo nuevo de la sesión en MySQL y localmente.
+        
+        Los negocios y búsquedas ya quedaron en el diario al registrarse; aquí
+        se suben a MySQL los nuevos y solo se reescribe la sesión completa
+        (instantánea JSON, CSV y respaldo en MySQL) al compactar: cuando se pide
+        o cuando el diario ya pesa tanto como la última instantánea.
+        """
         if not self.extracted_businesses and not self.search_history:
             return
         
+        with self._session_lock:
+            # Guardar en MySQL si está disponible
+            if self.db_manager:
+                try:
+                    # Guardar negocios en lotes si hay muchos nuevos
+                    new_businesses = [b for b in self.extracted_businesses if not b.get('saved_to_db', False)]
+                    if new_businesses:
+                        saved_count = self.db_manager.save_businesses_batch(new_businesses)
+                        # Marcar como guardados
+                        for business in new_businesses:
+                            business['saved_to_db'] = True
+                        print(f"💾 {saved_count} negocios nuevos guardados en MySQL")
+                    
+                    # Guardar historial de búsquedas nuevas
+                    new_searches = [s for s in self.search_history if not s.get('saved_to_db', False)]
+                    for search in new_searches:
+                        self.db_manager.save_search_history(search)
+                        search['saved_to_db'] = True
+                    
+                    if new_businesses or new_searches:
+                        self.journal.append(EVENT_MYSQL, {
+                            'negocios': len(self.extracted_businesses),
+                            'busquedas': len(self.search_history)
+                        })
+                    
+                except Exception as e:
+                    print(f"⚠️ Error guardando en MySQL: {e}")
+            
+            if compact or self.journal.needs_compaction():
+                self._compact_session()
+            else:
+                self.journal.sync()
+        
+        self.place_index.save()
+        self.frontier.save()
+
+    def _compact_session(self):
+        """Escribe la instantánea completa de la sesión y vacía el diario"""
+        if not self._session_loaded:
+            # Reescribirla con solo lo de esta ejecución perdería lo guardado
+            # antes; el diario sigue acumulando y la carga combina ambos
+            print(f"⚠️ La sesión {self.session_id} ya tenía datos guardados y no se cargó: "
+                  f"no se compacta (lo nuevo queda en el diario)")
+            self.journal.sync()
+            return
+        
+        epoch = self.journal.epoch + 1
         session_data = {
             'session_id': self.session_id,
             'extracted_businesses': self.extracted_businesses,
             'search_history': self.search_history,
+            'pending_enrichment': self.pending_enrichment,
             'timestamp': datetime.now().isoformat(),
-            'total_businesses': len(self.extracted_businesses)
+            'total_businesses': len(self.extracted_businesses),
+            'journal_epoch': epoch
         }
         
-        # Guardar en MySQL si está disponible
+        # Guardar respaldo de sesión en MySQL
         if self.db_manager:
             try:
-                # Guardar negocios en lotes si hay muchos nuevos
-                new_businesses = [b for b in self.extracted_businesses if not b.get('saved_to_db', False)]
-                if new_businesses:
-                    saved_count = self.db_manager.save_businesses_batch(new_businesses)
-                    # Marcar como guardados
-                    for business in new_businesses:
-                        business['saved_to_db'] = True
-                    print(f"💾 {saved_count} negocios nuevos guardados en MySQL")
-                
-                # Guardar respaldo de sesión
                 self.db_manager.save_session_backup(self.session_id, session_data)
-                
-                # Guardar historial de búsquedas nuevas
-                new_searches = [s for s in self.search_history if not s.get('saved_to_db', False)]
-                for search in new_searches:
-                    self.db_manager.save_search_history(search)
-                    search['saved_to_db'] = True
-                
             except Exception as e:
-                print(f"⚠️ Error guardando en MySQL: {e}")
+                print(f"⚠️ Error guardando respaldo en MySQL: {e}")
         
-        # Guardar localmente como respaldo
-        self.local_persistence.save_session(session_data, self.session_id)
+        # Guardar localmente; el diario solo se vacía si la instantánea quedó escrita
+        snapshot = self.local_persistence.save_snapshot(session_data, self.session_id)
+        if not snapshot:
+            return
+        self.journal.reset(epoch, os.path.getsize(snapshot))
         
-        # Guardar CSV de respaldo
+        # Guardar CSV de respaldo (siempre el mismo archivo por sesión)
         if self.extracted_businesses:
-            self.local_persistence.save_csv_backup(
-                self.extracted_businesses, 
-                f"autosave_{self.session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            )
-
+            self.local_persistence.save_csv_backup(self.extracted_businesses, f"autosave_{self.session_id}.csv")
+    
     def load_previous_session(self, session_id=None):
-        """Carga una sesión anterior"""
+        """Carga una sesión anterior: la última instantánea más los eventos de su diario"""
         target_session_id = session_id or self.session_id
+        journal = self.journal
+        if target_session_id != self.session_id:
+            journal = SessionJournal(target_session_id, self.local_persistence.data_dir, enabled=False)
         
-        # Intentar cargar desde MySQL primero
+        # Respaldos disponibles, MySQL primero
+        sources = []
         if self.db_manager:
             backup = self.db_manager.get_latest_session_backup(target_session_id)
             if backup:
-                session_data = backup['datos']
-                self.extracted_businesses = session_data.get('extracted_businesses', [])
-                self.search_history = session_data.get('search_history', [])
-                print(f"📂 Sesión {target_session_id} cargada desde MySQL")
-                print(f"   📊 {len(self.extracted_businesses)} negocios recuperados")
-                return True
-        
-        # Intentar cargar localmente
+                sources.append(('MySQL', backup['datos']))
         session_data = self.local_persistence.load_latest_session(target_session_id)
         if session_data:
-            self.extracted_businesses = session_data.get('extracted_businesses', [])
-            self.search_history = session_data.get('search_history', [])
-            print(f"📂 Sesión {target_session_id} cargada desde archivos locales")
-            print(f"   📊 {len(self.extracted_businesses)} negocios recuperados")
-            return True
+            sources.append(('archivos locales', session_data))
         
-        print(f"ℹ️ No se encontraron datos previos para la sesión {target_session_id}")
-        return False
+        source_name, session_data, replayed = restore_session(journal, sources)
+        if target_session_id == self.session_id:
+            self._session_loaded = True
+        if session_data is None:
+            print(f"ℹ️ No se encontraron datos previos para la sesión {target_session_id}")
+            return False
+        
+        self.extracted_businesses = session_data.get('extracted_businesses', [])
+        self.search_history = session_data.get('search_history', [])
+        self.pending_enrichment = session_data.get('pending_enrichment', [])
+        print(f"📂 Sesión {target_session_id} cargada desde {source_name}")
+        if replayed:
+            print(f"   📜 {replayed} eventos del diario reaplicados")
+        print(f"   📊 {len(self.extracted_businesses)} negocios recuperados")
+        self._report_unfinished_searches()
+        return True
 
-    def setup_driver(self):
-        """Configura el navegador Chrome con undetected_chromedriver"""
-        options = uc.ChromeOptions()
-        
-        # Configuraciones estables
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-plugins-discovery")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
-        options.add_argument("--no-first-run")
-        options.add_argument("--disable-default-apps")
-        
-        # User-Agent más realista
-        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    def _report_unfinished_searches(self):
+        """Avisa de las búsquedas que quedaron a medias en el checkpoint"""
+        for entry in self.frontier.unfinished():
+            pending = sum(1 for status in entry['urls'].values() if status != DONE)
+            failures = entry.get('open_failures')
+            note = f", {failures} aperturas fallidas: {entry.get('error')}" if failures else ""
+            print(f"   ⏸️ Búsqueda sin terminar: '{entry['busqueda']}' ({pending} URLs pendientes{note})")
+
+    def resume_searches(self):
+        """Continúa las búsquedas del checkpoint que quedaron sin terminar"""
+        resumed = []
+        for entry in self.frontier.unfinished():
+            print(f"\n⏩ Continuando búsqueda '{entry['busqueda']}'...")
+            resumed.extend(self.iter_businesses(
+                entry['url'],
+                max_results=entry['max_results'],
+                search_name=entry['busqueda'],
+                mode=entry['mode']
+            ))
+        return resumed
+
+    def _profile_dir(self, suffix=None):
+        """Ruta del perfil temporal de Chrome para esta sesión (o para un worker)"""
+        name = self.session_id
+        if suffix:
+            name += f"_{suffix}"
+        return os.path.join(profiles_root(), name)
+
+    def _remove_profile_dir(self, profile_dir):
+        """Elimina un perfil temporal de Chrome"""
+        try:
+            if os.path.exists(profile_dir):
+                shutil.rmtree(profile_dir, ignore_errors=True)
+        except:
+            pass
+
+    def _create_driver(self, profile_dir, capture_network=False):
+        """Crea una instancia de Chrome independiente con su propio perfil"""
+        driver = create_chrome_driver(profile_dir, capture_network, self.lite_mode, self.headless)
+        return driver, WebDriverWait(driver, self.wait_timeouts['detail'])
+
+    def _acquire_driver(self, suffix=None, capture_network=False):
+        """Obtiene un navegador con el tope duro de carga del watchdog"""
+        driver = self._obtain_driver(suffix, capture_network)
+        try:
+            driver.set_page_load_timeout(self.watchdog.page_load_timeout)
+        except Exception as e:
+            print(f"⚠️ No se pudo fijar el tope de carga del navegador: {e}")
+        return driver
+
+    def _obtain_driver(self, suffix=None, capture_network=False):
+        """Obtiene un navegador: del daemon, prestado del pool, o nuevo con perfil propio"""
+        address = self._daemon_address(suffix)
+        if address:
+            # Si otro scraper ya tiene el navegador asignado se prueba con los demás
+            candidates = [address] + [other for other in self.browser_addresses if other != address]
+            for candidate in candidates:
+                try:
+                    driver = attach_chrome_driver(candidate, capture_network)
+                except DaemonBrowserBusy:
+                    continue
+                except Exception as e:
+                    print(f"⚠️ No se pudo conectar a {candidate}, se inicia un navegador propio: {e}")
+                    break
+                if self.lite_mode:
+                    apply_resource_blocking(driver)
+                self._attached_drivers.add(id(driver))
+                return driver
+            else:
+                print("⚠️ Los navegadores persistentes están en uso por otros scrapers, se inicia uno propio")
+        
+        if self.driver_pool:
+            return self.driver_pool.acquire(timeout=None if suffix is None else 60)
+        driver, _ = self._create_driver(self._profile_dir(suffix), capture_network)
+        return driver
+
+    def _release_driver(self, driver, suffix=None, recycle=False, fresh_profile=False):
+        """Suelta el navegador del daemon, lo devuelve al pool, o lo cierra y borra su perfil.
         
+        Con recycle=True el navegador del pool se cierra en lugar de volver a
+        quedar libre, y al del daemon (que sigue vivo) se le borran las cookies.
+        Con fresh_profile=True también se descarta el perfil del lugar del pool
+        (tras un bloqueo: el reemplazo no debe heredar la identidad marcada).
+        """
+        self.watchdog.forget(driver)
+        if id(driver) in self._attached_drivers:
+            self._attached_drivers.discard(id(driver))
+            if recycle:
+                try:
+                    driver.delete_all_cookies()
+                except Exception:
+                    pass
+            detach_chrome_driver(driver)
+            return
+        
+        if self.driver_pool:
+            self.driver_pool.release(driver, recycle=recycle, fresh_profile=fresh_profile)
+            return
         try:
-            print("✅ Configurando Undetected ChromeDriver...")
-            
-            # Crear directorio temporal para datos del usuario
-            temp_user_data = os.path.join(os.getcwd(), f"temp_chrome_profile_{self.session_id}")
-            options.add_argument(f"--user-data-dir={temp_user_data}")
-            
-            self.driver = uc.Chrome(
-                options=options,
-                version_main=None,
-                driver_executable_path=None,
-                use_subprocess=False
-            )
-            
-            self.wait = WebDriverWait(self.driver, 25)
-            print("✅ Chrome iniciado correctamente")
-            
+            driver.quit()
+        except:
+            pass
+        self._remove_profile_dir(self._profile_dir(suffix))
+
+    def _restart_driver(self, driver, suffix=None, reason=""):
+        """Reinicia un navegador que el watchdog marcó como desgastado o colgado.
+        
+        Un Chrome propio se cierra sin borrar su perfil, así el nuevo arranca
+        con caché y cookies (perfil tibio); el principal se vuelve a abrir con
+        setup_driver. Los del pool se descartan y los del daemon se reconectan.
+        Devuelve el navegador nuevo (None si no se pudo abrir el de un worker).
+        """
+        print(f"♻️ Reiniciando navegador {suffix or 'principal'}: {reason}")
+        with self._stats_lock:
+            self.stats['driver_restarts'] += 1
+        
+        if id(driver) in self._attached_drivers or self.driver_pool:
+            self._release_driver(driver, suffix, recycle=True)
+        else:
+            self.watchdog.forget(driver)
+            try:
+                driver.quit()
+            except:
+                pass
+        
+        if suffix is None:
+            self.setup_driver()
+            if self.capture_network:
+                self.network_capture = NetworkCapture(self.driver)
+            return self.driver
+        try:
+            return self._acquire_driver(suffix)
         except Exception as e:
-            print(f"❌ Error configurando Undetected ChromeDriver: {e}")
-            print("\n🔄 Intentando configuración alternativa...")
+            print(f"❌ No se pudo reabrir el navegador {suffix}: {e}")
+            return None
+
+    def _check_main_driver(self):
+        """Reinicia el navegador principal si el watchdog lo indica"""
+        reason = self.watchdog.check(self.driver)
+        if reason:
+            self._restart_driver(self.driver, None, reason)
+
+    def _daemon_address(self, suffix=None):
+        """Dirección del navegador persistente para el principal (None) o un worker ("w<n>")"""
+        if not self.browser_addresses:
+            return None
+        index = int(suffix[1:]) if suffix and suffix.startswith('w') else 0
+        if index < len(self.browser_addresses):
+            return self.browser_addresses[index]
+        return None
+
+    def _throttle(self):
+        """Espera una ficha del limitador de tasa (si hay uno) antes de navegar"""
+        if not self.rate_limiter:
+            return
+        waited = self.rate_limiter.acquire()
+        if waited > 0.01:
+            self._record_wait('rate_limit', waited)
+
+    def _try_start_page(self):
+        """Reserva un lugar del controlador de concurrencia sin esperar"""
+        return self.concurrency is None or self.concurrency.try_acquire()
+
+    def _finish_page(self, data, seconds, outcome=None):
+        """Informa al controlador de concurrencia cómo terminó una carga"""
+        if not self.concurrency:
+            return
+        if outcome is None:
+            # Un negocio que ya no existe no indica que Maps esté saturado
+            if data is None and getattr(self._thread_state, 'page_state', None) == PAGE_NOT_FOUND:
+                outcome = OUTCOME_NOT_FOUND
+            else:
+                outcome = page_outcome(data)
+        self.concurrency.release(outcome, seconds)
+
+    def _wait_for_page_state(self, driver):
+        """Espera a que la página navegada sea clasificable (ficha, consentimiento,
+        bloqueo o inexistente); None si se agotó el techo de 'detail'"""
+        return self._wait_for(
+            lambda d: d.execute_script(CLASSIFY_PAGE_JS, DETAIL_SELECTORS['nombre'], PAGE_MARKERS),
+            'detail',
+            driver
+        )
+
+    def _note_failure(self, url, reason):
+        """Guarda el motivo de la última falla de una URL (para reintentos y dead-letter)"""
+        with self._stats_lock:
+            self._failure_reasons[url] = reason
+
+    def _record_page_state(self, state):
+        """Cuenta la clasificación de una página en las estadísticas"""
+        self._thread_state.page_state = state
+        with self._stats_lock:
+            counts = self.stats['page_states']
+            counts[state] = counts.get(state, 0) + 1
+
+    def _accept_consent(self, driver):
+        """Acepta el muro de consentimiento de cookies si tiene un botón visible"""
+        for selector in CONSENT_ACCEPT_SELECTORS:
             try:
-                options = uc.ChromeOptions()
-                options.add_argument("--no-sandbox")
-                options.add_argument("--disable-dev-shm-usage")
-                options.add_argument("--headless")
-                
-                self.driver = uc.Chrome(options=options)
-                self.wait = WebDriverWait(self.driver, 25)
-                print("✅ Chrome iniciado en modo alternativo")
-                
-            except Exception as e2:
-                print(f"❌ Error en configuración alternativa: {e2}")
-                raise
+                button = driver.find_element(By.CSS_SELECTOR, selector)
+                if button.is_displayed():
+                    button.click()
+                    self._wait_for(EC.staleness_of(button), 'page_load', driver)
+                    print("   🍪 Consentimiento de cookies aceptado")
+                    return True
+            except:
+                continue
+        return False
+
+    def _record_block(self, breaker, label):
+        """Registra un bloqueo en el cortacircuitos; devuelve la pausa si se abrió"""
+        pause = breaker.record_failure()
+        if pause:
+            with self._stats_lock:
+                self.stats['circuit_trips'] += 1
+            print(f"🔌 [{label}] Circuito abierto tras varios bloqueos: pausa de {pause:.0f}s")
+        return pause
+
+    def _navigate(self, driver, url):
+        """Navega a una URL y la cuenta para el reciclaje del pool"""
+        self._throttle()
+        try:
+            driver.get(url)
+        except TimeoutException:
+            # Se superó el tope duro de carga: el navegador puede haber quedado colgado
+            self.watchdog.mark_hung(driver)
+            raise
+        if self.driver_pool:
+            self.driver_pool.record_page(driver)
+
+    def setup_driver(self):
+        """Configura el navegador Chrome principal con undetected_chromedriver"""
+        self.driver = self._acquire_driver(capture_network=self.capture_network)
+        self.wait = WebDriverWait(self.driver, self.wait_timeouts['detail'])
+
+    def _wait_for(self, condition, timeout_key, driver=None):
+        """Espera hasta que se cumpla una condición, con el techo de timeout_key.
+        
+        Devuelve el valor de la condición, o None si se alcanzó el techo.
+        El tiempo realmente esperado se acumula en self.stats['waits'].
+        """
+        driver = driver or self.driver
+        start = time.time()
+        timed_out = False
+        try:
+            return WebDriverWait(driver, self.wait_timeouts[timeout_key], poll_frequency=0.2).until(condition)
+        except TimeoutException:
+            timed_out = True
+            return None
+        finally:
+            self._record_wait(timeout_key, time.time() - start, timed_out)
+
+    def _wait_for_any(self, selectors, timeout_key, driver=None):
+        """Espera a que cualquiera de los selectores del grupo esté presente.
+        
+        Una sola espera con el presupuesto de timeout_key para todo el grupo.
+        Devuelve el selector que coincidió, o None si se agotó el tiempo.
+        """
+        return self._wait_for(
+            lambda d: d.execute_script(FIRST_MATCHING_SELECTOR_JS, selectors),
+            timeout_key,
+            driver
+        )
+
+    def _record_wait(self, timeout_key, seconds, timed_out=False):
+        """Acumula el tiempo de una espera en las estadísticas"""
+        with self._stats_lock:
+            entry = self.stats['waits'].setdefault(timeout_key, {'count': 0, 'seconds': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            if timed_out:
+                entry['timeouts'] += 1
+
+    def _record_page_load(self, seconds, transfer_bytes):
+        """Acumula el tiempo de carga y los bytes de una página de detalle"""
+        with self._stats_lock:
+            pages = self.stats['pages']
+            pages['count'] += 1
+            pages['load_seconds'] += seconds
+            pages['bytes'] += transfer_bytes or 0
+
+    def get_run_stats(self):
+        """Devuelve una copia de las estadísticas de ejecución"""
+        with self._stats_lock:
+            pages = dict(self.stats['pages'])
+            if pages['count']:
+                pages['avg_load_seconds'] = pages['load_seconds'] / pages['count']
+                pages['avg_bytes'] = pages['bytes'] / pages['count']
+            stats = {
+                'waits': {key: dict(entry) for key, entry in self.stats['waits'].items()},
+                'pages': pages
+            }
+            stats['page_states'] = dict(self.stats['page_states'])
+            stats['circuit_trips'] = self.stats['circuit_trips']
+            stats['retries'] = self.stats['retries']
+            stats['dead_letters'] = self.stats['dead_letters']
+            stats['driver_restarts'] = self.stats['driver_restarts']
+        stats['peak_browser_mb'] = round(self.watchdog.peak_rss_mb)
+        if self.concurrency:
+            stats['concurrency'] = self.concurrency.get_stats()
+        return stats
+
+    def _print_run_stats(self):
+        """Muestra el tiempo invertido en esperas y el costo de carga por página"""
+        stats = self.get_run_stats()
+        waits = stats['waits']
+        if waits:
+            total = sum(entry['seconds'] for entry in waits.values())
+            print(f"⏱️ Tiempo total en esperas: {total:.1f}s")
+            for key, entry in waits.items():
+                print(f"   • {key}: {entry['seconds']:.1f}s en {entry['count']} esperas ({entry['timeouts']} al límite)")
+        
+        pages = stats['pages']
+        if pages['count']:
+            print(f"📄 {pages['count']} páginas de detalle: {pages['avg_load_seconds']:.1f}s "
+                  f"y {pages['avg_bytes'] / 1024:.0f} KB en promedio por negocio")
+        
+        page_states = stats['page_states']
+        if any(state != PAGE_OK for state in page_states):
+            detail = ", ".join(f"{state}: {count}" for state, count in sorted(page_states.items()))
+            print(f"🚦 Páginas de detalle por tipo: {detail} ({stats['circuit_trips']} cortes del circuito)")
+        
+        if stats['retries'] or stats['dead_letters']:
+            print(f"🔁 {stats['retries']} reintentos, {stats['dead_letters']} negocios enviados a "
+                  f"{self.dead_letters.path}")
+        
+        if stats['driver_restarts']:
+            print(f"♻️ {stats['driver_restarts']} reinicios de navegador "
+                  f"(pico de memoria medido: {stats['peak_browser_mb']} MB)")
+        
+        concurrency = stats.get('concurrency')
+        if concurrency:
+            print(f"🎚️ Concurrencia final: {concurrency['limit']} páginas simultáneas "
+                  f"({concurrency['increases']} subidas, {concurrency['decreases']} bajadas)")
 
     def scroll_and_load_results(self, max_results=10):
         """Hace scroll inteligente para cargar más resultados de Google Maps"""
+        unique_urls = []
+        for new_urls in self._iter_scroll_batches(max_results):
+            unique_urls.extend(new_urls)
+        return unique_urls
+
+    def _iter_scroll_batches(self, max_results=10):
+        """Hace scroll en la lista y entrega en cada intento los enlaces nuevos.
+        
+        Al ser un generador, quien lo consume puede empezar a procesar los
+        primeros negocios mientras el scroll sigue cargando más.
+        """
         print(f"🔄 Cargando hasta {max_results} resultados...")
         
-        # Esperar un momento inicial para que cargue la página
-        time.sleep(3)
+        # Esperar a que haya al menos un resultado en la lista
+        self._wait_for(lambda d: d.execute_script(PLACE_LINKS_PRESENT_JS), 'results')
         
         # Buscar el panel de resultados con selectores más específicos
         results_panel_selectors = [
@@ -228,7 +893,9 @@ class GoogleMapsScraperEnhanced:
             except:
                 continue
         
-        unique_urls = set()
+        unique_urls = []
+        seen_keys = set()
+        skipped_known = 0
         scroll_attempts = 0
         max_scroll_attempts = 20
         no_new_results_count = 0
@@ -236,27 +903,43 @@ class GoogleMapsScraperEnhanced:
         while len(unique_urls) < max_results and scroll_attempts < max_scroll_attempts:
             scroll_attempts += 1
             
-            # Obtener enlaces actuales antes del scroll
-            current_links = self.get_current_business_links()
+            # Obtener solo los enlaces nuevos desde el último scroll
+            new_links = self._drain_new_business_links()
+            
+            # Procesar las respuestas de red mientras siguen en el buffer de Chrome
+            if self.network_capture:
+                self.network_capture.poll()
             previous_count = len(unique_urls)
+            previous_seen = len(seen_keys)
             
-            # Agregar nuevos enlaces únicos
-            for link in current_links:
+            # Agregar nuevos enlaces únicos (por clave de lugar, no por href)
+            for link in new_links:
                 if len(unique_urls) >= max_results:
                     break
-                if link and '/maps/place/' in link:
-                    unique_urls.add(link)
+                if not link or '/maps/place/' not in link:
+                    continue
+                key = place_key(link) or link
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                if self.skip_known_places and self.place_index.is_fresh(key):
+                    skipped_known += 1
+                    continue
+                unique_urls.append(link)
             
             current_count = len(unique_urls)
             print(f"   📊 Intento {scroll_attempts}: {current_count} resultados únicos encontrados")
             
+            if current_count > previous_count:
+                yield unique_urls[previous_count:]
+            
             # Auto-guardado cada 10 resultados nuevos
             if self.auto_save and current_count > 0 and current_count % 10 == 0:
                 print("🔄 Auto-guardado intermedio...")
                 self._save_current_session()
             
-            # Verificar si encontramos nuevos resultados
-            if current_count == previous_count:
+            # Verificar si encontramos nuevos resultados (los ya conocidos también cuentan)
+            if len(seen_keys) == previous_seen:
                 no_new_results_count += 1
             else:
                 no_new_results_count = 0
@@ -273,43 +956,45 @@ class GoogleMapsScraperEnhanced:
             # Estrategias múltiples de scroll (igual que antes)
             try:
                 if results_panel:
-                    # Método 1: Scroll en el panel de resultados
-                    self.driver.execute_script("""
-                        arguments[0].scrollBy(0, 800);
-                        arguments[0].scrollTop = arguments[0].scrollTop;
-                    """, results_panel)
-                    
-                    # Método 2: Scroll hasta el último elemento visible
-                    try:
-                        last_result = results_panel.find_elements(By.CSS_SELECTOR, "a[href*='/maps/place/']")
-                        if last_result:
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", last_result[-1])
-                    except:
-                        pass
+                    # Scroll en el panel de resultados y hasta el último elemento visible
+                    self.driver.execute_script(SCROLL_RESULTS_PANEL_JS, results_panel)
                         
                 else:
                     # Scroll en toda la página si no encontramos el panel
                     self.driver.execute_script("window.scrollBy(0, 1000);")
                 
-                # Métodos adicionales de scroll (similares al original)
+                # Métodos adicionales de scroll (similares al original); la espera
+                # por resultados nuevos de abajo cubre ambas teclas
                 if scroll_attempts % 3 == 0:
-                    actions = ActionChains(self.driver)
-                    actions.send_keys(Keys.PAGE_DOWN).perform()
-                    time.sleep(1)
-                    actions.send_keys(Keys.END).perform()
+                    ActionChains(self.driver).send_keys(Keys.PAGE_DOWN).send_keys(Keys.END).perform()
                         
             except Exception as e:
                 print(f"   ⚠️ Error en scroll {scroll_attempts}: {e}")
             
-            # Esperar a que se carguen nuevos resultados
-            time.sleep(2.5)
+            # Esperar a que se carguen nuevos resultados (o al fin de la lista)
+            self._wait_for(lambda d: d.execute_script(NEW_RESULTS_READY_JS), 'scroll')
         
         print(f"🏁 Scroll completado: {len(unique_urls)} resultados únicos disponibles")
-        return list(unique_urls)
+        if skipped_known:
+            print(f"⏭️ {skipped_known} negocios omitidos por estar ya extraídos")
+
+    def _drain_new_business_links(self):
+        """Obtiene los enlaces de negocios aparecidos desde la última llamada.
+        
+        Un MutationObserver instalado en la página acumula los enlaces nuevos,
+        así cada scroll cuesta una sola llamada al navegador. Si el script no
+        puede ejecutarse se recurre a la búsqueda completa por selectores.
+        """
+        try:
+            return self.driver.execute_script(HARVEST_PLACE_LINKS_JS) or []
+        except Exception as e:
+            print(f"   ⚠️ Observador de resultados no disponible: {e}")
+            return self.get_current_business_links()
 
     def get_current_business_links(self):
         """Obtiene todos los enlaces de negocios visibles actualmente"""
         business_links = []
+        seen = set()
         
         # Selectores más específicos y completos
         selectors = [
@@ -330,148 +1015,945 @@ class GoogleMapsScraperEnhanced:
                 for element in elements:
                     try:
                         href = element.get_attribute('href')
-                        if href and '/maps/place/' in href and href not in business_links:
+                        if href and '/maps/place/' in href and href not in seen:
                             if element.is_displayed():
+                                seen.add(href)
                                 business_links.append(href)
                     except:
                         continue
             except Exception as e:
                 continue
         
-        # Eliminar duplicados manteniendo el orden
-        unique_links = []
-        seen = set()
-        for link in business_links:
-            if link not in seen:
-                seen.add(link)
-                unique_links.append(link)
+        return business_links
+
+    def search_businesses(self, url, max_results=10, search_name="busqueda", mode="detail",
+                          enrich_later=False, pipeline=False):
+        """Busca y extrae información de negocios en Google Maps con auto-guardado.
+        
+        Devuelve la lista completa al terminar; ver iter_businesses() para
+        recibir cada negocio en cuanto se extrae.
+        """
+        return list(self.iter_businesses(
+            url,
+            max_results=max_results,
+            search_name=search_name,
+            mode=mode,
+            enrich_later=enrich_later,
+            pipeline=pipeline
+        ))
+
+    def iter_businesses(self, url, max_results=10, search_name="busqueda", mode="detail",
+                        enrich_later=False, pipeline=False):
+        """Busca negocios en Google Maps y entrega cada uno en cuanto se extrae.
+        
+        mode="detail" visita la página de cada negocio. mode="list" toma nombre,
+        calificación, reviews, tipo y dirección parcial directamente de las
+        tarjetas de la lista, sin navegar; con enrich_later=True las páginas de
+        detalle quedan en cola para enrich_pending_businesses(). mode="network"
+        decodifica los datos de las respuestas de búsqueda que Maps envía a la
+        página (requiere capture_network=True).
+        
+        Con pipeline=True (modo "detail") los workers empiezan a extraer las
+        páginas de detalle mientras el navegador principal sigue haciendo
+        scroll, en lugar de esperar a tener todas las URLs.
+        
+        Cada negocio se registra en la sesión (auto-guardado cada 5) antes de
+        entregarse. Si se deja de consumir el generador, la búsqueda se cierra
+        igual: se guarda en el historial con los negocios entregados. Si un
+        error la corta, el generador termina sin relanzarlo y el error queda
+        en self.last_search_error (y en la entrada 'error' del historial).
+        """
+        start_time = time.time()
+        self.last_search_error = None
+        print(f"🔍 Accediendo a: {url}")
+        
+        if "google.com/maps" not in url and "maps.google.com" not in url:
+            print("❌ La URL no parece ser una búsqueda válida de Google Maps")
+            return
+        
+        if mode == 'network' and not self.network_capture:
+            print("⚠️ El modo 'network' requiere capture_network=True, usando modo 'list'")
+            mode = 'list'
+        
+        results = None
+        extracted_count = 0
+        first_result_seconds = None
+        completed = False
+        
+        # Checkpoint de la frontera: si la búsqueda quedó a medias se retoma
+        frontier_key, resumed = self.frontier.start(url, search_name, mode, max_results)
+        done_keys = set()
+        if resumed:
+            # Se da por terminado lo que tiene registro en la sesión cargada: el
+            # checkpoint puede haberse escrito después del último guardado. Se
+            # compara por clave de lugar porque al volver a hacer scroll los
+            # href del mismo negocio pueden traer otros parámetros
+            done_keys = {
+                b.get('place_key') or place_key(b.get('url_google_maps')) or b.get('url_google_maps')
+                for b in self.extracted_businesses if b.get('busqueda') == search_name
+            }
+            print(f"⏩ Reanudando '{search_name}': {len(done_keys)} negocios ya extraídos")
+        
+        try:
+            checkpoint = self.frontier.get(frontier_key)
+            if resumed and mode == 'detail' and checkpoint['scroll_complete']:
+                # La lista ya estaba completa: no hace falta volver a la búsqueda
+                urls_to_process = [u for u in checkpoint['order'] if (place_key(u) or u) not in done_keys]
+                print(f"📋 {len(urls_to_process)} negocios pendientes del checkpoint")
+                results = self._extract_urls(urls_to_process)
+            
+            elif not self._open_search_page(url):
+                attempts, gave_up = self.frontier.record_open_failure(frontier_key, "Sin resultados iniciales")
+                if gave_up:
+                    print(f"🪦 '{search_name}' descartada del checkpoint tras {attempts} intentos sin resultados")
+                else:
+                    print(f"⏸️ '{search_name}' queda en el checkpoint para reanudarse "
+                          f"(intento {attempts}/{MAX_OPEN_ATTEMPTS} sin resultados)")
+                return
+            
+            elif mode == 'detail' and pipeline:
+                # Scroll y extracción en paralelo: no se espera a tener todas las URLs
+                results = self._scroll_and_extract_pipelined(max_results, frontier_key, done_keys)
+            else:
+                # Scroll automático mejorado
+                unique_urls = self.scroll_and_load_results(max_results)
+                
+                if not unique_urls:
+                    print("❌ No se pudieron obtener URLs de negocios")
+                    completed = True
+                    return
+                
+                print(f"✅ Se encontraron {len(unique_urls)} negocios únicos para procesar")
+                
+                # Limitar a la cantidad solicitada y registrar la frontera
+                self.frontier.add_urls(frontier_key, unique_urls[:max_results])
+                self.frontier.set_scroll_complete(frontier_key)
+                urls_to_process = [u for u in unique_urls[:max_results] if (place_key(u) or u) not in done_keys]
+                
+                if mode == 'list':
+                    results = self._extract_from_result_cards(urls_to_process)
+                elif mode == 'network':
+                    results = self._extract_from_network(urls_to_process)
+                else:
+                    results = self._extract_urls(urls_to_process)
+            
+            if mode == 'detail':
+                results = self._with_retries(results, search_name)
+            
+            for i, business_url, data in results:
+                self.frontier.mark(frontier_key, business_url, DONE if data else FAILED)
+                if data:
+                    if first_result_seconds is None:
+                        first_result_seconds = round(time.time() - start_time, 1)
+                    
+                    extracted_count += 1
+                    self._register_business(data, business_url, search_name, extracted_count,
+                                            queue_enrichment=(mode in ('list', 'network') and enrich_later))
+                    yield data
+            
+            completed = True
+            
+        except Exception as e:
+            print(f"❌ Error durante la búsqueda: {e}")
+            self.last_search_error = str(e)
+            # Intentar guardar datos parciales en caso de error
+            if results is None and self.auto_save and self.extracted_businesses:
+                print("💾 Guardando datos parciales debido al error...")
+                self._save_current_session()
+        
+        finally:
+            if results is not None:
+                # Cerrar el generador interno (pestañas, workers) si se abandonó antes
+                results.close()
+                self._finish_search(url, search_name, max_results, mode, pipeline,
+                                    start_time, extracted_count, first_result_seconds,
+                                    error=self.last_search_error)
+            
+            # Una búsqueda terminada sale del checkpoint; una interrumpida queda para reanudarse
+            if completed:
+                self.frontier.finish(frontier_key)
+
+    def _open_search_page(self, url):
+        """Abre una URL de búsqueda, cierra popups y espera los primeros resultados"""
+        self._check_main_driver()
+        try:
+            self._navigate(self.driver, url)
+        except TimeoutException:
+            self._restart_driver(self.driver, None, "carga colgada")
+            self._navigate(self.driver, url)
+        print("⏳ Esperando que cargue la página de resultados...")
+        
+        # Esperar a que termine de cargar el documento
+        self._wait_for(
+            lambda d: d.execute_script("return document.readyState") == 'complete',
+            'page_load'
+        )
+        
+        # Intentar cerrar cualquier popup
+        try:
+            close_buttons = [
+                "button[aria-label*='close']",
+                "button[aria-label*='dismiss']", 
+                "button[data-value='Accept']",
+                ".VfPpkd-Bz112c-LgbsSe"
+            ]
+            for selector in close_buttons:
+                try:
+                    button = self.driver.find_element(By.CSS_SELECTOR, selector)
+                    if button.is_displayed():
+                        button.click()
+                        self._wait_for(EC.invisibility_of_element(button), 'popup')
+                        break
+                except:
+                    continue
+        except:
+            pass
+        
+        # Verificar resultados básicos
+        matched_selector = self._wait_for_any(INITIAL_RESULT_SELECTORS, 'results')
+        
+        if not matched_selector:
+            print("❌ No se encontraron resultados iniciales")
+            return False
+        
+        print(f"✅ Resultados iniciales encontrados con: {matched_selector}")
+        return True
+
+    def _register_business(self, data, business_url, search_name, extracted_count, queue_enrichment=False):
+        """Agrega metadatos a un negocio extraído y lo incorpora a la sesión"""
+        # Agregar metadatos
+        data['busqueda'] = search_name
+        data['fecha_extraccion'] = datetime.now()
+        data['url_google_maps'] = business_url
+        data['session_id'] = self.session_id
+        data['place_key'] = place_key(business_url)
+        self.place_index.mark(data['place_key'], data)
+        
+        with self._session_lock:
+            self.extracted_businesses.append(data)
+            self.journal.append(EVENT_BUSINESS, data)
+            
+            if queue_enrichment:
+                pending = {'url': business_url, 'busqueda': search_name}
+                self.pending_enrichment.append(pending)
+                self.journal.append(EVENT_PENDING, pending)
+        
+        # Auto-guardado cada 5 negocios
+        if self.auto_save and extracted_count % 5 == 0:
+            print(f"💾 Auto-guardado: {extracted_count} negocios procesados")
+            self._save_current_session()
+
+    def iter_place_urls(self, urls, search_name="busqueda", mode="detail", cards_by_url=None,
+                        source_url=None, enrich_later=False):
+        """Extrae y registra una lista de URLs de negocios ya descubiertas.
+        
+        Es la segunda mitad de iter_businesses, para cuando las URLs vienen de
+        otro lado (varias búsquedas combinadas, un checkpoint). Con mode="list"
+        los registros se arman desde cards_by_url sin navegar.
+        """
+        start_time = time.time()
+        extracted_count = 0
+        first_result_seconds = None
+        
+        if mode == 'list':
+            results = self._extract_from_result_cards(urls, cards_by_url)
+        else:
+            results = self._with_retries(self._extract_urls(urls), search_name)
+        
+        try:
+            for i, business_url, data in results:
+                if data:
+                    if first_result_seconds is None:
+                        first_result_seconds = round(time.time() - start_time, 1)
+                    extracted_count += 1
+                    self._register_business(data, business_url, search_name, extracted_count,
+                                            queue_enrichment=(mode == 'list' and enrich_later))
+                    yield data
+        finally:
+            results.close()
+            self._finish_search(source_url or search_name, search_name, len(urls), mode, False,
+                                start_time, extracted_count, first_result_seconds)
+
+    def discover_urls(self, url, max_results=10, read_cards=False):
+        """Abre una búsqueda y hace scroll hasta juntar max_results URLs de negocios.
+        
+        Devuelve (urls, tarjetas por URL); las tarjetas solo se leen con
+        read_cards=True (modo lista). Si la búsqueda no muestra resultados
+        devuelve (None, {}).
+        """
+        if not self._open_search_page(url):
+            return None, {}
+        urls = self.scroll_and_load_results(max_results)
+        cards_by_url = self._read_result_cards() if read_cards else {}
+        return urls, cards_by_url
+
+    def extract_urls(self, urls, search_name="busqueda", mode="detail", cards_by_url=None, source_url=None):
+        """Extrae y registra URLs de negocios entregando el resultado de cada una.
+        
+        A diferencia de iter_place_urls entrega también las que fallaron, sin
+        reintentarlas: (url, negocio registrado o None, motivo de la falla o
+        None). Es para quien lleva el estado de cada URL por su cuenta, como la
+        cola de trabajos. Con source_url la extracción queda en el historial
+        como una búsqueda de esa URL.
+        """
+        start_time = time.time()
+        first_result_seconds = None
+        
+        if mode == 'list':
+            results = self._extract_from_result_cards(urls, cards_by_url)
+        else:
+            results = self._extract_urls(urls)
+        
+        extracted_count = 0
+        try:
+            for i, business_url, data in results:
+                if not data:
+                    with self._stats_lock:
+                        reason = self._failure_reasons.pop(business_url, None)
+                    yield business_url, None, reason or "No se pudo extraer"
+                    continue
+                if first_result_seconds is None:
+                    first_result_seconds = round(time.time() - start_time, 1)
+                extracted_count += 1
+                self._register_business(data, business_url, search_name, extracted_count)
+                yield business_url, data, None
+        finally:
+            results.close()
+            if source_url:
+                self._finish_search(source_url, search_name, len(urls), mode, False,
+                                    start_time, extracted_count, first_result_seconds)
+            elif self.auto_save and extracted_count:
+                self._save_current_session()
+
+    def _finish_search(self, url, search_name, max_results, mode, pipeline,
+                       start_time, extracted_count, first_result_seconds, error=None):
+        """Registra la búsqueda en el historial y hace el guardado final"""
+        # Guardar historial de búsqueda
+        end_time = time.time()
+        search_record = {
+            'busqueda': search_name,
+            'url': url,
+            'resultados': extracted_count,
+            'fecha': datetime.now(),
+            'duracion_segundos': int(end_time - start_time),
+            'primer_resultado_segundos': first_result_seconds,
+            'parametros': {
+                'max_results': max_results,
+                'session_id': self.session_id,
+                'num_workers': self.num_workers,
+                'num_tabs': self.num_tabs,
+                'mode': mode,
+                'pipeline': pipeline
+            }
+        }
+        if error:
+            search_record['error'] = error
+        with self._session_lock:
+            self.search_history.append(search_record)
+            self.journal.append(EVENT_SEARCH, search_record)
+        
+        self._print_run_stats()
+        
+        if self.pending_enrichment:
+            print(f"📋 {len(self.pending_enrichment)} negocios en cola para completar desde su página de detalle")
+        
+        # Guardado final
+        if self.auto_save:
+            print("💾 Guardado final de la búsqueda...")
+            self._save_current_session()
+
+    def _read_result_cards(self):
+        """Lee todas las tarjetas de la lista de resultados, indexadas por URL"""
+        try:
+            cards = self.driver.execute_script(PARSE_RESULT_CARDS_JS) or []
+        except Exception as e:
+            print(f"❌ No se pudieron leer las tarjetas de resultados: {e}")
+            cards = []
+        
+        cards_by_url = {card['href']: card for card in cards if card.get('href')}
+        print(f"📋 {len(cards_by_url)} tarjetas de resultados leídas")
+        return cards_by_url
+
+    def _extract_from_network(self, urls):
+        """Construye los registros con los datos decodificados de las respuestas de red.
+        
+        Los negocios que no aparecen en ninguna respuesta capturada se completan
+        desde las tarjetas de la lista.
+        """
+        self.network_capture.read_initial_state()
+        self.network_capture.poll()
+        print(f"📡 {len(self.network_capture.records)} negocios decodificados de las respuestas de Maps")
+        
+        cards_by_url = None
+        for i, business_url in enumerate(urls):
+            raw_fields = self.network_capture.record_for_url(business_url)
+            if not raw_fields:
+                if cards_by_url is None:
+                    cards_by_url = self._read_result_cards()
+                raw_fields = cards_by_url.get(business_url)
+            
+            if not raw_fields:
+                yield i, business_url, None
+                continue
+            
+            business_data = self._apply_detail_fields(self._empty_business_data(i), raw_fields)
+            print(f"   ✅ Desde la red: {business_data['nombre']}")
+            yield i, business_url, business_data
+
+    def _extract_from_result_cards(self, urls, cards_by_url=None):
+        """Construye los registros a partir de las tarjetas de la lista, sin navegar"""
+        if cards_by_url is None:
+            cards_by_url = self._read_result_cards()
+        
+        for i, business_url in enumerate(urls):
+            card = cards_by_url.get(business_url)
+            if not card:
+                yield i, business_url, None
+                continue
+            
+            business_data = self._apply_detail_fields(self._empty_business_data(i), card)
+            print(f"   ✅ Desde la lista: {business_data['nombre']}")
+            yield i, business_url, business_data
+
+    def enrich_pending_businesses(self, max_items=None):
+        """Completa desde su página de detalle los negocios extraídos en modo lista.
+        
+        Actualiza los registros existentes en extracted_businesses (sin duplicar)
+        y deja en cola los que no se pudieron cargar.
+        """
+        pending = self.pending_enrichment[:max_items] if max_items else list(self.pending_enrichment)
+        if not pending:
+            print("ℹ️ No hay negocios pendientes de completar")
+            return 0
+        
+        records_by_url = {b.get('url_google_maps'): b for b in self.extracted_businesses}
+        urls = [item['url'] for item in pending]
+        
+        print(f"🔍 Completando {len(urls)} negocios desde su página de detalle...")
+        results = self._extract_urls(urls)
+        
+        enriched_urls = set()
+        for i, business_url, data in results:
+            record = records_by_url.get(business_url)
+            if not data or record is None:
+                continue
+            
+            for key, value in data.items():
+                if key != 'indice' and value != 'No disponible':
+                    record[key] = value
+            record['fecha_extraccion'] = datetime.now()
+            enriched_urls.add(business_url)
+        
+        self.pending_enrichment = [item for item in self.pending_enrichment if item['url'] not in enriched_urls]
+        print(f"✅ {len(enriched_urls)} negocios completados, {len(self.pending_enrichment)} siguen pendientes")
+        
+        if self.auto_save and enriched_urls:
+            self._save_current_session(compact=True)
+        
+        return len(enriched_urls)
+
+    def refresh_stale_businesses(self, search_name=None, urls=None, max_age_days=7):
+        """Vuelve a extraer solo los negocios con datos más viejos que max_age_days.
+        
+        Los candidatos salen de la sesión cargada y, si hay MySQL, de la tabla
+        negocios; se filtran por nombre de búsqueda o lista de URLs. Cada
+        negocio se visita una vez (agrupado por clave de lugar) y se actualiza
+        en su lugar, sin agregar duplicados. Devuelve cuántos quedaron sin
+        cambios, cuántos cambiaron, cuántos ya no se encontraron y cuántos
+        fallaron por causas pasajeras (bloqueos, tiempos agotados).
+        
+        Solo una página de lugar inexistente marca el registro como
+        'no_encontrado'; las demás fallas se reintentan con espera y, si no se
+        recuperan, el registro queda intacto para el próximo refresco.
+        """
+        cutoff = datetime.now() - timedelta(days=max_age_days)
+        url_filter = set(urls) if urls else None
+        candidates = {}
+        
+        def candidate(url):
+            key = place_key(url) or url
+            return candidates.setdefault(key, {'url': url, 'records': [], 'db_rows': []})
+        
+        # Registros desactualizados de la sesión
+        for record in self.extracted_businesses:
+            url = record.get('url_google_maps')
+            if not url:
+                continue
+            if search_name and record.get('busqueda') != search_name:
+                continue
+            if url_filter and url not in url_filter:
+                continue
+            extracted_at = parse_datetime(record.get('fecha_extraccion'))
+            if extracted_at and extracted_at >= cutoff:
+                continue
+            candidate(url)['records'].append(record)
+        
+        # Filas desactualizadas de MySQL
+        if self.db_manager:
+            for row in self.db_manager.get_stale_businesses(max_age_days, search_name, urls):
+                if row.get('url_google_maps'):
+                    candidate(row['url_google_maps'])['db_rows'].append(row)
+        
+        report = {'revisados': len(candidates), 'sin_cambios': 0, 'cambiados': 0, 'no_encontrados': 0,
+                  'fallos_temporales': 0}
+        if not candidates:
+            print(f"ℹ️ No hay negocios con más de {max_age_days} días para refrescar")
+            return report
+        
+        groups = list(candidates.values())
+        print(f"🔄 Refrescando {len(groups)} negocios con más de {max_age_days} días...")
+        
+        results = self._with_retries(self._extract_urls([group['url'] for group in groups]),
+                                     search_name, dead_letter=False)
+        for i, business_url, data in results:
+            group = groups[i]
+            
+            if not data:
+                with self._stats_lock:
+                    reason = self._failure_reasons.pop(business_url, None)
+                if reason != PAGE_NOT_FOUND:
+                    report['fallos_temporales'] += 1
+                    continue
+                report['no_encontrados'] += 1
+                for record in group['records']:
+                    record['estado_refresco'] = 'no_encontrado'
+                continue
+            
+            previous = (group['records'] or group['db_rows'])[0]
+            changed_fields = [
+                field for field in REFRESH_FIELDS
+                if _normalize_field(previous.get(field)) != _normalize_field(data.get(field))
+            ]
+            if changed_fields:
+                report['cambiados'] += 1
+                print(f"   ✏️ {data['nombre']}: cambió {', '.join(changed_fields)}")
+            else:
+                report['sin_cambios'] += 1
+            
+            now = datetime.now()
+            updates = {field: data.get(field) for field in REFRESH_FIELDS}
+            updates['fecha_extraccion'] = now
+            
+            for record in group['records']:
+                record.update(updates)
+                record['estado_refresco'] = 'cambiado' if changed_fields else 'sin_cambios'
+            for row in group['db_rows']:
+                self.db_manager.update_business(row['id'], updates)
+            
+            self.place_index.mark(place_key(business_url), {**data, 'fecha_extraccion': now,
+                                                            'url_google_maps': business_url})
+        
+        print(f"✅ Refresco completado: {report['sin_cambios']} sin cambios, "
+              f"{report['cambiados']} cambiados, {report['no_encontrados']} no encontrados, "
+              f"{report['fallos_temporales']} con fallos temporales")
+        
+        if self.auto_save:
+            self._save_current_session(compact=True)
+        
+        return report
+
+    def _extract_urls(self, urls):
+        """Extrae páginas de detalle con la estrategia configurada (navegadores, pestañas o una a una)"""
+        if self.num_workers > 1 and len(urls) > 1:
+            return self._extract_with_worker_pool(urls)
+        if self.num_tabs > 1 and len(urls) > 1:
+            return self._extract_with_tabs(urls)
+        return self._extract_sequentially(urls)
+
+    def _with_retries(self, results, search_name, dead_letter=True):
+        """Entrega los resultados de extracción reintentando las URLs que fallaron.
+        
+        Una falla no se entrega: se reprograma con espera exponencial y se
+        vuelve a extraer cuando termina la primera pasada. Solo se entrega como
+        None cuando agota self.extract_attempts (o el negocio ya no existe), y
+        en ese caso queda registrada en el archivo dead-letter (si dead_letter)
+        y su motivo en self._failure_reasons para quien recibe el None.
+        """
+        retry_queue = RetryQueue(self.extract_attempts, self.retry_delay)
+        try:
+            for i, business_url, data in results:
+                if data or not self._schedule_retry(retry_queue, i, business_url, search_name, 1, dead_letter):
+                    yield i, business_url, data
+        finally:
+            results.close()
+        
+        while retry_queue:
+            wait = retry_queue.seconds_until_due()
+            if wait > 0:
+                print(f"⏳ {len(retry_queue)} negocios por reintentar, el próximo en {wait:.0f}s")
+                time.sleep(wait)
+            
+            due = {item['url']: item for item in retry_queue.pop_due()}
+            retried = self._extract_urls(list(due))
+            try:
+                for _, business_url, data in retried:
+                    item = due[business_url]
+                    if data or not self._schedule_retry(retry_queue, item['index'], business_url,
+                                                        search_name, item['attempts'] + 1, dead_letter):
+                        yield item['index'], business_url, data
+            finally:
+                retried.close()
+
+    def _schedule_retry(self, retry_queue, index, business_url, search_name, attempts, dead_letter=True):
+        """Reprograma una URL fallida; devuelve False si ya no quedan intentos"""
+        with self._stats_lock:
+            reason = self._failure_reasons.pop(business_url, None) or PAGE_TIMEOUT
+        
+        # Un negocio que ya no existe no mejora con otro intento
+        delay = None if reason == PAGE_NOT_FOUND else retry_queue.add(index, business_url, attempts, reason)
+        if delay is not None:
+            with self._stats_lock:
+                self.stats['retries'] += 1
+            print(f"   🔁 Reintento {attempts + 1}/{retry_queue.max_attempts} en {delay:.0f}s ({reason})")
+            return True
+        
+        with self._stats_lock:
+            self._failure_reasons[business_url] = reason
+        if not dead_letter:
+            print(f"   ⏭️ Sin más intentos ({reason})")
+            return False
+        
+        self.dead_letters.add(business_url, search_name, reason, attempts, self.session_id)
+        with self._stats_lock:
+            self.stats['dead_letters'] += 1
+        print(f"   🪦 Sin más intentos ({reason}): registrado para replay-failed")
+        return False
+
+    def _extract_sequentially(self, urls):
+        """Extrae los negocios uno por uno con el navegador principal"""
+        for i, business_url in enumerate(urls):
+            print(f"\n🔍 Procesando negocio {i+1}/{len(urls)}...")
+            self._check_main_driver()
+            data = None
+            for attempt in range(MAX_BLOCK_RETRIES + 1):
+                try:
+                    data = self.extract_business_data(business_url, i)
+                    if data is None and self.watchdog.is_hung(self.driver):
+                        # Reintento transparente de la URL con el navegador reiniciado
+                        self._restart_driver(self.driver, None, "carga colgada")
+                        data = self.extract_business_data(business_url, i)
+                    if data:
+                        self.circuit_breaker.record_success()
+                    break
+                except BlockedPageError:
+                    pause = self._record_block(self.circuit_breaker, "Principal")
+                    if pause:
+                        # Igual que un worker: pausa y navegador nuevo con perfil limpio
+                        self._recycle_blocked_driver(self.driver, None, pause)
+                    elif attempt < MAX_BLOCK_RETRIES:
+                        delay = block_retry_delay(attempt)
+                        print(f"   🔁 Página bloqueada, reintento {attempt + 1}/{MAX_BLOCK_RETRIES} en {delay:.0f}s")
+                        time.sleep(delay)
+            yield i, business_url, data
+
+    def _extract_with_tabs(self, urls, driver=None):
+        """Extrae los negocios rotando entre varias pestañas de un mismo Chrome.
+        
+        Se lanza la navegación en todas las pestañas sin esperar (window.location)
+        y luego se recorren hasta encontrar una que ya cargó; se lee, se le
+        asigna la siguiente URL y se sigue con las demás. La pestaña de la lista
+        de resultados no se toca.
+        """
+        if driver is None:
+            self._check_main_driver()
+        driver = driver or self.driver
+        main_handle = driver.current_window_handle
+        timeout = self.wait_timeouts['detail']
+        
+        print(f"🗂️ Abriendo {min(self.num_tabs, len(urls))} pestañas para extraer en paralelo...")
+        tabs = []
+        for _ in range(min(self.num_tabs, len(urls))):
+            driver.switch_to.new_window('tab')
+            tabs.append({'handle': driver.current_window_handle, 'task': None})
+        
+        pending = list(enumerate(urls))
+        pending.reverse()
+        block_retries = {}
+        
+        def assign(tab):
+            i, business_url = pending.pop()
+            token = uuid.uuid4().hex
+            driver.switch_to.window(tab['handle'])
+            self._throttle()
+            driver.execute_script(TAB_NAVIGATE_JS, token, business_url)
+            if self.driver_pool:
+                self.driver_pool.record_page(driver)
+            tab['task'] = (i, business_url, token, time.time())
+        
+        try:
+            while pending or any(tab['task'] for tab in tabs):
+                # Las pestañas libres cargan la siguiente URL mientras el
+                # controlador de concurrencia lo permita
+                for tab in tabs:
+                    if not tab['task'] and pending and self._try_start_page():
+                        assign(tab)
+                
+                harvested = False
+                for tab in tabs:
+                    if not tab['task']:
+                        continue
+                    i, business_url, token, started = tab['task']
+                    
+                    driver.switch_to.window(tab['handle'])
+                    try:
+                        state = driver.execute_script(
+                            TAB_PAGE_STATE_JS, token, DETAIL_SELECTORS['nombre'], PAGE_MARKERS
+                        )
+                    except Exception:
+                        state = None
+                    
+                    elapsed = time.time() - started
+                    if not state and elapsed < timeout:
+                        continue
+                    
+                    self._record_wait('detail', elapsed, timed_out=not state)
+                    self._record_page_state(state or PAGE_TIMEOUT)
+                    print(f"\n🔍 [Pestaña {tabs.index(tab) + 1}] Procesando negocio {i+1}/{len(urls)}...")
+                    data = None
+                    requeued = False
+                    pause = 0
+                    if state == PAGE_OK:
+                        data = self._empty_business_data(i)
+                        try:
+                            self._read_loaded_business(data, driver, elapsed)
+                            print(f"   ✅ Extraído: {data['nombre']}")
+                            self.circuit_breaker.record_success()
+                        except Exception as e:
+                            print(f"   ⚠️ Error inesperado extrayendo datos: {e}")
+                            self._note_failure(business_url, f"error: {e}")
+                            data = None
+                        self._finish_page(data, elapsed)
+                    elif state in (PAGE_CONSENT, PAGE_BLOCKED):
+                        print(f"   🚫 Maps respondió con una página de {state}")
+                        self._note_failure(business_url, state)
+                        self._finish_page(None, elapsed, OUTCOME_BLOCKED)
+                        # Las pestañas comparten el Chrome: una pausa las frena a todas
+                        if not (state == PAGE_CONSENT and self._accept_consent(driver)):
+                            pause = self._record_block(self.circuit_breaker, "Pestañas")
+                        if block_retries.get(i, 0) < MAX_BLOCK_RETRIES:
+                            block_retries[i] = block_retries.get(i, 0) + 1
+                            pending.append((i, business_url))
+                            requeued = True
+                            print("   🔁 URL devuelta a la cola")
+                    elif state == PAGE_NOT_FOUND:
+                        print("   ❓ El negocio ya no existe en Maps")
+                        self._note_failure(business_url, PAGE_NOT_FOUND)
+                        self._finish_page(None, elapsed, OUTCOME_NOT_FOUND)
+                    else:
+                        print("   ❌ La página del negocio no cargó a tiempo")
+                        self._note_failure(business_url, PAGE_TIMEOUT)
+                        self._finish_page(None, elapsed)
+                    
+                    tab['task'] = None
+                    harvested = True
+                    if pause:
+                        time.sleep(pause)
+                    if pending and self._try_start_page():
+                        assign(tab)
+                    if not requeued:
+                        yield i, business_url, data
+                
+                if not harvested:
+                    time.sleep(0.2)
+        finally:
+            for tab in tabs:
+                try:
+                    driver.switch_to.window(tab['handle'])
+                    driver.close()
+                except Exception:
+                    pass
+            driver.switch_to.window(main_handle)
+
+    def _extract_with_worker_pool(self, urls):
+        """Reparte las URLs entre varios navegadores que extraen en paralelo.
+        
+        Cada worker tiene su propio Chrome y perfil, y toma URLs de una cola
+        compartida. Los resultados se entregan al hilo principal conforme
+        llegan, que es quien los registra y ejecuta el auto-guardado.
+        """
+        task_queue = queue.Queue()
+        result_queue = queue.Queue()
+        
+        for i, business_url in enumerate(urls):
+            task_queue.put((i, business_url))
         
-        return unique_links
+        num_workers = min(self.num_workers, len(urls))
+        for _ in range(num_workers):
+            task_queue.put(None)
+        
+        workers = self._start_workers(num_workers, len(urls), task_queue, result_queue)
+        yield from self._collect_worker_results(workers, result_queue, len(urls))
 
-    def search_businesses(self, url, max_results=10, search_name="busqueda"):
-        """Busca y extrae información de negocios en Google Maps con auto-guardado"""
-        start_time = time.time()
-        print(f"🔍 Accediendo a: {url}")
+    def _scroll_and_extract_pipelined(self, max_results, frontier_key=None, done_keys=None):
+        """Extrae las páginas de detalle mientras el navegador principal hace scroll.
         
-        if "google.com/maps" not in url and "maps.google.com" not in url:
-            print("❌ La URL no parece ser una búsqueda válida de Google Maps")
-            return []
+        Cada tanda de enlaces nuevos pasa directo a la cola de los workers y en
+        cada intento de scroll se entregan los resultados que ya terminaron.
+        El navegador principal no puede navegar a los detalles sin perder la
+        lista, así que siempre hay al menos un worker aparte. Las URLs se
+        registran en la frontera y se omiten las de negocios ya terminados
+        (done_keys: claves de lugar).
+        """
+        done_keys = done_keys or set()
+        task_queue = queue.Queue()
+        result_queue = queue.Queue()
+        workers = self._start_workers(self.num_workers, max_results, task_queue, result_queue)
         
-        try:
-            self.driver.get(url)
-            print("⏳ Esperando que cargue la página de resultados...")
-            
-            # Esperar a que aparezcan los primeros resultados
-            time.sleep(5)
-            
-            # Intentar cerrar cualquier popup
-            try:
-                close_buttons = [
-                    "button[aria-label*='close']",
-                    "button[aria-label*='dismiss']", 
-                    "button[data-value='Accept']",
-                    ".VfPpkd-Bz112c-LgbsSe"
-                ]
-                for selector in close_buttons:
-                    try:
-                        button = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        if button.is_displayed():
-                            button.click()
-                            time.sleep(1)
-                            break
-                    except:
-                        continue
-            except:
-                pass
-            
-            # Verificar resultados básicos
-            initial_selectors = [
-                "a[href*='/maps/place/']",
-                "div[role='article']",
-                ".Nv2PK"
-            ]
+        submitted = 0
+        completed = 0
+        for new_urls in self._iter_scroll_batches(max_results):
+            if frontier_key:
+                self.frontier.add_urls(frontier_key, new_urls)
+            for business_url in new_urls:
+                if (place_key(business_url) or business_url) in done_keys:
+                    continue
+                task_queue.put((submitted, business_url))
+                submitted += 1
             
-            found_results = False
-            for selector in initial_selectors:
+            # Entregar sin bloquear lo que ya extrajeron los workers
+            while True:
                 try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    found_results = True
-                    print(f"✅ Resultados iniciales encontrados con: {selector}")
+                    result = result_queue.get_nowait()
+                except queue.Empty:
                     break
-                except TimeoutException:
+                completed += 1
+                yield result
+        
+        for _ in workers:
+            task_queue.put(None)
+        
+        if frontier_key:
+            self.frontier.set_scroll_complete(frontier_key)
+        
+        if not submitted:
+            print("❌ No se pudieron obtener URLs de negocios")
+        
+        yield from self._collect_worker_results(workers, result_queue, submitted - completed)
+
+    def _start_workers(self, num_workers, total, task_queue, result_queue):
+        """Inicia los hilos de los navegadores que consumen la cola de URLs"""
+        print(f"👷 Iniciando {num_workers} navegadores en paralelo...")
+        # URLs devueltas por un worker bloqueado; cualquier worker las toma
+        # antes que las de task_queue
+        retry_queue = queue.Queue()
+        workers = []
+        for worker_id in range(1, num_workers + 1):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(worker_id, total, task_queue, result_queue, retry_queue),
+                daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+        return workers
+
+    def _collect_worker_results(self, workers, result_queue, pending):
+        """Entrega los resultados restantes de los workers conforme llegan"""
+        while pending:
+            try:
+                result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if any(w.is_alive() for w in workers) or not result_queue.empty():
                     continue
+                print(f"⚠️ Los navegadores terminaron con {pending} negocios sin procesar")
+                break
             
-            if not found_results:
-                print("❌ No se encontraron resultados iniciales")
-                return []
-            
-            # Scroll automático mejorado
-            unique_urls = self.scroll_and_load_results(max_results)
-            
-            if not unique_urls:
-                print("❌ No se pudieron obtener URLs de negocios")
-                return []
-            
-            print(f"✅ Se encontraron {len(unique_urls)} negocios únicos para procesar")
-            
-            # Limitar a la cantidad solicitada
-            urls_to_process = unique_urls[:max_results]
-            
-            businesses_data = []
-            for i, business_url in enumerate(urls_to_process):
-                print(f"\n🔍 Procesando negocio {i+1}/{len(urls_to_process)}...")
-                data = self.extract_business_data(business_url, i)
-                if data:
-                    # Agregar metadatos
-                    data['busqueda'] = search_name
-                    data['fecha_extraccion'] = datetime.now()
-                    data['url_google_maps'] = business_url
-                    data['session_id'] = self.session_id
-                    
-                    businesses_data.append(data)
-                    self.extracted_businesses.append(data)
-                    
-                    # Auto-guardado cada 5 negocios
-                    if self.auto_save and len(businesses_data) % 5 == 0:
-                        print(f"💾 Auto-guardado: {len(businesses_data)} negocios procesados")
-                        self._save_current_session()
+            pending -= 1
+            yield result
+        
+        for worker in workers:
+            worker.join(timeout=10)
+
+    def _worker_loop(self, worker_id, total, task_queue, result_queue, retry_queue):
+        """Bucle de un worker: abre su navegador y procesa URLs de la cola"""
+        suffix = f"w{worker_id}"
+        try:
+            driver = self._acquire_driver(suffix)
+        except Exception as e:
+            print(f"❌ Navegador {worker_id} no pudo iniciar: {e}")
+            self._remove_profile_dir(self._profile_dir(suffix))
+            return
+        
+        breaker = CircuitBreaker()
+        try:
+            while True:
+                try:
+                    task = retry_queue.get_nowait()
+                except queue.Empty:
+                    task = task_queue.get()
+                if task is None:
+                    break
                 
-                # Pausa entre solicitudes
-                time.sleep(2)
-            
-            # Guardar historial de búsqueda
-            end_time = time.time()
-            search_record = {
-                'busqueda': search_name,
-                'url': url,
-                'resultados': len(businesses_data),
-                'fecha': datetime.now(),
-                'duracion_segundos': int(end_time - start_time),
-                'parametros': {
-                    'max_results': max_results,
-                    'session_id': self.session_id
-                }
-            }
-            self.search_history.append(search_record)
-            
-            # Guardado final
-            if self.auto_save:
-                print("💾 Guardado final de la búsqueda...")
-                self._save_current_session()
-            
-            return businesses_data
-            
+                i, business_url = task[0], task[1]
+                block_retries = task[2] if len(task) > 2 else 0
+                
+                reason = self.watchdog.check(driver)
+                if reason:
+                    driver = self._restart_driver(driver, suffix, reason)
+                    if driver is None:
+                        retry_queue.put(task)
+                        break
+                
+                if self.concurrency:
+                    self.concurrency.acquire()
+                print(f"\n🔍 [Navegador {worker_id}] Procesando negocio {i+1}/{total}...")
+                started = time.time()
+                try:
+                    data = self.extract_business_data(business_url, i, driver=driver)
+                    if data is None and self.watchdog.is_hung(driver):
+                        # Reintento transparente de la URL con el navegador reiniciado
+                        driver = self._restart_driver(driver, suffix, "carga colgada")
+                        if driver is None:
+                            raise RuntimeError("el navegador no se pudo reiniciar")
+                        data = self.extract_business_data(business_url, i, driver=driver)
+                    if data:
+                        breaker.record_success()
+                except BlockedPageError:
+                    self._finish_page(None, time.time() - started, OUTCOME_BLOCKED)
+                    if block_retries < MAX_BLOCK_RETRIES:
+                        print(f"   🔁 [Navegador {worker_id}] URL devuelta a la cola")
+                        retry_queue.put((i, business_url, block_retries + 1))
+                    else:
+                        result_queue.put((i, business_url, None))
+                    
+                    pause = self._record_block(breaker, f"Navegador {worker_id}")
+                    if pause:
+                        driver = self._recycle_blocked_driver(driver, suffix, pause)
+                        if driver is None:
+                            break
+                    continue
+                except Exception as e:
+                    print(f"   ⚠️ [Navegador {worker_id}] Error inesperado: {e}")
+                    self._note_failure(business_url, f"error: {e}")
+                    data = None
+                self._finish_page(data, time.time() - started)
+                result_queue.put((i, business_url, data))
+                if driver is None:
+                    break
+        finally:
+            if driver is not None:
+                self._release_driver(driver, suffix)
+
+    def _recycle_blocked_driver(self, driver, suffix, pause):
+        """Cierra un navegador bloqueado, espera la pausa y abre otro (con perfil
+        y cookies nuevos). Devuelve None si no se pudo reabrir el de un worker;
+        si no se puede reabrir el principal (suffix None) lanza el error."""
+        self._release_driver(driver, suffix, recycle=True, fresh_profile=True)
+        time.sleep(pause)
+        if suffix is None:
+            self.setup_driver()
+            if self.capture_network:
+                self.network_capture = NetworkCapture(self.driver)
+            return self.driver
+        try:
+            return self._acquire_driver(suffix)
         except Exception as e:
-            print(f"❌ Error durante la búsqueda: {e}")
-            # Intentar guardar datos parciales en caso de error
-            if self.auto_save and self.extracted_businesses:
-                print("💾 Guardando datos parciales debido al error...")
-                self._save_current_session()
-            return []
+            print(f"❌ No se pudo reabrir el navegador {suffix}: {e}")
+            return None
 
-    def extract_business_data(self, url, index):
-        """Navega a la página de un negocio y extrae toda su información"""
-        business_data = {
+    def _empty_business_data(self, index):
+        """Registro de negocio con todos los campos como 'No disponible'"""
+        return {
             'indice': index, 
             'nombre': 'No disponible', 
             'calificacion': 'No disponible', 
@@ -482,129 +1964,131 @@ class GoogleMapsScraperEnhanced:
             'website': 'No disponible', 
             'email': 'No disponible'
         }
+
+    def extract_business_data(self, url, index, driver=None):
+        """Navega a la página de un negocio y extrae toda su información.
+        
+        Devuelve None si la página no cargó o el negocio ya no existe, y lanza
+        BlockedPageError si Maps respondió con un consentimiento o un bloqueo.
+        """
+        driver = driver or self.driver
+        
+        business_data = self._empty_business_data(index)
         
         try:
             print(f"   🚗 Navegando a la página del negocio...")
-            self.driver.get(url)
-            
-            # Espera más flexible para diferentes elementos
-            selectors_to_wait = [
-                "h1.DUwDvf",
-                "h1[data-attrid='title']",
-                ".x3AX1-LfntMc-header-title-title"
-            ]
+            navigation_start = time.time()
+            self._navigate(driver, url)
             
-            title_element = None
-            for selector in selectors_to_wait:
-                try:
-                    title_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    break
-                except TimeoutException:
-                    continue
+            # Una sola espera hasta que la página sea la ficha del negocio o una
+            # página de consentimiento, bloqueo o lugar inexistente
+            state = self._wait_for_page_state(driver)
+            if state == PAGE_CONSENT and self._accept_consent(driver):
+                state = self._wait_for_page_state(driver)
+            self._record_page_state(state or PAGE_TIMEOUT)
             
-            if not title_element:
+            if state in (PAGE_CONSENT, PAGE_BLOCKED):
+                print(f"   🚫 Maps respondió con una página de {state}")
+                self._note_failure(url, state)
+                raise BlockedPageError(state, url)
+            if state == PAGE_NOT_FOUND:
+                print("   ❓ El negocio ya no existe en Maps")
+                self._note_failure(url, PAGE_NOT_FOUND)
+                return None
+            if state != PAGE_OK:
                 print("   ❌ No se pudo cargar la página del negocio")
+                self._note_failure(url, PAGE_TIMEOUT)
+                self.watchdog.record_page(driver, time.time() - navigation_start)
                 return None
                 
             print("   ✅ Página de detalles cargada.")
-
-            # Extracción de datos con múltiples selectores de respaldo
-            try:
-                name_selectors = ["h1.DUwDvf", "h1[data-attrid='title']", ".x3AX1-LfntMc-header-title-title"]
-                for selector in name_selectors:
-                    try:
-                        business_data['nombre'] = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                rating_selectors = ["div.F7nice", ".MW4etd", ".ceNzKf"]
-                for selector in rating_selectors:
-                    try:
-                        rating_text = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        parts = rating_text.split('(')
-                        if len(parts) > 0: 
-                            business_data['calificacion'] = parts[0].strip()
-                        if len(parts) > 1: 
-                            business_data['num_reviews'] = parts[1].replace(')', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                type_selectors = ["button.DkEaL", ".YhemCb"]
-                for selector in type_selectors:
-                    try:
-                        business_data['tipo'] = self.driver.find_element(By.CSS_SELECTOR, selector).text
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                address_selectors = [
-                    "button[data-item-id='address']",
-                    "[data-item-id='address'] .Io6YTe",
-                    ".LrzXr"
-                ]
-                for selector in address_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        address = element.get_attribute('aria-label') or element.text
-                        business_data['direccion'] = address.replace('Dirección:', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                phone_selectors = [
-                    "button[data-item-id^='phone:tel:']",
-                    "[data-item-id*='phone'] .Io6YTe"
-                ]
-                for selector in phone_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        phone = element.get_attribute('aria-label') or element.text
-                        business_data['telefono'] = phone.replace('Teléfono:', '').strip()
-                        break
-                    except:
-                        continue
-            except: 
-                pass
-                
-            try:
-                website_selectors = [
-                    "a[data-item-id='authority']",
-                    "a[href^='http']:not([href*='google.com'])"
-                ]
-                for selector in website_selectors:
-                    try:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                        business_data['website'] = element.get_attribute('href')
-                        break
-                    except:
-                        continue
-            except: 
-                pass
+            load_seconds = time.time() - navigation_start
+            
+            self._read_loaded_business(business_data, driver, load_seconds)
             
             print(f"   ✅ Extraído: {business_data['nombre']}")
             return business_data
 
+        except BlockedPageError:
+            raise
         except TimeoutException:
             print("   ❌ La página del negocio no cargó a tiempo")
+            self._note_failure(url, PAGE_TIMEOUT)
             return None
         except Exception as e:
             print(f"   ⚠️ Error inesperado extrayendo datos: {e}")
+            self._note_failure(url, f"error: {e}")
             return None
 
+    def _read_loaded_business(self, business_data, driver, load_seconds):
+        """Lee los campos de la página de detalle ya cargada y registra la carga"""
+        # Extracción de datos con múltiples selectores de respaldo
+        raw_fields = None
+        if self.extraction_mode == 'js':
+            try:
+                raw_fields = driver.execute_script(
+                    EXTRACT_DETAIL_FIELDS_JS, DETAIL_SELECTORS, DETAIL_FIELD_SOURCES
+                )
+            except Exception as e:
+                print(f"   ⚠️ Extracción JS falló, usando selectores individuales: {e}")
+        
+        if raw_fields is None:
+            raw_fields = self._read_detail_fields_dom(driver)
+        
+        try:
+            transfer_bytes = driver.execute_script(PAGE_TRANSFER_BYTES_JS)
+        except Exception:
+            transfer_bytes = 0
+        self._record_page_load(load_seconds, transfer_bytes)
+        self.watchdog.record_page(driver, load_seconds)
+        
+        self._apply_detail_fields(business_data, raw_fields)
+
+    def _read_detail_fields_dom(self, driver):
+        """Lee los campos crudos de la página de detalle elemento por elemento"""
+        raw_fields = {}
+        for field, selectors in DETAIL_SELECTORS.items():
+            for selector in selectors:
+                try:
+                    element = driver.find_element(By.CSS_SELECTOR, selector)
+                    source = DETAIL_FIELD_SOURCES[field]
+                    if source == 'href':
+                        raw_fields[field] = element.get_attribute('href')
+                    elif source == 'label':
+                        raw_fields[field] = element.get_attribute('aria-label') or element.text
+                    else:
+                        raw_fields[field] = element.text
+                    break
+                except:
+                    continue
+        return raw_fields
+
+    def _apply_detail_fields(self, business_data, raw_fields):
+        """Convierte los campos crudos (JS o DOM) al formato de business_data"""
+        if raw_fields.get('nombre') is not None:
+            business_data['nombre'] = raw_fields['nombre']
+        
+        rating_text = raw_fields.get('calificacion')
+        if rating_text is not None:
+            parts = rating_text.split('(')
+            business_data['calificacion'] = parts[0].strip()
+            if len(parts) > 1:
+                business_data['num_reviews'] = parts[1].replace(')', '').strip()
+        
+        if raw_fields.get('tipo') is not None:
+            business_data['tipo'] = raw_fields['tipo']
+        
+        if raw_fields.get('direccion') is not None:
+            business_data['direccion'] = raw_fields['direccion'].replace('Dirección:', '').strip()
+        
+        if raw_fields.get('telefono') is not None:
+            business_data['telefono'] = raw_fields['telefono'].replace('Teléfono:', '').strip()
+        
+        if raw_fields.get('website') is not None:
+            business_data['website'] = raw_fields['website']
+        
+        return business_data
+
     def get_session_summary(self):
         """Obtiene resumen de la sesión actual"""
         return {
@@ -612,7 +2096,8 @@ class GoogleMapsScraperEnhanced:
             'total_businesses': len(self.extracted_businesses),
             'total_searches': len(self.search_history),
             'last_activity': datetime.now().isoformat() if self.extracted_businesses else None,
-            'searches': [s['busqueda'] for s in self.search_history]
+            'searches': [s['busqueda'] for s in self.search_history],
+            'stats': self.get_run_stats()
         }
 
     def export_session_data(self, format='csv', filename=None):
@@ -661,30 +2146,26 @@ class GoogleMapsScraperEnhanced:
         # Guardado final
         if self.auto_save and (self.extracted_businesses or self.search_history):
             print("💾 Guardado final antes de cerrar...")
-            self._save_current_session()
+            self._save_current_session(compact=True)
+        self.journal.close()
+        
+        # El índice de lugares se conserva aunque no haya auto-guardado
+        self.place_index.save()
         
-        # Cerrar navegador
+        # Cerrar navegador (o devolverlo al pool) y limpiar su perfil temporal
         if self.driver:
-            self.driver.quit()
-            print("\n🔒 Navegador cerrado")
+            self._release_driver(self.driver)
+            self.driver = None
+            print("\n🔒 Navegador cerrado" if not self.driver_pool else "\n🔁 Navegador devuelto al pool")
         
         # Cerrar conexión a base de datos
         if self.db_manager:
             self.db_manager.close()
         
-        # Limpiar directorio temporal
-        temp_user_data = os.path.join(os.getcwd(), f"temp_chrome_profile_{self.session_id}")
-        try:
-            if os.path.exists(temp_user_data):
-                import shutil
-                shutil.rmtree(temp_user_data, ignore_errors=True)
-        except:
-            pass
-        
         print(f"✅ Sesión {self.session_id} cerrada correctamente")
 
 
-def main():
+def main(browser_addresses=None):
     print("🚀 Google Maps Business Scraper MEJORADO con Persistencia")
     print("="*70)
     
@@ -710,16 +2191,58 @@ def main():
     scraper = None
     session_id = input("\nID de sesión (Enter para nuevo): ").strip() or None
     
+    try:
+        num_workers = int(input("👷 Navegadores en paralelo (1): ") or "1")
+    except:
+        num_workers = 1
+    
+    try:
+        num_tabs = int(input("🗂️ Pestañas para páginas de detalle (1): ") or "1")
+    except:
+        num_tabs = 1
+    
+    lite_mode = input("🪶 ¿Perfil ligero sin imágenes ni mapas? (s/n): ").strip().lower() in ['s', 'si', 'sí', 'y', 'yes']
+    
+    skip_known_places = input("⏭️ ¿Omitir negocios ya extraídos en sesiones anteriores? (s/n): ").strip().lower() in ['s', 'si', 'sí', 'y', 'yes']
+    place_ttl_days = None
+    if skip_known_places:
+        try:
+            place_ttl_days = float(input("📅 Volver a extraer si tienen más de N días (Enter = nunca): ") or "0") or None
+        except:
+            place_ttl_days = None
+    
+    try:
+        requests_per_second = float(input("🚦 Navegaciones por segundo máximas (Enter = sin límite): ") or "0") or None
+    except:
+        requests_per_second = None
+    
+    adaptive_concurrency = False
+    if num_workers > 1 or num_tabs > 1:
+        adaptive_concurrency = input("🎚️ ¿Ajustar la concurrencia según la respuesta de Maps? (s/n): ").strip().lower() in ['s', 'si', 'sí', 'y', 'yes']
+    
     try:
         scraper = GoogleMapsScraperEnhanced(
             auto_save=True,
             mysql_config=mysql_config,
-            session_id=session_id
+            session_id=session_id,
+            num_workers=num_workers,
+            num_tabs=num_tabs,
+            lite_mode=lite_mode,
+            browser_addresses=browser_addresses,
+            skip_known_places=skip_known_places,
+            place_ttl_days=place_ttl_days,
+            requests_per_second=requests_per_second,
+            adaptive_concurrency=adaptive_concurrency
         )
         
         # Intentar cargar sesión anterior
         if session_id:
             scraper.load_previous_session()
+            
+            if scraper.frontier.unfinished():
+                resume = input("⏩ ¿Continuar las búsquedas sin terminar? (s/n): ").strip().lower()
+                if resume in ['s', 'si', 'sí', 'y', 'yes']:
+                    scraper.resume_searches()
         
         # Mostrar resumen de sesión
         summary = scraper.get_session_summary()
@@ -755,11 +2278,35 @@ def main():
             if not search_name:
                 search_name = f"busqueda_{search_count}"
             
+            mode = 'detail'
+            enrich_later = False
+            list_mode = input("⚡ ¿Modo rápido solo con datos de la lista (sin teléfono ni website)? (s/n): ").strip().lower()
+            if list_mode in ['s', 'si', 'sí', 'y', 'yes']:
+                mode = 'list'
+                enrich = input("📋 ¿Completar después desde la página de detalle? (s/n): ").strip().lower()
+                enrich_later = enrich in ['s', 'si', 'sí', 'y', 'yes']
+            
+            pipeline = False
+            if mode == 'detail':
+                overlap = input("🔀 ¿Extraer detalles mientras se hace scroll? (s/n): ").strip().lower()
+                pipeline = overlap in ['s', 'si', 'sí', 'y', 'yes']
+            
             print(f"\n⚡ Procesando búsqueda: {search_name}")
             print("="*60)
             
             # Realizar búsqueda
-            businesses = scraper.search_businesses(url, max_results=max_results, search_name=search_name)
+            businesses = scraper.search_businesses(
+                url,
+                max_results=max_results,
+                search_name=search_name,
+                mode=mode,
+                enrich_later=enrich_later,
+                pipeline=pipeline
+            )
+            
+            # Segunda pasada sobre las páginas de detalle en cola
+            if businesses and enrich_later:
+                scraper.enrich_pending_businesses()
             
             if businesses:
                 print(f"✅ Búsqueda '{search_name}' completada: {len(businesses)} negocios")
@@ -809,5 +2356,377 @@ def main():
         print(f"\n✅ ¡Todos los datos han sido guardados automáticamente!")
         print("💡 Puedes recuperar tu sesión la próxima vez usando el mismo ID")
 
+def refresh_command(args, browser_addresses=None):
+    """Subcomando refresh: refresca los negocios desactualizados de una sesión"""
+    scraper = None
+    try:
+        scraper = GoogleMapsScraperEnhanced(
+            auto_save=True,
+            mysql_config=load_config().get('mysql_config') if args.mysql else None,
+            session_id=args.session,
+            num_workers=args.workers,
+            headless=args.headless,
+            browser_addresses=browser_addresses
+        )
+        scraper.load_previous_session()
+        report = scraper.refresh_stale_businesses(args.search, args.urls, args.max_age_days)
+        print(f"\n📊 Revisados: {report['revisados']} | Sin cambios: {report['sin_cambios']} | "
+              f"Cambiados: {report['cambiados']} | No encontrados: {report['no_encontrados']} | "
+              f"Fallos temporales: {report['fallos_temporales']}")
+        return 0
+    except KeyboardInterrupt:
+        print("\n⚠️ Proceso interrumpido por el usuario")
+        return 1
+    finally:
+        if scraper:
+            scraper.close()
+
+def replay_failed_command(args, browser_addresses=None):
+    """Subcomando replay-failed: vuelve a extraer solo los negocios del archivo dead-letter"""
+    dead_letters = DeadLetterFile()
+    entries = dead_letters.load(args.search, args.from_session)
+    if not args.include_not_found:
+        entries = [entry for entry in entries if entry.get('motivo') != PAGE_NOT_FOUND]
+    if not entries:
+        print(f"✅ No hay negocios fallidos para reintentar en {dead_letters.path}")
+        return 0
+    
+    urls_by_search = {}
+    for entry in entries:
+        urls_by_search.setdefault(entry['busqueda'], []).append(entry)
+    print(f"🔁 {len(entries)} negocios fallidos en {len(urls_by_search)} búsquedas")
+    
+    scraper = None
+    try:
+        scraper = GoogleMapsScraperEnhanced(
+            auto_save=True,
+            mysql_config=load_config().get('mysql_config') if args.mysql else None,
+            session_id=args.session,
+            num_workers=args.workers,
+            headless=args.headless,
+            browser_addresses=browser_addresses
+        )
+        if args.session:
+            scraper.load_previous_session()
+        
+        recovered = 0
+        started_at = datetime.now().isoformat()
+        for search_name, search_entries in urls_by_search.items():
+            print(f"\n🔍 Reintentando {len(search_entries)} negocios de '{search_name}'")
+            urls = [entry['url'] for entry in search_entries]
+            for _ in scraper.iter_place_urls(urls, search_name=search_name, source_url="replay-failed"):
+                recovered += 1
+            # Las que volvieron a fallar ya tienen una entrada nueva en el archivo
+            dead_letters.remove(urls, before=started_at)
+        
+        print(f"\n📊 Recuperados: {recovered} de {len(entries)}")
+        return 0 if recovered == len(entries) else 1
+    except KeyboardInterrupt:
+        print("\n⚠️ Proceso interrumpido por el usuario")
+        return 1
+    finally:
+        if scraper:
+            scraper.close()
+
+def warm_profile_command(args):
+    """Subcomando warm-profile: prepara el perfil plantilla que clonan los navegadores nuevos"""
+    build_dir = f"{template_profile_dir()}.build"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    # El directorio ya existe: create_chrome_driver no lo clona de la plantilla anterior
+    os.makedirs(build_dir)
+    
+    driver = None
+    try:
+        driver = create_chrome_driver(build_dir, lite_mode=args.lite, headless=args.headless)
+        driver.set_page_load_timeout(60)
+        for url in ["https://www.google.com/maps"] + (args.urls or []):
+            print(f"🌐 Visitando {url}")
+            driver.get(url)
+            for selector in CONSENT_ACCEPT_SELECTORS:
+                try:
+                    button = driver.find_element(By.CSS_SELECTOR, selector)
+                    if button.is_displayed():
+                        button.click()
+                        print("   🍪 Consentimiento de cookies aceptado")
+                        break
+                except:
+                    continue
+            # Dar tiempo a que se descarguen y cacheen scripts, estilos y mosaicos
+            time.sleep(args.settle)
+    except Exception as e:
+        print(f"❌ No se pudo preparar el perfil plantilla: {e}")
+        shutil.rmtree(build_dir, ignore_errors=True)
+        return 1
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except:
+                pass
+    
+    publish_template_profile(build_dir)
+    print(f"✅ Perfil plantilla listo en {template_profile_dir()}")
+    return 0
+
+def batch_command(args, browser_addresses=None):
+    """Subcomando batch: corre los trabajos de un archivo y sale con código según el resultado"""
+    from batch_runner import load_jobs, run_batch, print_batch_summary, batch_exit_code, EXIT_FAILED
+    
+    config = load_config(args.config)
+    try:
+        jobs = load_jobs(args.jobs, config.get('default_max_results', 10))
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo leer el archivo de trabajos: {e}")
+        return EXIT_FAILED
+    
+    if not jobs:
+        print("❌ El archivo no tiene trabajos")
+        return EXIT_FAILED
+    
+    options = {
+        'mysql_config': None if args.no_mysql else config.get('mysql_config'),
+        'num_workers': args.workers,
+        'lite_mode': args.lite,
+        'headless': not args.show_browser,
+        'requests_per_second': args.rate,
+        'adaptive_concurrency': args.adaptive,
+        'max_pages_per_driver': args.recycle_pages,
+        'max_driver_rss_mb': args.max_browser_mb,
+        'browser_addresses': browser_addresses
+    }
+    
+    print(f"📦 {len(jobs)} trabajos, {args.parallel} en paralelo")
+    summaries, report_path = run_batch(jobs, args.parallel, options, data_dir=config.get('data_directory', 'session_data'))
+    print_batch_summary(summaries)
+    print(f"💾 Resumen guardado en {report_path}")
+    return batch_exit_code(summaries)
+
+def tiles_command(args):
+    """Subcomando tiles: búsqueda por mosaicos sobre un bounding box"""
+    from geo_tiling import BoundingBox, TiledSearch
+    
+    scraper = None
+    try:
+        tiled_search = TiledSearch(
+            args.term,
+            BoundingBox.parse(args.bbox),
+            grid=args.grid,
+            max_depth=args.max_depth,
+            num_browsers=args.browsers,
+            mode=args.mode,
+            scraper_options={'headless': args.headless}
+        )
+        scraper = GoogleMapsScraperEnhanced(
+            auto_save=True,
+            mysql_config=load_config().get('mysql_config') if args.mysql else None,
+            session_id=args.session,
+            num_workers=args.workers,
+            headless=args.headless
+        )
+        if args.session:
+            scraper.load_previous_session()
+        
+        businesses = tiled_search.run(scraper, args.name or args.term)
+        print(f"\n📊 {len(businesses)} negocios extraídos de {len(tiled_search.tile_stats)} mosaicos")
+        if businesses:
+            print(f"   • Archivo CSV: {scraper.export_session_data('csv')}")
+        return 0
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    except KeyboardInterrupt:
+        print("\n⚠️ Proceso interrumpido por el usuario")
+        return 1
+    finally:
+        if scraper:
+            scraper.close()
+
+def queue_command(args, browser_addresses=None):
+    """Subcomando queue: cargar, trabajar o ver el avance de una campaña compartida"""
+    from job_queue import JobQueue, run_queue_worker
+    from batch_runner import load_jobs
+    
+    config = load_config(args.config)
+    mysql_config = None if args.sqlite_only else config.get('mysql_config')
+    job_queue = JobQueue(mysql_config, sqlite_path=args.sqlite, lease_seconds=args.lease_seconds)
+    
+    try:
+        if args.action == "add":
+            if not args.jobs:
+                print("❌ Indica el archivo de trabajos con --jobs")
+                return 2
+            jobs = load_jobs(args.jobs, config.get('default_max_results', 10))
+            added = sum(
+                1 for job in jobs
+                if job_queue.add_job(args.campaign, job['url'], job['name'], job['max_results'], job['mode'])
+            )
+            print(f"📥 {added} búsquedas nuevas en la campaña '{args.campaign}' ({len(jobs) - added} ya existían)")
+            return 0
+        
+        if args.action == "status":
+            rows = job_queue.progress(args.campaign)
+            print(f"\n📊 CAMPAÑA '{args.campaign}'")
+            print(f"{'#':>4}  {'Búsqueda':<28}{'Estado':<9}{'URLs':>6}{'Pend.':>7}{'Prest.':>7}{'Hechas':>7}{'Fall.':>6}")
+            for row in rows:
+                print(f"{row['id']:>4}  {row['busqueda'][:27]:<28}{row['estado']:<9}"
+                      f"{row['urls_descubiertas'] or 0:>6}{row['urls_pendientes'] or 0:>7}"
+                      f"{row['urls_prestadas'] or 0:>7}{row['urls_terminadas'] or 0:>7}{row['urls_fallidas'] or 0:>6}")
+            return 0
+        
+        worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        scraper = GoogleMapsScraperEnhanced(
+            auto_save=True,
+            mysql_config=mysql_config,
+            session_id=args.session or f"cola_{args.campaign}_{worker_id}",
+            num_workers=args.workers,
+            lite_mode=args.lite,
+            headless=args.headless,
+            requests_per_second=args.rate,
+            adaptive_concurrency=args.adaptive,
+            max_pages_per_driver=args.recycle_pages,
+            max_driver_rss_mb=args.max_browser_mb,
+            browser_addresses=browser_addresses
+        )
+        try:
+            if args.session:
+                scraper.load_previous_session()
+            extracted = run_queue_worker(job_queue, scraper, worker_id, args.campaign,
+                                         url_batch=args.batch, wait_when_idle=args.wait)
+            print(f"\n✅ [{worker_id}] {extracted} negocios extraídos")
+        finally:
+            scraper.close()
+        return 0
+    except KeyboardInterrupt:
+        # Los préstamos de este proceso vencen solos y otra máquina los retoma
+        print("\n⚠️ Proceso interrumpido por el usuario")
+        return 1
+    finally:
+        job_queue.close()
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos; sin subcomando se ejecuta el modo interactivo"""
+    parser = argparse.ArgumentParser(description="Google Maps Business Scraper")
+    parser.add_argument("--attach", action="store_true",
+                        help="Conectarse a los navegadores de serve-browser en lugar de iniciar Chrome "
+                             "(modo interactivo, refresh, replay-failed, batch y queue work)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    refresh = subparsers.add_parser("refresh", help="Volver a extraer solo los negocios desactualizados")
+    refresh.add_argument("--session", required=True, help="ID de la sesión con los negocios a refrescar")
+    refresh.add_argument("--search", help="Limitar a una búsqueda por nombre")
+    refresh.add_argument("--url", action="append", dest="urls", help="URL de negocio a refrescar (repetible)")
+    refresh.add_argument("--max-age-days", type=float, default=7, help="Antigüedad mínima en días (7)")
+    refresh.add_argument("--mysql", action="store_true", help="Usar también la tabla negocios (config.json)")
+    refresh.add_argument("--workers", type=int, default=1, help="Navegadores en paralelo (1)")
+    refresh.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    
+    replay = subparsers.add_parser("replay-failed", help="Reintentar solo los negocios que agotaron sus intentos")
+    replay.add_argument("--search", help="Limitar a una búsqueda por nombre")
+    replay.add_argument("--from-session", help="Limitar a las fallas de una sesión")
+    replay.add_argument("--session", help="ID de la sesión donde guardar los recuperados (Enter para nuevo)")
+    replay.add_argument("--include-not-found", action="store_true", help="Incluir negocios que Maps ya no encontró")
+    replay.add_argument("--mysql", action="store_true", help="Guardar también en MySQL (config.json)")
+    replay.add_argument("--workers", type=int, default=1, help="Navegadores en paralelo (1)")
+    replay.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    
+    batch = subparsers.add_parser("batch", help="Ejecutar sin interacción los trabajos de un archivo CSV/JSONL")
+    batch.add_argument("jobs", help="Archivo de trabajos (.csv o .jsonl con url, name, max_results)")
+    batch.add_argument("--parallel", type=int, default=1, help="Trabajos simultáneos, uno por navegador (1)")
+    batch.add_argument("--workers", type=int, default=1, help="Navegadores por trabajo para las páginas de detalle (1)")
+    batch.add_argument("--config", default="config.json", help="Archivo de configuración (config.json)")
+    batch.add_argument("--no-mysql", action="store_true", help="No usar MySQL aunque esté en la configuración")
+    batch.add_argument("--lite", action="store_true", help="Perfil ligero sin imágenes ni mapas")
+    batch.add_argument("--rate", type=float, help="Navegaciones por segundo máximas por trabajo (sin límite)")
+    batch.add_argument("--adaptive", action="store_true", help="Ajustar la concurrencia según la respuesta de Maps")
+    batch.add_argument("--recycle-pages", type=int, default=300, help="Reiniciar cada navegador tras N páginas (300, 0 = nunca)")
+    batch.add_argument("--max-browser-mb", type=float, default=1500, help="Reiniciar un navegador que supere esta memoria (1500 MB)")
+    batch.add_argument("--show-browser", action="store_true", help="Mostrar los navegadores (por defecto headless)")
+    
+    tiles = subparsers.add_parser("tiles", help="Cubrir un área completa dividiéndola en mosaicos")
+    tiles.add_argument("term", help="Término de búsqueda (ej. \"restaurantes\")")
+    tiles.add_argument("--bbox", required=True, help="Área a cubrir: sur,oeste,norte,este")
+    tiles.add_argument("--name", help="Nombre de la búsqueda (por defecto el término)")
+    tiles.add_argument("--session", help="ID de sesión (Enter para nuevo)")
+    tiles.add_argument("--grid", type=int, default=2, help="Mosaicos iniciales por lado (2)")
+    tiles.add_argument("--max-depth", type=int, default=3, help="Niveles máximos de subdivisión (3)")
+    tiles.add_argument("--browsers", type=int, default=2, help="Navegadores recorriendo mosaicos (2)")
+    tiles.add_argument("--workers", type=int, default=1, help="Navegadores para las páginas de detalle (1)")
+    tiles.add_argument("--mode", choices=["detail", "list"], default="detail", help="Extracción completa o solo lista")
+    tiles.add_argument("--mysql", action="store_true", help="Guardar también en MySQL (config.json)")
+    tiles.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    
+    queue_parser = subparsers.add_parser("queue", help="Cola compartida para repartir una campaña entre varias máquinas")
+    queue_parser.add_argument("action", choices=["add", "work", "status"],
+                              help="add: cargar búsquedas; work: tomar trabajo; status: ver avance")
+    queue_parser.add_argument("--campaign", required=True, help="Nombre de la campaña")
+    queue_parser.add_argument("--jobs", help="Archivo de trabajos para add (.csv o .jsonl con url, name, max_results)")
+    queue_parser.add_argument("--config", default="config.json", help="Archivo de configuración (config.json)")
+    queue_parser.add_argument("--sqlite-only", action="store_true", help="Usar la cola SQLite local aunque haya MySQL")
+    queue_parser.add_argument("--sqlite", default=os.path.join("session_data", "job_queue.db"),
+                              help="Archivo SQLite de la cola (session_data/job_queue.db)")
+    queue_parser.add_argument("--lease-seconds", type=int, default=300, help="Duración de un préstamo sin heartbeat (300)")
+    queue_parser.add_argument("--worker-id", help="Identificador del proceso (por defecto host-pid)")
+    queue_parser.add_argument("--session", help="ID de sesión del worker (por defecto uno por worker)")
+    queue_parser.add_argument("--batch", type=int, default=5, help="URLs de negocios por préstamo (5)")
+    queue_parser.add_argument("--workers", type=int, default=1, help="Navegadores para las páginas de detalle (1)")
+    queue_parser.add_argument("--wait", action="store_true", help="Esperar trabajo nuevo en lugar de salir al vaciarse la cola")
+    queue_parser.add_argument("--lite", action="store_true", help="Perfil ligero sin imágenes ni mapas")
+    queue_parser.add_argument("--rate", type=float, help="Navegaciones por segundo máximas (sin límite)")
+    queue_parser.add_argument("--adaptive", action="store_true", help="Ajustar la concurrencia según la respuesta de Maps")
+    queue_parser.add_argument("--recycle-pages", type=int, default=300, help="Reiniciar cada navegador tras N páginas (300, 0 = nunca)")
+    queue_parser.add_argument("--max-browser-mb", type=float, default=1500, help="Reiniciar un navegador que supere esta memoria (1500 MB)")
+    queue_parser.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    
+    warm = subparsers.add_parser("warm-profile", help="Preparar el perfil plantilla de Chrome (caché y consentimiento)")
+    warm.add_argument("--url", action="append", dest="urls", help="URL extra para precalentar la caché (repetible)")
+    warm.add_argument("--settle", type=float, default=5, help="Segundos de espera en cada página (5)")
+    warm.add_argument("--lite", action="store_true", help="Perfil ligero sin imágenes ni mapas")
+    warm.add_argument("--headless", action="store_true", help="Navegador sin ventana")
+    
+    serve = subparsers.add_parser("serve-browser", help="Mantener navegadores Chrome abiertos para reutilizarlos")
+    serve.add_argument("--count", type=int, default=1, help="Cantidad de navegadores (1)")
+    serve.add_argument("--port", type=int, default=9222, help="Primer puerto de depuración remota (9222)")
+    serve.add_argument("--headless", action="store_true", help="Navegadores sin ventana")
+    serve.add_argument("--lite", action="store_true", help="Perfil ligero sin imágenes ni mapas")
+    
+    return parser.parse_args(argv)
+
+# Subcomandos que abren sus propios navegadores y no pueden usar los de serve-browser
+ATTACH_UNSUPPORTED_COMMANDS = ("serve-browser", "tiles", "warm-profile")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    
+    browser_addresses = None
+    if args.attach:
+        if args.command in ATTACH_UNSUPPORTED_COMMANDS:
+            print(f"❌ --attach no se puede usar con {args.command}: abre sus propios navegadores")
+            sys.exit(2)
+        browser_addresses = read_daemon_addresses()
+        if browser_addresses:
+            print(f"🔌 {len(browser_addresses)} navegadores persistentes disponibles")
+        else:
+            print("⚠️ No hay navegadores de serve-browser activos, se iniciará Chrome normalmente")
+    
+    if args.command == "serve-browser":
+        sys.exit(serve_browsers(args.count, args.port, args.headless, args.lite))
+    
+    if args.command == "refresh":
+        sys.exit(refresh_command(args, browser_addresses))
+    
+    if args.command == "tiles":
+        sys.exit(tiles_command(args))
+    
+    if args.command == "batch":
+        sys.exit(batch_command(args, browser_addresses))
+    
+    if args.command == "replay-failed":
+        sys.exit(replay_failed_command(args, browser_addresses))
+    
+    if args.command == "warm-profile":
+        sys.exit(warm_profile_command(args))
+    
+    if args.command == "queue":
+        sys.exit(queue_command(args, browser_addresses))
+    
+    main(browser_addresses)
\ No newline at end of file
@@ -0,0 +1,203 @@
+"""
+Diario de la sesión (append-only) y compactación en una instantánea.
+
+Antes cada auto-guardado volvía a escribir la sesión completa en un JSON y un
+CSV nuevos, así el volumen escrito crecía con el cuadrado del tamaño de la
+sesión. Ahora cada negocio, búsqueda o negocio pendiente se agrega como una
+línea a session_data/journal_<sesión>.jsonl, y la sesión completa solo se
+reescribe al compactar (session_data/session_<sesión>_snapshot.json).
+
+Cada compactación sube la "época": la instantánea guarda la época con la que
+se escribió y el diario empieza con una cabecera con la suya. Al cargar, el
+diario solo se reaplica sobre la instantánea de su misma época; así un corte
+entre escribir la instantánea y vaciar el diario no duplica registros.
+
+La carga (restore_session) la comparten el scraper y la interfaz de Streamlit,
+así ambos recuperan lo escrito después de la última compactación.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Tipos de evento del diario
+EVENT_HEADER = 'inicio'
+EVENT_BUSINESS = 'negocio'
+EVENT_SEARCH = 'busqueda'
+EVENT_PENDING = 'pendiente'
+EVENT_MYSQL = 'mysql'
+
+# Tamaño mínimo del diario antes de compactar (bytes)
+MIN_COMPACT_BYTES = 1024 * 1024
+
+
+class SessionJournal:
+    """Diario JSONL de una sesión: solo se agregan eventos nuevos"""
+
+    def __init__(self, session_id: str, data_dir: str = "session_data", enabled: bool = True):
+        """
+        enabled: con False no se escribe nada (sesiones sin auto-guardado);
+        la lectura de diarios existentes sigue funcionando.
+        """
+        self.session_id = session_id
+        self.path = os.path.join(data_dir, f"journal_{session_id}.jsonl")
+        self.enabled = enabled
+        self.epoch = self.read_epoch() or 0
+        self.snapshot_bytes = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _header(self, epoch: int) -> str:
+        header = {'tipo': EVENT_HEADER, 'epoch': epoch, 'session_id': self.session_id,
+                  'fecha': datetime.now().isoformat()}
+        return json.dumps(header, ensure_ascii=False) + "\n"
+
+    def append(self, kind: str, data: Any):
+        """Agrega un evento al final del diario"""
+        if not self.enabled:
+            return
+        line = json.dumps({'tipo': kind, 'datos': data}, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    is_new = self.size() == 0
+                    torn = not is_new and not self._ends_with_newline()
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                    if is_new:
+                        self._file.write(self._header(self.epoch))
+                    elif torn:
+                        # Cerrar la línea que dejó cortada un proceso anterior
+                        self._file.write("\n")
+                self._file.write(line)
+                self._file.flush()
+            except Exception as e:
+                print(f"❌ Error escribiendo el diario {self.path}: {e}")
+
+    def sync(self):
+        """Fuerza a disco lo escrito hasta ahora"""
+        with self._lock:
+            if self._file is not None:
+                try:
+                    os.fsync(self._file.fileno())
+                except OSError:
+                    pass
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def needs_compaction(self) -> bool:
+        """El diario ya pesa tanto como la última instantánea (y más que el mínimo)"""
+        return self.size() >= max(MIN_COMPACT_BYTES, self.snapshot_bytes)
+
+    def reset(self, epoch: int, snapshot_bytes: int = 0):
+        """Vacía el diario tras escribir la instantánea de `epoch` (reemplazo atómico)"""
+        with self._lock:
+            self.epoch = epoch
+            self.snapshot_bytes = snapshot_bytes
+            if not self.enabled:
+                return
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self._header(epoch))
+            os.replace(temp_path, self.path)
+
+    def read_epoch(self) -> Optional[int]:
+        """Época de la cabecera del diario (None si no existe)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+        return header.get('epoch', 0) if header.get('tipo') == EVENT_HEADER else None
+
+    def read(self) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+        """Época de la cabecera y eventos del diario (None, []) si no existe.
+
+        Una última línea cortada por un cierre abrupto se ignora.
+        """
+        if not os.path.exists(self.path):
+            return None, []
+        epoch = None
+        events = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get('tipo') == EVENT_HEADER:
+                    epoch = event.get('epoch', 0)
+                else:
+                    events.append(event)
+        return epoch, events
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def replay_events(session_data: Dict[str, Any], events: List[Dict[str, Any]]) -> int:
+    """Aplica los eventos del diario sobre los datos de una instantánea; devuelve cuántos aplicó"""
+    businesses = session_data.setdefault('extracted_businesses', [])
+    searches = session_data.setdefault('search_history', [])
+    pending = session_data.setdefault('pending_enrichment', [])
+
+    for event in events:
+        kind = event.get('tipo')
+        data = event.get('datos')
+        if kind == EVENT_BUSINESS:
+            businesses.append(data)
+        elif kind == EVENT_SEARCH:
+            searches.append(data)
+        elif kind == EVENT_PENDING:
+            pending.append(data)
+        elif kind == EVENT_MYSQL:
+            # Los primeros N negocios y búsquedas ya estaban en MySQL
+            for business in businesses[:data.get('negocios', 0)]:
+                business['saved_to_db'] = True
+            for search in searches[:data.get('busquedas', 0)]:
+                search['saved_to_db'] = True
+    return len(events)
+
+
+def restore_session(journal: SessionJournal,
+                    sources: List[Tuple[str, Dict[str, Any]]]) -> Tuple[Optional[str], Optional[Dict[str, Any]], int]:
+    """Elige la instantánea sobre la que vale el diario y le reaplica sus eventos.
+
+    sources: (nombre, datos) de las instantáneas disponibles, en orden de
+    preferencia. Devuelve (fuente, datos de la sesión, eventos reaplicados), o
+    (None, None, 0) si la sesión no tiene nada guardado.
+    """
+    journal_epoch, events = journal.read()
+
+    # El diario solo vale sobre la instantánea de su misma época (0 = sin compactar)
+    source_name, session_data = next(
+        (source for source in sources if source[1].get('journal_epoch', 0) == journal_epoch),
+        sources[0] if sources else ('diario', None)
+    )
+    if session_data is None and journal_epoch == 0 and events:
+        session_data = {}
+    if session_data is None:
+        return None, None, 0
+
+    replayed = 0
+    if journal_epoch is not None and session_data.get('journal_epoch', 0) == journal_epoch:
+        replayed = replay_events(session_data, events)
+    return source_name, session_data, replayed
@@ -5,9 +5,13 @@ from io import BytesIO
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
-from scraper_enhanced import GoogleMapsScraperEnhanced
+from scraper_enhanced import GoogleMapsScraperEnhanced, create_chrome_driver
 from database_manager import DatabaseManager, LocalPersistence
+from session_journal import SessionJournal, restore_session
+from browser_pool import DriverPool
+import functools
 import json
+import os
 import uuid
 
 # Configuración de la página
@@ -95,6 +99,25 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Funciones de inicialización
+@st.cache_resource
+def get_driver_pool(lite_mode=False, capture_network=False):
+    """Pool de navegadores compartido entre búsquedas (cached)
+    
+    Un pool por configuración de Chrome: el perfil ligero y la captura de red
+    se fijan al iniciar el navegador y no se pueden cambiar después.
+    """
+    profile_prefix = "pool_{}{}".format(
+        'lite' if lite_mode else 'full',
+        '_net' if capture_network else ''
+    )
+    factory = functools.partial(
+        create_chrome_driver,
+        capture_network=capture_network,
+        lite_mode=lite_mode
+    )
+    # Navegador principal más hasta 8 workers en paralelo
+    return DriverPool(factory, max_size=9, max_pages=200, profile_prefix=profile_prefix)
+
 @st.cache_resource
 def init_database_manager(mysql_config):
     """Inicializa el gestor de base de datos (cached)"""
@@ -134,29 +157,51 @@ def init_session_state():
         st.session_state.auto_save_enabled = True
 
 def load_session_from_storage(session_id, db_manager=None):
-    """Carga una sesión desde almacenamiento"""
+    """Carga una sesión desde almacenamiento: la instantánea más los eventos de su diario"""
     local_persistence = LocalPersistence()
     
-    # Intentar cargar desde MySQL primero
+    # Respaldos disponibles, MySQL primero
+    sources = []
     if db_manager:
         try:
             backup = db_manager.get_latest_session_backup(session_id)
             if backup:
-                session_data = backup['datos']
-                return session_data
+                sources.append(('MySQL', backup['datos']))
         except Exception as e:
             st.warning(f"Error cargando desde MySQL: {e}")
-    
-    # Intentar cargar localmente
     session_data = local_persistence.load_latest_session(session_id)
+    if session_data:
+        sources.append(('archivos locales', session_data))
+    
+    journal = SessionJournal(session_id, local_persistence.data_dir, enabled=False)
+    _, session_data, _ = restore_session(journal, sources)
     return session_data
 
 def save_session_to_storage(session_data, session_id, db_manager=None):
-    """Guarda sesión en almacenamiento"""
+    """Guarda la sesión como instantánea compactada y vacía su diario.
+    
+    No reemplaza lo guardado si tiene más negocios o búsquedas que session_data
+    (por ejemplo, una sesión que no se cargó antes de guardar).
+    """
     local_persistence = LocalPersistence()
+    journal = SessionJournal(session_id, local_persistence.data_dir)
     
-    # Guardar localmente siempre
-    local_persistence.save_session(session_data, session_id)
+    stored = load_session_from_storage(session_id, db_manager) or {}
+    if (len(stored.get('extracted_businesses', [])) > len(session_data.get('extracted_businesses', []))
+            or len(stored.get('search_history', [])) > len(session_data.get('search_history', []))):
+        st.warning(f"⚠️ La sesión {session_id} guardada tiene más datos que la actual: cárgala antes de guardar")
+        return False
+    
+    epoch = journal.epoch + 1
+    session_data = dict(session_data,
+                        pending_enrichment=session_data.get('pending_enrichment', stored.get('pending_enrichment', [])),
+                        journal_epoch=epoch)
+    
+    # Guardar localmente siempre; el diario solo se vacía si la instantánea quedó escrita
+    snapshot = local_persistence.save_snapshot(session_data, session_id)
+    if not snapshot:
+        return False
+    journal.reset(epoch, os.path.getsize(snapshot))
     
     # Guardar en MySQL si está disponible
     if db_manager:
@@ -169,6 +214,7 @@ def save_session_to_storage(session_data, session_id, db_manager=None):
                     db_manager.save_businesses_batch(new_businesses)
         except Exception as e:
             st.warning(f"Error guardando en MySQL: {e}")
+    return True
 
 # Inicializar estado
 init_session_state()
@@ -285,12 +331,12 @@ with st.sidebar.expander("🔄 Auto-guardado", expanded=False):
                 'timestamp': datetime.now().isoformat()
             }
             
-            save_session_to_storage(
+            if save_session_to_storage(
                 session_data,
                 st.session_state.session_id,
                 st.session_state.db_manager
-            )
-            st.success("✅ Sesión guardada manualmente")
+            ):
+                st.success("✅ Sesión guardada manualmente")
         else:
             st.info("ℹ️ No hay datos para guardar")
 
@@ -330,55 +376,104 @@ with st.sidebar.expander("📊 Estadísticas de Sesión", expanded=True):
     else:
         st.info("🎯 Inicia tu primera búsqueda para ver estadísticas")
 
+# Navegadores abiertos en los pools compartidos entre búsquedas
+with st.sidebar.expander("🌐 Navegadores", expanded=False):
+    pool_labels = {
+        (False, False): "Completo",
+        (True, False): "Ligero",
+        (False, True): "Captura de red",
+        (True, True): "Ligero + captura de red"
+    }
+    pools_shown = 0
+    for (pool_lite, pool_network), label in pool_labels.items():
+        pool_stats = get_driver_pool(pool_lite, pool_network).get_stats()
+        if not pool_stats['open'] and not pool_stats['recycled']:
+            continue
+        pools_shown += 1
+        st.markdown(f"**{label}**")
+        col_pool1, col_pool2, col_pool3 = st.columns(3)
+        with col_pool1:
+            st.metric("En uso", pool_stats['in_use'])
+        with col_pool2:
+            st.metric("Libres", pool_stats['idle'])
+        with col_pool3:
+            st.metric("Reciclados", pool_stats['recycled'])
+        st.caption(f"Máximo {pool_stats['max_size']} navegadores, "
+                   f"reciclaje cada {pool_stats['max_pages']} páginas")
+    if not pools_shown:
+        st.info("Ningún navegador abierto todavía")
+
 # Función para realizar scraping mejorado
-def perform_enhanced_scraping(url, max_results, search_name):
+def perform_enhanced_scraping(url, max_results, search_name, num_workers=1, mode="detail", lite_mode=False,
+                              pipeline=False, num_tabs=1, skip_known_places=False, place_ttl_days=None):
     """Realiza scraping con auto-guardado y persistencia"""
+    scraper = None
     try:
         # Crear scraper con configuración avanzada
         scraper = GoogleMapsScraperEnhanced(
             auto_save=st.session_state.auto_save_enabled,
             mysql_config=st.session_state.mysql_config,
-            session_id=st.session_state.session_id
+            session_id=st.session_state.session_id,
+            num_workers=num_workers,
+            num_tabs=num_tabs,
+            skip_known_places=skip_known_places,
+            place_ttl_days=place_ttl_days,
+            capture_network=(mode == "network"),
+            lite_mode=lite_mode,
+            driver_pool=get_driver_pool(lite_mode, mode == "network")
         )
         
-        # Cargar datos existentes en el scraper
-        if st.session_state.scraped_data:
-            scraper.extracted_businesses = st.session_state.scraped_data.copy()
-        if st.session_state.scraping_history:
-            scraper.search_history = st.session_state.scraping_history.copy()
+        # Cargar datos existentes en el scraper: con auto-guardado, lo guardado
+        # de la sesión (instantánea + diario); si no hay nada, lo de la interfaz
+        if not (st.session_state.auto_save_enabled and scraper.load_previous_session()):
+            if st.session_state.scraped_data:
+                scraper.extracted_businesses = st.session_state.scraped_data.copy()
+            if st.session_state.scraping_history:
+                scraper.search_history = st.session_state.scraping_history.copy()
         
         # Progress placeholder
         progress_placeholder = st.empty()
         status_placeholder = st.empty()
         
-        # Realizar scraping
+        # Realizar scraping mostrando cada negocio en cuanto se extrae
+        businesses = []
         with st.spinner('🌐 Accediendo a Google Maps...'):
-            businesses = scraper.search_businesses(url, max_results=max_results, search_name=search_name)
+            for business in scraper.iter_businesses(url, max_results=max_results, search_name=search_name,
+                                                    mode=mode, pipeline=pipeline):
+                businesses.append(business)
+                progress_placeholder.progress(min(len(businesses) / max_results, 1.0))
+                status_placeholder.info(f"✅ {len(businesses)}/{max_results}: {business['nombre']}")
+        
+        # Actualizar session state
+        st.session_state.scraped_data = scraper.extracted_businesses.copy()
+        st.session_state.scraping_history = scraper.search_history.copy()
         
         if businesses:
-            # Actualizar session state
-            st.session_state.scraped_data = scraper.extracted_businesses.copy()
-            st.session_state.scraping_history = scraper.search_history.copy()
-            
-            # Guardado final
-            session_data = {
-                'session_id': st.session_state.session_id,
-                'extracted_businesses': st.session_state.scraped_data,
-                'search_history': st.session_state.scraping_history,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            save_session_to_storage(
-                session_data,
-                st.session_state.session_id,
-                st.session_state.db_manager
-            )
+            # Con auto-guardado el scraper ya registró cada negocio en el diario
+            # y compacta la instantánea al cerrarse
+            if not st.session_state.auto_save_enabled:
+                session_data = {
+                    'session_id': st.session_state.session_id,
+                    'extracted_businesses': st.session_state.scraped_data,
+                    'search_history': st.session_state.scraping_history,
+                    'timestamp': datetime.now().isoformat()
+                }
+                
+                save_session_to_storage(
+                    session_data,
+                    st.session_state.session_id,
+                    st.session_state.db_manager
+                )
             
             return True, businesses
         else:
             return False, "No se encontraron resultados"
             
     except Exception as e:
+        # Lo extraído antes del error ya está en el diario; mostrarlo también
+        if scraper:
+            st.session_state.scraped_data = scraper.extracted_businesses.copy()
+            st.session_state.scraping_history = scraper.search_history.copy()
         return False, f"Error durante el scraping: {str(e)}"
     finally:
         try:
@@ -435,6 +530,59 @@ with st.form("enhanced_search_form", clear_on_submit=False):
                 value=True,
                 help="Crea un archivo CSV de respaldo durante el proceso"
             )
+        
+        num_workers = st.number_input(
+            "👷 Navegadores en paralelo",
+            min_value=1,
+            max_value=8,
+            value=1,
+            help="Cada navegador extrae páginas de detalle de forma independiente (usa más memoria)"
+        )
+        
+        num_tabs = st.number_input(
+            "🗂️ Pestañas en un solo navegador",
+            min_value=1,
+            max_value=8,
+            value=1,
+            help="Carga varias páginas de detalle a la vez en pestañas del mismo Chrome (se usa cuando hay un solo navegador)"
+        )
+        
+        extraction_mode_label = st.radio(
+            "⚡ Modo de extracción",
+            ["Completo (página de cada negocio)", "Rápido (solo datos de la lista)", "Red (respuestas de Maps)"],
+            help="El modo rápido toma nombre, calificación, reviews, tipo y dirección parcial de la lista de resultados, sin teléfono ni website. "
+                 "El modo red decodifica los datos que Maps envía a la página al hacer scroll"
+        )
+        extraction_mode = {
+            "Completo": "detail",
+            "Rápido": "list",
+            "Red": "network"
+        }[extraction_mode_label.split(" ")[0]]
+        
+        lite_mode = st.checkbox(
+            "🪶 Perfil ligero",
+            value=False,
+            help="Bloquea imágenes, fuentes y mosaicos del mapa para cargar las páginas más rápido"
+        )
+        
+        pipeline = st.checkbox(
+            "🔀 Extraer mientras se hace scroll",
+            value=False,
+            help="En modo completo, los navegadores en paralelo empiezan a extraer los primeros negocios sin esperar a que termine el scroll"
+        )
+        
+        skip_known_places = st.checkbox(
+            "⏭️ Omitir negocios ya extraídos",
+            value=False,
+            help="No vuelve a visitar negocios extraídos en sesiones anteriores (índice en session_data/place_index.json)"
+        )
+        place_ttl_days = st.number_input(
+            "📅 Volver a extraer después de (días)",
+            min_value=0,
+            max_value=365,
+            value=0,
+            help="0 = los negocios ya extraídos nunca se vuelven a visitar"
+        ) or None
     
     # Botones de acción
     col_submit, col_clear, col_export = st.columns([2, 1, 1])
@@ -501,12 +649,17 @@ if submit_button and search_url:
             🏷️ Búsqueda: {search_name}<br>
             📈 Resultados solicitados: {form_max_results}<br>
             🔄 Auto-guardado: {'Activado' if auto_save_this_search else 'Desactivado'}<br>
+            👷 Navegadores en paralelo: {num_workers}<br>
+            🗂️ Pestañas: {num_tabs}<br>
             🗄️ MySQL: {'Conectado' if st.session_state.db_manager else 'No disponible'}
         </div>
         """, unsafe_allow_html=True)
         
         # Realizar scraping
-        success, result = perform_enhanced_scraping(search_url, form_max_results, search_name)
+        success, result = perform_enhanced_scraping(
+            search_url, form_max_results, search_name, num_workers, extraction_mode, lite_mode, pipeline,
+            num_tabs, skip_known_places, place_ttl_days
+        )
         
         if success:
             businesses = result
@@ -942,12 +1095,12 @@ if st.session_state.scraped_data:
                     'total_businesses': len(st.session_state.scraped_data)
                 }
                 
-                save_session_to_storage(
+                if save_session_to_storage(
                     session_data,
                     st.session_state.session_id,
                     st.session_state.db_manager
-                )
-                st.success("✅ Sesión guardada completamente")
+                ):
+                    st.success("✅ Sesión guardada completamente")
         
         with col_session2:
             st.markdown("#### 🔍 Explorar Sesiones Guardadas")
@@ -955,7 +1108,6 @@ if st.session_state.scraped_data:
             # Listar sesiones locales disponibles
             local_persistence = LocalPersistence()
             try:
-                import os
                 session_files = [f for f in os.listdir(local_persistence.data_dir) 
                                if f.startswith('session_') and f.endswith('.json')]
                 
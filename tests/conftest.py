@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture_path(*parts):
+    """Ruta de un archivo dentro de tests/fixtures"""
+    return os.path.join(FIXTURES_DIR, *parts)
+
+
+@pytest.fixture(scope="session")
+def chrome_driver():
+    """Chrome headless compartido por las pruebas que necesitan un navegador.
+
+    Se omiten esas pruebas si Selenium o Chrome no están disponibles.
+    """
+    webdriver = pytest.importorskip("selenium.webdriver")
+    from selenium.common.exceptions import WebDriverException
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    try:
+        driver = webdriver.Chrome(options=options)
+    except WebDriverException as e:
+        pytest.skip(f"Chrome no disponible: {e.msg}")
+
+    yield driver
+    driver.quit()
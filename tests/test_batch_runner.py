@@ -0,0 +1,53 @@
+"""
+Resumen de los trabajos de un lote: una búsqueda cortada por un error cuenta
+como fallida aunque haya alcanzado a extraer algunos negocios.
+"""
+
+import scraper_enhanced
+from batch_runner import run_job, batch_exit_code, JOB_OK, JOB_EMPTY, JOB_FAILED, EXIT_OK, EXIT_PARTIAL
+
+JOB = {'numero': 1, 'url': "https://www.google.com/maps/search/tacos", 'name': "tacos",
+       'max_results': 5, 'mode': 'detail'}
+
+
+def _fake_scraper(businesses, error=None):
+    class FakeScraper:
+        def __init__(self, **options):
+            self.search_history = []
+            self.last_search_error = None
+
+        def search_businesses(self, url, max_results=10, search_name="busqueda", mode="detail"):
+            self.last_search_error = error
+            self.search_history.append({'primer_resultado_segundos': 1.0})
+            return list(businesses)
+
+        def export_session_data(self, format_type):
+            return "negocios.csv"
+
+        def close(self):
+            pass
+
+    return FakeScraper
+
+
+def test_search_cut_by_error_is_failed(monkeypatch):
+    monkeypatch.setattr(scraper_enhanced, "GoogleMapsScraperEnhanced",
+                        _fake_scraper([{'nombre': 'uno'}], error="navegador caído"))
+
+    summary = run_job(JOB, "lote", {})
+
+    assert summary['estado'] == JOB_FAILED
+    assert summary['error'] == "navegador caído"
+    assert summary['negocios'] == 1 and summary['archivo_csv'] == "negocios.csv"
+    assert batch_exit_code([summary]) != EXIT_OK
+
+
+def test_finished_search_is_ok_or_empty(monkeypatch):
+    monkeypatch.setattr(scraper_enhanced, "GoogleMapsScraperEnhanced", _fake_scraper([{'nombre': 'uno'}]))
+    ok = run_job(JOB, "lote", {})
+    monkeypatch.setattr(scraper_enhanced, "GoogleMapsScraperEnhanced", _fake_scraper([]))
+    empty = run_job(JOB, "lote", {})
+
+    assert (ok['estado'], empty['estado']) == (JOB_OK, JOB_EMPTY)
+    assert batch_exit_code([ok]) == EXIT_OK
+    assert batch_exit_code([ok, empty]) == EXIT_PARTIAL
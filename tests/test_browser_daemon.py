@@ -0,0 +1,67 @@
+"""
+Reserva de los navegadores persistentes: un Chrome del daemon lo maneja un
+solo scraper a la vez, aunque corran en procesos distintos.
+"""
+
+import multiprocessing
+
+import pytest
+
+import os
+from types import SimpleNamespace
+
+from browser_daemon import (DaemonBrowserBusy, attach_chrome_driver, daemon_browser_pid,
+                            write_daemon_state, _lock_path, _try_lock, _unlock)
+from driver_watchdog import browser_rss_mb
+
+ADDRESS = "127.0.0.1:9222"
+
+
+def _hold_lock(path, locked, release):
+    lock_file = _try_lock(path)
+    locked.set()
+    release.wait(30)
+    _unlock(lock_file)
+
+
+def test_attach_fails_fast_while_another_process_holds_the_browser(tmp_path):
+    state_file = str(tmp_path / "browser_daemon.json")
+    path = _lock_path(ADDRESS, state_file)
+    locked, release = multiprocessing.Event(), multiprocessing.Event()
+    holder = multiprocessing.Process(target=_hold_lock, args=(path, locked, release))
+    holder.start()
+    try:
+        assert locked.wait(30)
+        with pytest.raises(DaemonBrowserBusy):
+            attach_chrome_driver(ADDRESS, state_file=state_file)
+    finally:
+        release.set()
+        holder.join(30)
+
+    # Al soltarlo (o al morir el proceso) vuelve a estar libre
+    lock_file = _try_lock(path)
+    assert lock_file is not None
+    _unlock(lock_file)
+
+
+def test_lock_is_exclusive_within_a_process(tmp_path):
+    path = _lock_path(ADDRESS, str(tmp_path / "browser_daemon.json"))
+    first = _try_lock(path)
+    assert first is not None
+    assert _try_lock(path) is None
+    _unlock(first)
+
+
+def test_attached_driver_memory_is_read_from_daemon_chrome(tmp_path):
+    state_file = str(tmp_path / "browser_daemon.json")
+    write_daemon_state({ADDRESS: os.getpid()}, state_file=state_file)
+    assert daemon_browser_pid(ADDRESS, state_file) == os.getpid()
+    assert daemon_browser_pid("127.0.0.1:9333", state_file) is None
+
+    # El chromedriver local no es el navegador: sin PID publicado no se mide nada
+    local_service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+    unknown = SimpleNamespace(daemon_address=ADDRESS, browser_pid=None, service=local_service)
+    assert browser_rss_mb(unknown) is None
+
+    known = SimpleNamespace(daemon_address=ADDRESS, browser_pid=os.getpid(), service=local_service)
+    assert browser_rss_mb(known) > 0
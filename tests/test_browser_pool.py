@@ -0,0 +1,79 @@
+"""
+Pool de navegadores con un navegador falso: perfiles dentro de
+temp_chrome_profiles/, perfil descartado al reciclar tras un bloqueo y
+perfiles del pool que sobreviven a la limpieza de huérfanos.
+"""
+
+import os
+
+import pytest
+
+import chrome_profiles
+from browser_pool import DriverPool
+from chrome_profiles import collect_orphan_profiles, profiles_root
+
+
+class FakeDriver:
+    def __init__(self, profile_dir):
+        self.profile_dir = profile_dir
+        self.closed = False
+        os.makedirs(profile_dir, exist_ok=True)
+        with open(os.path.join(profile_dir, "Cookies"), 'w') as f:
+            f.write("sesion marcada")
+
+    def execute_script(self, script):
+        return 1
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pool = DriverPool(FakeDriver, max_size=2)
+    yield pool
+    pool.close_all()
+
+
+def test_profiles_live_under_profiles_root(pool):
+    driver = pool.acquire()
+    assert os.path.dirname(driver.profile_dir) == profiles_root()
+
+
+def test_recycle_keeps_profile_for_cache(pool):
+    driver = pool.acquire()
+    pool.release(driver, recycle=True)
+
+    replacement = pool.acquire()
+    assert driver.closed
+    assert replacement.profile_dir == driver.profile_dir
+    assert pool.get_stats()['recycled'] == 1
+
+
+def test_fresh_profile_discards_slot_profile(pool):
+    driver = pool.acquire()
+    profile_dir = driver.profile_dir
+    pool.release(driver, fresh_profile=True)
+
+    assert driver.closed
+    assert not os.path.exists(profile_dir)
+    assert os.listdir(profiles_root()) == []
+
+
+def test_orphan_collection_keeps_pool_profiles(pool, monkeypatch):
+    driver = pool.acquire()
+    pool.release(driver)
+    pool.close_all()
+    names = ["pool_full_net_3", "a1b2c3d4_w1", "pool_0.descartado_1234abcd"]
+    for name in names:
+        os.makedirs(os.path.join(profiles_root(), name))
+
+    monkeypatch.setattr(chrome_profiles, "_collected", False)
+    assert collect_orphan_profiles(min_age_seconds=0) == 2
+
+    # Los del pool (de cualquier configuración) quedan para reutilizarse
+    assert sorted(os.listdir(profiles_root())) == ["pool_0", "pool_full_net_3"]
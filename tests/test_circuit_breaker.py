@@ -0,0 +1,50 @@
+"""
+Cortacircuitos por navegador: se abre tras varios bloqueos seguidos, queda
+medio abierto tras la pausa y la pausa crece hasta su tope.
+"""
+
+from circuit_breaker import BLOCK_RETRY_DELAY, CircuitBreaker, block_retry_delay
+
+
+def test_trips_after_threshold_consecutive_blocks():
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    assert breaker.record_failure() == 0
+    assert breaker.record_failure() == 30
+    assert breaker.trips == 1
+
+
+def test_success_between_blocks_keeps_circuit_closed():
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    assert breaker.record_failure() == 0
+    breaker.record_success()
+    assert breaker.record_failure() == 0
+    assert breaker.trips == 0
+
+
+def test_half_open_reopens_on_first_block_with_growing_pause():
+    breaker = CircuitBreaker(threshold=3, cooldown=30, max_cooldown=100)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.record_failure() == 30
+    assert breaker.half_open
+
+    # Medio abierto: un solo bloqueo lo reabre, con el doble de pausa y hasta el tope
+    assert breaker.record_failure() == 60
+    assert breaker.record_failure() == 100
+    assert breaker.trips == 3
+
+
+def test_success_after_pause_closes_circuit():
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.half_open
+    assert breaker.record_failure() == 0
+    assert breaker.record_failure() == 30
+
+
+def test_block_retry_delay_doubles():
+    assert [block_retry_delay(attempt) for attempt in range(3)] == [
+        BLOCK_RETRY_DELAY, 2 * BLOCK_RETRY_DELAY, 4 * BLOCK_RETRY_DELAY
+    ]
@@ -0,0 +1,79 @@
+"""
+Paridad entre la extracción de la página de detalle en una sola llamada
+(EXTRACT_DETAIL_FIELDS_JS) y la extracción elemento por elemento con Selenium,
+sobre páginas de detalle guardadas en tests/fixtures/detail_pages.
+"""
+
+import pathlib
+
+import pytest
+
+from conftest import fixture_path
+from page_scripts import DETAIL_SELECTORS, DETAIL_FIELD_SOURCES, EXTRACT_DETAIL_FIELDS_JS
+from scraper_enhanced import GoogleMapsScraperEnhanced
+
+# Campos esperados de cada página guardada tras _apply_detail_fields
+EXPECTED = {
+    'detail_full.html': {
+        'nombre': 'Taquería El Fogón',
+        'calificacion': '4.6',
+        'num_reviews': '1,284',
+        'tipo': 'Restaurante de tacos',
+        'direccion': 'Av. Insurgentes Sur 1235, Del Valle, 03100 Ciudad de México, CDMX',
+        'telefono': '55 5555 1234',
+        'website': 'https://www.elfogon.mx/'
+    },
+    'detail_fallbacks.html': {
+        'nombre': 'Consultorio Dental Sonrisa',
+        'calificacion': '4.9',
+        'num_reviews': 'No disponible',
+        'tipo': 'Dentista',
+        'direccion': 'Calle Morelos 45, Centro, 44100 Guadalajara, Jal.',
+        'telefono': '33 1234 5678',
+        'website': 'https://dentalsonrisa.com.mx/citas'
+    },
+    'detail_sparse.html': {
+        'nombre': 'Papelería La Estrella',
+        'calificacion': 'No disponible',
+        'num_reviews': 'No disponible',
+        'tipo': 'No disponible',
+        'direccion': 'Blvd. Díaz Ordaz 310, Monterrey, N.L.',
+        'telefono': 'No disponible',
+        'website': 'No disponible'
+    }
+}
+
+
+@pytest.fixture(scope="module")
+def scraper():
+    # Solo se usan métodos que no dependen del estado del scraper: no hace
+    # falta __init__ (que abriría su propio navegador)
+    return GoogleMapsScraperEnhanced.__new__(GoogleMapsScraperEnhanced)
+
+
+def _load(driver, name):
+    driver.get(pathlib.Path(fixture_path("detail_pages", name)).as_uri())
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_js_and_dom_extraction_match(chrome_driver, scraper, name):
+    _load(chrome_driver, name)
+
+    js_fields = chrome_driver.execute_script(EXTRACT_DETAIL_FIELDS_JS, DETAIL_SELECTORS, DETAIL_FIELD_SOURCES)
+    dom_fields = scraper._read_detail_fields_dom(chrome_driver)
+
+    js_data = scraper._apply_detail_fields(scraper._empty_business_data(0), js_fields)
+    dom_data = scraper._apply_detail_fields(scraper._empty_business_data(0), dom_fields)
+
+    assert js_data == dom_data
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_js_extraction_reads_expected_fields(chrome_driver, scraper, name):
+    _load(chrome_driver, name)
+
+    js_fields = chrome_driver.execute_script(EXTRACT_DETAIL_FIELDS_JS, DETAIL_SELECTORS, DETAIL_FIELD_SOURCES)
+    data = scraper._apply_detail_fields(scraper._empty_business_data(0), js_fields)
+
+    for field, value in EXPECTED[name].items():
+        assert data[field] == value, field
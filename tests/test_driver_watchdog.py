@@ -0,0 +1,72 @@
+"""
+Vigilancia de los navegadores: reinicio por páginas servidas, carga colgada,
+latencia sostenida y memoria.
+"""
+
+import driver_watchdog
+from driver_watchdog import BASELINE_PAGES, DriverWatchdog
+
+
+class FakeDriver:
+    pass
+
+
+def test_restart_after_max_pages():
+    watchdog = DriverWatchdog(max_pages=3, max_rss_mb=0)
+    driver = FakeDriver()
+    for _ in range(2):
+        watchdog.record_page(driver, 1.0)
+    assert watchdog.check(driver) is None
+    watchdog.record_page(driver, 1.0)
+    assert watchdog.check(driver) == "3 páginas servidas"
+
+
+def test_hung_driver_restarts_until_forgotten():
+    watchdog = DriverWatchdog(max_pages=0, max_rss_mb=0)
+    driver = FakeDriver()
+    assert watchdog.check(driver) is None
+    watchdog.mark_hung(driver)
+    assert watchdog.is_hung(driver)
+    assert watchdog.check(driver) == "carga colgada"
+    watchdog.forget(driver)
+    assert not watchdog.is_hung(driver)
+
+
+def test_restart_on_sustained_latency():
+    watchdog = DriverWatchdog(max_pages=0, max_rss_mb=0, latency_factor=2.5)
+    driver = FakeDriver()
+    for _ in range(BASELINE_PAGES):
+        watchdog.record_page(driver, 1.0)
+    for _ in range(BASELINE_PAGES - 1):
+        watchdog.record_page(driver, 3.0)
+    # La ventana reciente todavía tiene una carga rápida: aún no hay base para comparar
+    assert watchdog.check(driver) is None
+    watchdog.record_page(driver, 3.0)
+    assert watchdog.check(driver).startswith("latencia 3.0s")
+
+
+def test_memory_is_measured_every_few_pages(monkeypatch):
+    measured = []
+
+    def fake_rss(driver):
+        measured.append(driver)
+        return 2000.0
+
+    monkeypatch.setattr(driver_watchdog, "browser_rss_mb", fake_rss)
+    watchdog = DriverWatchdog(max_pages=0, max_rss_mb=1500, rss_every=5)
+    driver = FakeDriver()
+    for _ in range(4):
+        watchdog.record_page(driver, 1.0)
+        assert watchdog.check(driver) is None
+    watchdog.record_page(driver, 1.0)
+    assert watchdog.check(driver) == "memoria 2000 MB"
+    assert watchdog.peak_rss_mb == 2000.0
+    assert len(measured) == 1
+
+
+def test_memory_limit_disabled(monkeypatch):
+    monkeypatch.setattr(driver_watchdog, "browser_rss_mb", lambda driver: 1 / 0)
+    watchdog = DriverWatchdog(max_pages=0, max_rss_mb=0, rss_every=1)
+    driver = FakeDriver()
+    watchdog.record_page(driver, 1.0)
+    assert watchdog.check(driver) is None
@@ -0,0 +1,57 @@
+"""
+Checkpoint de la frontera: el mismo negocio con otro href (parámetros de
+seguimiento o de posición del mapa) no se vuelve a agregar como pendiente.
+"""
+
+from frontier import SearchFrontier, DONE, PENDING, MAX_OPEN_ATTEMPTS
+
+FOGON = "https://www.google.com/maps/place/Fog%C3%B3n/data=!4m7!3m6!1s0x85d1ff35f5bd1563:0x6c366f0e2de02ff7!8m2"
+FOGON_RESCROLLED = ("https://www.google.com/maps/place/Fog%C3%B3n/@19.37,-99.17,17z/data="
+                    "!4m6!3m5!1s0x85d1ff35f5bd1563:0x6c366f0e2de02ff7?authuser=0&entry=ttu")
+GUEROS = "https://www.google.com/maps/place/Gueros/data=!4m7!3m6!1s0x85d1ff8a9c7c31d1:0x1b2e8f06d5a4c3e2!8m2"
+
+
+def test_add_urls_dedupes_by_place_key(tmp_path):
+    frontier = SearchFrontier("s1", str(tmp_path))
+    key, resumed = frontier.start("https://www.google.com/maps/search/tacos", "tacos", "detail", 10)
+    assert not resumed
+
+    frontier.add_urls(key, [FOGON])
+    frontier.add_urls(key, [FOGON_RESCROLLED, GUEROS])
+
+    assert frontier.get(key)['order'] == [FOGON, GUEROS]
+
+
+def test_mark_resolves_href_variants(tmp_path):
+    frontier = SearchFrontier("s1", str(tmp_path))
+    key, _ = frontier.start("https://www.google.com/maps/search/tacos", "tacos", "detail", 10)
+    frontier.add_urls(key, [FOGON, GUEROS])
+
+    frontier.mark(key, FOGON_RESCROLLED, DONE)
+
+    assert frontier.get(key)['urls'] == {FOGON: DONE, GUEROS: PENDING}
+
+
+def test_checkpoint_survives_restart(tmp_path):
+    frontier = SearchFrontier("s1", str(tmp_path))
+    key, _ = frontier.start("https://www.google.com/maps/search/tacos", "tacos", "detail", 10)
+    frontier.add_urls(key, [FOGON, GUEROS])
+    frontier.set_scroll_complete(key)
+
+    reloaded = SearchFrontier("s1", str(tmp_path))
+    _, resumed = reloaded.start("https://www.google.com/maps/search/tacos", "tacos", "detail", 10)
+    assert resumed
+    assert reloaded.get(key)['scroll_complete']
+    assert reloaded.get(key)['order'] == [FOGON, GUEROS]
+
+
+def test_search_that_never_opens_is_dropped(tmp_path):
+    frontier = SearchFrontier("s1", str(tmp_path))
+    key, _ = frontier.start("https://www.google.com/maps/search/tacos", "tacos", "detail", 10)
+
+    for attempt in range(1, MAX_OPEN_ATTEMPTS):
+        assert frontier.record_open_failure(key, "Sin resultados iniciales") == (attempt, False)
+    assert SearchFrontier("s1", str(tmp_path)).get(key)['error'] == "Sin resultados iniciales"
+
+    assert frontier.record_open_failure(key, "Sin resultados iniciales") == (MAX_OPEN_ATTEMPTS, True)
+    assert SearchFrontier("s1", str(tmp_path)).unfinished() == []
@@ -0,0 +1,49 @@
+"""
+Mosaicos geográficos: la subdivisión cubre el área sin huecos y el zoom de
+cada mosaico queda dentro del rango de Maps.
+"""
+
+import pytest
+
+from geo_tiling import BoundingBox, tile_url
+
+
+def test_split_covers_area_without_gaps():
+    bbox = BoundingBox(19.0, -99.4, 19.8, -98.8)
+    tiles = bbox.split(2, 3)
+    assert len(tiles) == 6
+    assert min(tile.south for tile in tiles) == pytest.approx(bbox.south)
+    assert max(tile.north for tile in tiles) == pytest.approx(bbox.north)
+    assert min(tile.west for tile in tiles) == pytest.approx(bbox.west)
+    assert max(tile.east for tile in tiles) == pytest.approx(bbox.east)
+
+    area = sum((tile.north - tile.south) * (tile.east - tile.west) for tile in tiles)
+    assert area == pytest.approx((bbox.north - bbox.south) * (bbox.east - bbox.west))
+    # Mosaicos vecinos comparten el borde
+    assert tiles[0].east == pytest.approx(tiles[1].west)
+    assert tiles[0].north == pytest.approx(tiles[3].south)
+
+
+def test_smaller_tiles_get_deeper_zoom():
+    bbox = BoundingBox.parse("19.35,-99.20,19.45,-99.10")
+    child = bbox.split()[0]
+    assert child.zoom() == bbox.zoom() + 1
+
+
+def test_zoom_is_clamped():
+    assert BoundingBox(-80, -180, 80, 180).zoom() == 3
+    assert BoundingBox(19.4, -99.15, 19.400001, -99.149999).zoom() == 21
+
+
+def test_invalid_bounding_boxes_are_rejected():
+    with pytest.raises(ValueError):
+        BoundingBox(19.45, -99.20, 19.35, -99.10)
+    with pytest.raises(ValueError):
+        BoundingBox.parse("19.35,-99.20,19.45")
+
+
+def test_tile_url_centers_search():
+    bbox = BoundingBox(19.0, -99.2, 19.2, -99.0)
+    assert tile_url("tacos al pastor", bbox) == (
+        f"https://www.google.com/maps/search/tacos+al+pastor/@19.100000,-99.100000,{bbox.zoom()}z"
+    )
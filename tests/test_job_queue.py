@@ -0,0 +1,240 @@
+"""
+Cola de trabajos sobre SQLite compartida por varios procesos: préstamos
+exclusivos, préstamos vencidos que se retoman e intentos máximos.
+"""
+
+import multiprocessing
+import sqlite3
+import time
+
+from job_queue import JobQueue, run_queue_worker, DONE, FAILED, LEASED
+
+CAMPAIGN = "prueba"
+
+
+def _queue(path, **kwargs):
+    return JobQueue(None, sqlite_path=path, **kwargs)
+
+
+def _add_jobs(path, count):
+    job_queue = _queue(path)
+    for number in range(count):
+        job_queue.add_job(CAMPAIGN, f"https://www.google.com/maps/search/negocio+{number}", f"busqueda_{number}")
+    job_queue.close()
+
+
+def _rows(path, table):
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in connection.execute(f"SELECT * FROM {table} ORDER BY id")]
+    finally:
+        connection.close()
+
+
+def _work_jobs(path, worker_id, results):
+    """Toma y termina trabajos hasta vaciar la cola; informa los ids prestados"""
+    job_queue = _queue(path)
+    leased = []
+    while True:
+        job = job_queue.lease_job(worker_id, CAMPAIGN)
+        if job is None:
+            break
+        leased.append(job['id'])
+        job_queue.complete_job(job['id'], worker_id, discovered_urls=0)
+    job_queue.close()
+    results.put((worker_id, leased))
+
+
+def _work_urls(path, worker_id, results):
+    """Toma lotes de URLs y los termina hasta vaciar la cola"""
+    job_queue = _queue(path)
+    leased = []
+    while True:
+        rows = job_queue.lease_urls(worker_id, limit=3, campaign=CAMPAIGN)
+        if not rows:
+            break
+        for row in rows:
+            leased.append(row['id'])
+            job_queue.complete_url(row['id'], worker_id)
+    job_queue.close()
+    results.put((worker_id, leased))
+
+
+def _lease_and_die(path, lease_seconds, results):
+    """Presta un trabajo y termina sin completarlo ni renovarlo (proceso caído)"""
+    job_queue = _queue(path, lease_seconds=lease_seconds)
+    job = job_queue.lease_job("caido", CAMPAIGN)
+    results.put(job['id'] if job else None)
+
+
+def _run_processes(target, path, count):
+    """Corre `count` procesos worker sobre la misma base y junta lo que informan"""
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=target, args=(path, f"worker-{number}", results))
+        for number in range(count)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    return collected
+
+
+def test_jobs_are_never_leased_twice(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 60)
+
+    collected = _run_processes(_work_jobs, path, 4)
+
+    leased = [job_id for _, ids in collected for job_id in ids]
+    assert len(leased) == len(set(leased)) == 60
+    rows = _rows(path, "cola_trabajos")
+    assert all(row['estado'] == DONE and row['intentos'] == 1 for row in rows)
+
+
+def test_urls_are_never_leased_twice(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 1)
+    job_queue = _queue(path)
+    job = job_queue.lease_job("descubridor", CAMPAIGN)
+    urls = [f"https://www.google.com/maps/place/Negocio+{number}/data=!4m2!3m1!1s0x1:0x{number + 1:x}"
+            for number in range(40)]
+    assert len(job_queue.add_urls(job, urls)) == 40
+    job_queue.close()
+
+    collected = _run_processes(_work_urls, path, 4)
+
+    leased = [url_id for _, ids in collected for url_id in ids]
+    assert len(leased) == len(set(leased)) == 40
+    assert all(row['estado'] == DONE for row in _rows(path, "cola_urls"))
+
+
+def test_expired_lease_is_reclaimed_with_attempt_counted(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 1)
+
+    process_results = multiprocessing.Queue()
+    crashed = multiprocessing.Process(target=_lease_and_die, args=(path, 1.5, process_results))
+    crashed.start()
+    job_id = process_results.get(timeout=30)
+    crashed.join(30)
+    assert job_id is not None
+
+    job_queue = _queue(path, lease_seconds=1.5)
+    # Mientras el préstamo sigue vigente nadie más puede tomarlo
+    assert job_queue.lease_job("otro", CAMPAIGN) is None
+
+    time.sleep(1.7)
+    job = job_queue.lease_job("otro", CAMPAIGN)
+    assert job['id'] == job_id
+    assert job['intentos'] == 2
+    assert job['worker_id'] == "otro" and job['estado'] == LEASED
+    job_queue.close()
+
+
+def test_job_fails_after_max_attempts_when_leases_expire(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 1)
+    job_queue = _queue(path, lease_seconds=0.2, max_attempts=2)
+
+    assert job_queue.lease_job("a", CAMPAIGN)['intentos'] == 1
+    time.sleep(0.3)
+    assert job_queue.lease_job("b", CAMPAIGN)['intentos'] == 2
+    time.sleep(0.3)
+    assert job_queue.lease_job("c", CAMPAIGN) is None
+
+    row = _rows(path, "cola_trabajos")[0]
+    assert row['estado'] == FAILED
+    assert row['intentos'] == 2
+    job_queue.close()
+
+
+def test_job_fails_after_max_attempts_with_errors(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 1)
+    job_queue = _queue(path, max_attempts=2)
+
+    for attempt in (1, 2):
+        job = job_queue.lease_job("a", CAMPAIGN)
+        assert job['intentos'] == attempt
+        assert job_queue.complete_job(job['id'], "a", error="sin resultados")
+
+    assert job_queue.lease_job("a", CAMPAIGN) is None
+    row = _rows(path, "cola_trabajos")[0]
+    assert row['estado'] == FAILED and row['error'] == "sin resultados"
+    job_queue.close()
+
+
+def test_lease_expiry_ignores_local_clock(tmp_path, monkeypatch):
+    path = str(tmp_path / "job_queue.db")
+    _add_jobs(path, 1)
+    job_queue = _queue(path, lease_seconds=300)
+    assert job_queue.lease_job("a", CAMPAIGN)
+
+    # Otra máquina con el reloj una hora adelantado no puede robar el préstamo
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 3600)
+    assert job_queue.lease_job("b", CAMPAIGN) is None
+    job_queue.close()
+
+
+class _ListModeScraper:
+    """Scraper de prueba: en modo lista arma un negocio, falla otro y se cae"""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self.detail_urls = []
+
+    def discover_urls(self, url, max_results=10, read_cards=False):
+        return list(self.urls), {}
+
+    def extract_urls(self, urls, search_name="busqueda", mode="detail", cards_by_url=None, source_url=None):
+        if mode == 'list' and urls:
+            yield urls[0], {'nombre': 'uno'}, None
+            yield urls[1], None, "Sin tarjeta en la lista"
+            raise RuntimeError("navegador caído")
+        for url in urls:
+            self.detail_urls.append(url)
+            yield url, {'nombre': url}, None
+
+
+def test_list_mode_urls_left_open_are_extracted_later(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    job_queue = _queue(path)
+    job_queue.add_job(CAMPAIGN, "https://www.google.com/maps/search/negocios", "lista", mode='list')
+    urls = [f"https://www.google.com/maps/place/Negocio+{number}/data=!4m2!3m1!1s0x1:0x{number + 1:x}"
+            for number in range(3)]
+    scraper = _ListModeScraper(urls)
+
+    assert run_queue_worker(job_queue, scraper, "w1", CAMPAIGN) == 3
+
+    # La URL armada desde la lista no se repite; las otras dos se extraen desde su página
+    assert scraper.detail_urls == urls[1:]
+    assert all(row['estado'] == DONE for row in _rows(path, "cola_urls"))
+    job = _rows(path, "cola_trabajos")[0]
+    assert job['estado'] == DONE and job['intentos'] == 2
+    job_queue.close()
+
+
+def test_list_mode_urls_stay_leased_to_discoverer(tmp_path):
+    path = str(tmp_path / "job_queue.db")
+    job_queue = _queue(path)
+    job_queue.add_job(CAMPAIGN, "https://www.google.com/maps/search/negocios", "lista", mode='list')
+    urls = [f"https://www.google.com/maps/place/Negocio+{number}/data=!4m2!3m1!1s0x1:0x{number + 1:x}"
+            for number in range(3)]
+    job = job_queue.lease_job("w1", CAMPAIGN)
+    rows = job_queue.add_urls(job, urls, "w1")
+
+    # Prestadas a quien las descubrió: nadie más las toma mientras tanto
+    assert [row['url'] for row in rows] == urls
+    assert job_queue.lease_urls("w2", campaign=CAMPAIGN) == []
+    assert job_queue.complete_url(rows[0]['id'], "w1")
+
+    stored = _rows(path, "cola_urls")
+    assert [row['estado'] for row in stored] == [DONE, LEASED, LEASED]
+    assert all(row['worker_id'] == "w1" and row['intentos'] == 1 for row in stored)
+    job_queue.close()
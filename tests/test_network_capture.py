@@ -0,0 +1,96 @@
+"""
+Decodificación offline de respuestas de Maps en tests/fixtures/network:
+búsqueda (tbm=map, sola y envuelta en {"d": ...}) y lugar (/maps/preview/place).
+
+Las respuestas son sintéticas, armadas con los índices que usa
+parse_place_info (ver tests/fixtures/network/README.md): estas pruebas cubren
+el decodificador y el recorrido de los arreglos, no la vigencia del formato.
+"""
+
+import pytest
+
+from conftest import fixture_path
+from network_capture import (
+    decode_maps_payload, parse_search_response, parse_place_response, parse_place_info,
+    classify_response_url, feature_id_from_url
+)
+
+FOGON = {
+    'nombre': 'Taquería El Fogón',
+    'feature_id': '0x85d1ff35f5bd1563:0x6c366f0e2de02ff7',
+    'calificacion': '4.6 (1284)',
+    'tipo': 'Restaurante de tacos',
+    'direccion': 'Av. Insurgentes Sur 1235, Del Valle, 03100 Ciudad de México, CDMX',
+    'telefono': '55 5555 1234',
+    'website': 'https://www.elfogon.mx/'
+}
+
+
+def _read(name):
+    with open(fixture_path("network", name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_decode_strips_xssi_prefix():
+    assert decode_maps_payload(")]}'\n[1, [2, 3]]") == [1, [2, 3]]
+    assert decode_maps_payload('/*""*/[4]') == [4]
+
+
+def test_decode_unwraps_d_field():
+    assert decode_maps_payload('{"c": 0, "d": ")]}\'\\n[[\\"x\\"]]"}/*""*/') == [["x"]]
+
+
+def test_decode_rejects_non_json():
+    with pytest.raises(ValueError):
+        decode_maps_payload("<html></html>")
+
+
+def test_parse_search_response():
+    records = parse_search_response(_read("search_tbm_map.txt"))
+
+    # La primera entrada es la cabecera de la búsqueda, no un lugar
+    assert [record['nombre'] for record in records] == [
+        'Taquería El Fogón', 'Tacos Los Güeros', 'Antojitos Doña Mary'
+    ]
+    assert records[0] == FOGON
+
+
+def test_parse_search_response_optional_fields():
+    _, gueros, mary = parse_search_response(_read("search_tbm_map.txt"))
+
+    # Sin dirección completa: se arma con las líneas de [2]
+    assert gueros['direccion'] == 'Calle Medellín 112, Roma Nte., 06700 Ciudad de México, CDMX'
+    assert gueros['calificacion'] == '4.3 (87)'
+    assert 'telefono' not in gueros and 'website' not in gueros
+
+    assert mary['direccion'] == 'Mercado Medellín local 45, Roma Sur, CDMX'
+    assert mary['telefono'] == '55 1234 9876'
+    assert 'calificacion' not in mary and 'tipo' not in mary
+
+
+def test_parse_wrapped_search_response_matches_plain():
+    assert parse_search_response(_read("search_tbm_map_wrapped.txt")) == \
+        parse_search_response(_read("search_tbm_map.txt"))
+
+
+def test_parse_place_response():
+    assert parse_place_response(_read("place_preview.txt")) == FOGON
+
+
+def test_parse_invalid_responses():
+    assert parse_search_response("") == []
+    assert parse_search_response(")]}'\n{\"error\": 1}") == []
+    assert parse_place_response("no es json") is None
+    assert parse_place_info([None] * 12) is None
+
+
+def test_classify_response_url():
+    assert classify_response_url("https://www.google.com/search?tbm=map&authuser=0&q=tacos") == 'search'
+    assert classify_response_url("https://www.google.com/maps/preview/place?authuser=0&pb=!1m2") == 'place'
+    assert classify_response_url("https://www.google.com/maps/vt?pb=!1m5") is None
+
+
+def test_feature_id_matches_place_url():
+    url = ("https://www.google.com/maps/place/Taquer%C3%ADa+El+Fog%C3%B3n/data="
+           "!4m7!3m6!1s0x85d1ff35f5bd1563:0x6c366f0e2de02ff7!8m2!3d19.37!4d-99.17")
+    assert feature_id_from_url(url) == FOGON['feature_id']
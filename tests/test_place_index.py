@@ -0,0 +1,72 @@
+"""
+Índice de lugares compartido: guardados de varios scrapers sobre el mismo
+archivo no se pisan entre sí.
+"""
+
+import json
+import multiprocessing
+
+from place_index import PlaceIndex, place_key
+
+
+def _business(name, fecha):
+    return {'nombre': name, 'fecha_extraccion': fecha, 'busqueda': 'prueba'}
+
+
+def _mark_and_save(path, worker, count):
+    index = PlaceIndex(path)
+    for number in range(count):
+        index.mark(f"cid:{worker * 1000 + number}", _business(f"negocio {worker}-{number}", "2026-01-01T00:00:00"))
+        index.save()
+
+
+def test_place_key_ignores_tracking_params():
+    first = "https://www.google.com/maps/place/Taquer%C3%ADa/data=!4m7!3m6!1s0x85d1ff35f5bd1563:0x6c366f0e2de02ff7!8m2"
+    second = ("https://www.google.com/maps/place/Taquer%C3%ADa/@19.37,-99.17,17z/data="
+              "!3m1!4b1!4m6!3m5!1s0x85d1ff35f5bd1563:0x6c366f0e2de02ff7?authuser=0&hl=es&entry=ttu")
+    assert place_key(first) == place_key(second) == f"cid:{0x6c366f0e2de02ff7}"
+
+
+def test_save_keeps_keys_from_other_indexes(tmp_path):
+    path = str(tmp_path / "place_index.json")
+    first = PlaceIndex(path)
+    second = PlaceIndex(path)
+
+    first.mark("cid:1", _business("uno", "2026-01-01T10:00:00"))
+    second.mark("cid:2", _business("dos", "2026-01-01T10:00:00"))
+    first.save()
+    second.save()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        assert set(json.load(f)) == {"cid:1", "cid:2"}
+    # El segundo ya ve en memoria lo que guardó el primero
+    assert second.get("cid:1")['nombre'] == "uno"
+
+
+def test_save_keeps_newest_extraction(tmp_path):
+    path = str(tmp_path / "place_index.json")
+    stale = PlaceIndex(path)
+    fresh = PlaceIndex(path)
+
+    fresh.mark("cid:1", _business("nuevo", "2026-03-01T10:00:00"))
+    stale.mark("cid:1", _business("viejo", "2026-01-01T10:00:00"))
+    fresh.save()
+    stale.save()
+
+    assert PlaceIndex(path).get("cid:1")['nombre'] == "nuevo"
+    assert stale.get("cid:1")['nombre'] == "nuevo"
+
+
+def test_concurrent_processes_do_not_drop_keys(tmp_path):
+    path = str(tmp_path / "place_index.json")
+    processes = [
+        multiprocessing.Process(target=_mark_and_save, args=(path, worker, 20))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    assert len(PlaceIndex(path)) == 80
@@ -0,0 +1,110 @@
+"""
+Ritmo de navegación: la cubeta de fichas se rellena con el tiempo sin pasar
+de la ráfaga, y el límite AIMD sube de a poco y baja a la mitad sin salir de
+sus cotas.
+"""
+
+import pytest
+
+import rate_limiter
+from rate_limiter import (AIMDController, TokenBucket, OUTCOME_BLOCKED, OUTCOME_OK, OUTCOME_TIMEOUT,
+                          page_outcome)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake)
+    return fake
+
+
+def test_token_bucket_refills_at_rate_up_to_burst(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # Una pausa larga no acumula más fichas que la ráfaga
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+def test_token_bucket_acquire_waits_for_missing_tokens(clock, monkeypatch):
+    slept = []
+
+    def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=4, burst=1)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.25)
+    assert slept == [pytest.approx(0.25)]
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_aimd_increases_additively_up_to_maximum():
+    controller = AIMDController(initial=1, minimum=1, maximum=3)
+    limits = []
+    for _ in range(10):
+        controller.release(OUTCOME_OK, latency=1.0)
+        limits.append(controller.current_limit)
+    # +1 por ventana completa de éxitos: 1 → 2 tras una carga, 2 → 3 tras dos más
+    assert limits[:3] == [2, 2, 3]
+    assert max(limits) == 3
+    assert controller.get_stats()['increases'] == 2
+
+
+def test_aimd_slow_loads_do_not_increase():
+    controller = AIMDController(initial=2, maximum=4, target_latency=5)
+    for _ in range(10):
+        controller.release(OUTCOME_OK, latency=9.0)
+    assert controller.current_limit == 2
+
+
+def test_aimd_halves_once_per_window_and_respects_minimum():
+    controller = AIMDController(initial=4, minimum=1, maximum=4)
+    for _ in range(4):
+        controller.release(OUTCOME_OK, latency=1.0)
+
+    controller.release(OUTCOME_TIMEOUT)
+    assert controller.current_limit == 2
+    # Las cargas que ya estaban en curso no vuelven a recortar
+    controller.release(OUTCOME_BLOCKED)
+    assert controller.current_limit == 2
+
+    for _ in range(6):
+        controller.release(OUTCOME_BLOCKED)
+    assert controller.current_limit == 1
+    assert controller.get_stats()['decreases'] == 2
+
+
+def test_aimd_acquire_respects_limit():
+    controller = AIMDController(initial=1, maximum=2)
+    assert controller.try_acquire()
+    assert not controller.try_acquire()
+    controller.release(OUTCOME_OK, latency=1.0)
+    assert controller.try_acquire()
+    assert controller.try_acquire()
+    assert not controller.try_acquire()
+
+
+def test_page_outcome_classifies_extraction_results():
+    assert page_outcome(None) == OUTCOME_TIMEOUT
+    assert page_outcome({'nombre': 'No disponible'}) == 'empty'
+    assert page_outcome({'nombre': 'Fogón'}) == OUTCOME_OK
@@ -0,0 +1,61 @@
+"""
+Cola de reintentos: espera exponencial con azar acotado, tope de intentos y
+entrega de los reintentos vencidos en orden.
+"""
+
+import pytest
+
+import retry_queue
+from retry_queue import DeadLetterFile, RetryQueue
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = {'now': 1000.0}
+    monkeypatch.setattr(retry_queue.time, "time", lambda: clock['now'])
+    return clock
+
+
+def test_delay_grows_exponentially_with_jitter_and_cap(now):
+    queue = RetryQueue(max_attempts=10, base_delay=10, max_delay=60)
+    assert 8 <= queue.add(0, "a", 1, "timeout") <= 12
+    assert 16 <= queue.add(1, "b", 2, "timeout") <= 24
+    assert 48 <= queue.add(2, "c", 6, "timeout") <= 72
+
+
+def test_no_retry_after_max_attempts(now):
+    queue = RetryQueue(max_attempts=3)
+    assert queue.add(0, "a", 3, "timeout") is None
+    assert len(queue) == 0
+
+
+def test_pop_due_returns_only_expired_items(now):
+    queue = RetryQueue(max_attempts=5, base_delay=10)
+    queue.add(0, "a", 1, "timeout")
+    queue.add(1, "b", 3, "vacía")
+    assert queue.pop_due() == []
+    assert 8 <= queue.seconds_until_due() <= 12
+
+    now['now'] += 13
+    due = queue.pop_due()
+    assert [item['url'] for item in due] == ["a"]
+    assert due[0]['attempts'] == 1 and due[0]['reason'] == "timeout"
+    assert len(queue) == 1
+
+    now['now'] += 60
+    assert [item['url'] for item in queue.pop_due()] == ["b"]
+    assert queue.seconds_until_due() == 0
+
+
+def test_dead_letter_keeps_latest_entry_and_removes_old_ones(tmp_path):
+    dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.jsonl"))
+    dead_letter.add("a", "tacos", "timeout", 3, "s1")
+    dead_letter.add("a", "tacos", "bloqueada", 3, "s2")
+    dead_letter.add("b", "pizza", "timeout", 3, "s1")
+
+    entries = {entry['url']: entry for entry in dead_letter.load()}
+    assert entries["a"]['motivo'] == "bloqueada"
+    assert [entry['url'] for entry in dead_letter.load(search_name="pizza")] == ["b"]
+
+    dead_letter.remove(["a"])
+    assert [entry['url'] for entry in dead_letter.load()] == ["b"]
@@ -0,0 +1,105 @@
+"""
+Diario de la sesión: la carga reaplica el diario sobre la instantánea de su
+misma época y la compactación no pisa una sesión guardada que no se cargó.
+"""
+
+import json
+
+from database_manager import LocalPersistence
+from frontier import SearchFrontier
+from scraper_enhanced import GoogleMapsScraperEnhanced
+from session_journal import SessionJournal, restore_session, EVENT_BUSINESS, EVENT_SEARCH
+
+
+def _business(name):
+    return {'nombre': name, 'busqueda': 'prueba'}
+
+
+def _sources(local_persistence, session_id):
+    session_data = local_persistence.load_latest_session(session_id)
+    return [('archivos locales', session_data)] if session_data else []
+
+
+def _scraper(data_dir, session_id):
+    """Scraper sin navegador: solo lo que usan la carga y la compactación"""
+    scraper = GoogleMapsScraperEnhanced.__new__(GoogleMapsScraperEnhanced)
+    scraper.session_id = session_id
+    scraper.db_manager = None
+    scraper.local_persistence = LocalPersistence(str(data_dir))
+    scraper.journal = SessionJournal(session_id, scraper.local_persistence.data_dir)
+    scraper.extracted_businesses = []
+    scraper.search_history = []
+    scraper.pending_enrichment = []
+    scraper.frontier = SearchFrontier(session_id, str(data_dir))
+    scraper._session_loaded = not (scraper.journal.size() or scraper.local_persistence.has_session(session_id))
+    return scraper
+
+
+def test_restore_replays_journal_after_snapshot(tmp_path):
+    local_persistence = LocalPersistence(str(tmp_path))
+    journal = SessionJournal("s1", local_persistence.data_dir)
+    local_persistence.save_snapshot({'extracted_businesses': [_business("uno")], 'journal_epoch': 1}, "s1")
+    journal.reset(1)
+    journal.append(EVENT_BUSINESS, _business("dos"))
+    journal.append(EVENT_SEARCH, {'nombre': 'prueba'})
+    journal.close()
+
+    source, session_data, replayed = restore_session(journal, _sources(local_persistence, "s1"))
+
+    assert source == 'archivos locales' and replayed == 2
+    assert [b['nombre'] for b in session_data['extracted_businesses']] == ["uno", "dos"]
+    assert session_data['search_history'] == [{'nombre': 'prueba'}]
+
+
+def test_restore_skips_journal_from_other_epoch(tmp_path):
+    local_persistence = LocalPersistence(str(tmp_path))
+    journal = SessionJournal("s1", local_persistence.data_dir)
+    journal.append(EVENT_BUSINESS, _business("uno"))
+    journal.close()
+    # Corte entre escribir la instantánea y vaciar el diario: ya incluye "uno"
+    local_persistence.save_snapshot({'extracted_businesses': [_business("uno")], 'journal_epoch': 1}, "s1")
+
+    _, session_data, replayed = restore_session(journal, _sources(local_persistence, "s1"))
+
+    assert replayed == 0
+    assert [b['nombre'] for b in session_data['extracted_businesses']] == ["uno"]
+
+
+def test_latest_session_prefers_snapshot_and_ignores_other_sessions(tmp_path):
+    local_persistence = LocalPersistence(str(tmp_path))
+    local_persistence.save_snapshot({'extracted_businesses': [_business("instantánea")]}, "s1")
+    (tmp_path / "session_s1_20260101_000000.json").write_text(
+        json.dumps({'extracted_businesses': [_business("viejo")]}), encoding='utf-8')
+    (tmp_path / "session_s1_extra_snapshot.json").write_text(json.dumps({}), encoding='utf-8')
+
+    session_data = local_persistence.load_latest_session("s1")
+
+    assert session_data['extracted_businesses'] == [_business("instantánea")]
+    assert local_persistence.has_session("s1")
+    assert not local_persistence.has_session("s2")
+
+
+def test_compaction_keeps_unloaded_snapshot(tmp_path):
+    first = _scraper(tmp_path, "s1")
+    first.extracted_businesses = [_business("uno"), _business("dos")]
+    first._compact_session()
+    first.journal.close()
+
+    # Otra ejecución de la misma sesión que no la cargó: lo nuevo va al diario
+    second = _scraper(tmp_path, "s1")
+    assert not second._session_loaded
+    second.extracted_businesses = [_business("tres")]
+    second.journal.append(EVENT_BUSINESS, _business("tres"))
+    second._compact_session()
+    second.journal.close()
+
+    third = _scraper(tmp_path, "s1")
+    assert third.load_previous_session()
+    assert [b['nombre'] for b in third.extracted_businesses] == ["uno", "dos", "tres"]
+
+    # Ya cargada, compactar reescribe la instantánea completa y vacía el diario
+    third._compact_session()
+    third.journal.close()
+    _, session_data, replayed = restore_session(third.journal, _sources(third.local_persistence, "s1"))
+    assert replayed == 0
+    assert len(session_data['extracted_businesses']) == 3